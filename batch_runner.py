@@ -0,0 +1,124 @@
+import fnmatch
+import os
+import signal
+import time
+import zipfile
+from multiprocessing import Pool
+import pandas as pd
+from read_file import parse_jobs
+from solution_cache import SolutionCache
+import solvers
+
+# ---------------------------
+# Batch execution
+# ---------------------------
+# Instances are (name, text) pairs, read one at a time from files or straight from a zip
+# archive (nothing is extracted), and handed to a process pool; every worker runs the
+# chosen solvers on one instance with a per-solver timeout. All results end up in one
+# table. The command line front end is run.py.
+
+class InstanceTimeout(Exception):
+    pass
+
+def _raise_timeout(signum, frame):
+    raise InstanceTimeout()
+
+_caches = {}
+
+def _solution_cache(path):
+    # one SolutionCache per file and process
+    if path not in _caches:
+        _caches[path] = SolutionCache(path)
+    return _caches[path]
+
+def iter_members(zip_path, pattern="*.txt", limit=None):
+    # (member name, text) pairs, streamed from the archive in name order
+    with zipfile.ZipFile(zip_path) as archive:
+        names = sorted(name for name in archive.namelist() if fnmatch.fnmatch(name, pattern))
+        for name in names[:limit]:
+            yield name, archive.read(name).decode()
+
+def iter_files(paths):
+    for path in paths:
+        with open(path) as f:
+            yield path, f.read()
+
+def solve_instance(task):
+    """
+    Worker: parse one instance and run every solver on its own copy of the jobs.
+    A solver that runs past timeout seconds (SIGALRM, POSIX only) is recorded as a timeout.
+    Returns one row per solver; with keep_jobs the scheduled job dicts are included, so
+    the caller can write them in the results/ layout. With a cache file the offline solvers
+    go through a SolutionCache.
+    """
+    name, text, solver_names, timeout, keep_jobs, cache = task
+    solve = _solution_cache(cache).solve if cache else solvers.solve
+    jobs = parse_jobs(text)
+    test_case_name = os.path.splitext(os.path.basename(name))[0]
+    rows = []
+    for solver in solver_names:
+        status, profit, assigned = "ok", None, None
+        start = time.perf_counter()
+        if timeout:
+            signal.signal(signal.SIGALRM, _raise_timeout)
+            signal.setitimer(signal.ITIMER_REAL, timeout)
+        try:
+            assigned, profit = solve(solver, [dict(job) for job in jobs], test_case_name)
+        except InstanceTimeout:
+            status = "timeout"
+        except Exception as e:
+            status = f"error: {type(e).__name__}: {e}"
+        finally:
+            if timeout:
+                signal.setitimer(signal.ITIMER_REAL, 0)
+        row = {
+            "instance": test_case_name,
+            "n_jobs": len(jobs),
+            "horizon": max((job["d"] for job in jobs), default=0),
+            "solver": solver,
+            "profit": profit,
+            "seconds": time.perf_counter() - start,
+            "status": status,
+        }
+        if keep_jobs:
+            row["jobs"] = [dict(job, assigned_slots=assigned.get(job["id"]) if assigned else None) for job in jobs]
+        rows.append(row)
+    return rows
+
+def run_batch(instances, solver_names, workers=None, timeout=None, keep_jobs=False, cache=None):
+    # instances: iterable of (name, text); workers=1 runs in this process; cache: SolutionCache file
+    tasks = ((name, text, solver_names, timeout, keep_jobs, cache) for name, text in instances)
+    rows = []
+    if workers == 1:
+        for task in tasks:
+            rows.extend(solve_instance(task))
+    else:
+        with Pool(workers) as pool:
+            for instance_rows in pool.imap_unordered(solve_instance, tasks, chunksize=8):
+                rows.extend(instance_rows)
+    results = pd.DataFrame(rows).sort_values(["instance", "solver"], ignore_index=True)
+    results["profit"] = results["profit"].astype("Int64")   # missing on timeout / error
+    return results
+
+def summarize(results):
+    summary = results.groupby("solver").agg(
+        instances=("instance", "count"),
+        total_profit=("profit", "sum"),
+        mean_seconds=("seconds", "mean"),
+        max_seconds=("seconds", "max"),
+        failed=("status", lambda s: int((s != "ok").sum())),
+    )
+    # ratio to the offline optimum, on the instances where the DP finished
+    if "offline" in summary.index:
+        optimum = results[results["solver"] == "offline"].set_index("instance")["profit"]
+        ratios = results.assign(optimal=results["instance"].map(optimum)).dropna(subset=["profit", "optimal"])
+        summary["profit_vs_offline"] = ratios.groupby("solver")["profit"].sum() / ratios.groupby("solver")["optimal"].sum()
+    return summary
+
+def write_results(results, output):
+    results = results.drop(columns=["jobs"], errors="ignore")
+    if output.endswith(".parquet"):
+        results.to_parquet(output, index=False)
+    else:
+        results.to_csv(output, index=False)
+    print(f"\nResults saved to {output}")
@@ -0,0 +1,308 @@
+import argparse
+import gc
+import json
+import math
+import platform
+import random
+import signal
+import statistics
+import sys
+import time
+import tracemalloc
+from batch_runner import InstanceTimeout, _raise_timeout
+from instance_generator import generate_scaled_instance, PROCESSING
+import solvers
+
+# ---------------------------
+# Scaling benchmark
+# ---------------------------
+# python benchmark.py [--quick] [--solvers offline online ...] [--timeout 10]
+#                     [--save-baseline benchmark_baseline.json]
+#                     [--baseline benchmark_baseline.json --threshold 25]
+#
+# Instance families change one parameter at a time around a base point: the job count n,
+# the horizon, the window slack (spare slots per window on top of p) and the processing-time
+# distribution. Each point has --seeds instances. Every solver runs on every instance
+# twice: untraced for the wall-clock time (the fastest of a few runs), then under
+# tracemalloc for the peak memory (the smallest of two runs, each after a gc.collect()),
+# since tracing slows Python code down. Once a solver
+# times out on an axis, the larger values of that axis are skipped.
+# On the numeric axes, a power law (t ~ x^b) and an exponential (t ~ g^x) are fitted to
+# time and memory in log space, and the better fit is reported. --save-baseline keeps a
+# run; --baseline compares a run against it and flags every point that got slower or
+# bigger by more than --threshold percent and by more than the spread seen between the
+# traced runs of the point (exit status 1). --normalize first divides the
+# baseline times by the median slowdown over all points, for runs on a different or busy
+# machine; a change that slows every solver alike is then no longer flagged.
+
+SOLVER_NAMES = ["offline", "offline_2", "offline_3", "online", "online_highscore", "online_dynscore"]
+
+# horizons stay within 62 slots, where offline_3 still runs its own bitmask DP
+BASE = {"n": 12, "horizon": 32, "slack": 4, "processing": "uniform"}
+AXES = {
+    "n": [4, 8, 12, 16, 24, 32, 48, 64],
+    "horizon": [16, 24, 32, 40, 48, 62],
+    "slack": [0, 2, 4, 8, 12, 16, 24],
+    "processing": list(PROCESSING),
+}
+QUICK_AXES = {
+    "n": [4, 8, 12, 16],
+    "horizon": [16, 32, 62],
+    "slack": [0, 4, 16],
+    "processing": list(PROCESSING),
+}
+
+def family(axis, value, base=BASE, seeds=3, seed=0):
+    # the instances of one point: base with axis set to value, each from its own rng
+    params = dict(base, **{axis: value})
+    for k in range(seeds):
+        rng = random.Random(f"{seed}:{axis}:{value}:{k}")
+        yield generate_scaled_instance(params["n"], params["horizon"], params["slack"], params["processing"], rng)
+
+def run_once(name, jobs, timeout):
+    # (seconds, profit), or None on timeout
+    if timeout:
+        signal.signal(signal.SIGALRM, _raise_timeout)
+        signal.setitimer(signal.ITIMER_REAL, timeout)
+    start = time.perf_counter()
+    try:
+        _, profit = solvers.solve(name, [dict(job) for job in jobs])
+    except InstanceTimeout:
+        return None
+    finally:
+        if timeout:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+    return time.perf_counter() - start, profit
+
+def measure(name, jobs, timeout, min_total=0.05, max_runs=5, traced_runs=2):
+    """
+    Time and peak memory of one solver on one instance: the fastest of up to max_runs
+    untraced runs (stopping once min_total seconds are spent), then the smallest peak of
+    traced_runs runs under tracemalloc, each started after a gc.collect(). Returns
+    {"seconds", "peak_bytes", "peak_spread", "profit"}, peak_spread being the largest traced
+    peak over the smallest, minus 1; or None on timeout.
+    """
+    best, total = None, 0.0
+    for _ in range(max_runs):
+        run = run_once(name, jobs, timeout)
+        if run is None:
+            return None
+        best = run if best is None or run[0] < best[0] else best
+        total += run[0]
+        if total >= min_total:
+            break
+    peaks = []
+    for _ in range(traced_runs):
+        # garbage left by the earlier runs is not this run's memory
+        gc.collect()
+        tracemalloc.start()
+        try:
+            # tracing costs a few times the untraced run; a timeout here only loses the memory
+            traced = run_once(name, jobs, timeout and 2 * timeout)
+            if traced:
+                peaks.append(tracemalloc.get_traced_memory()[1])
+        finally:
+            tracemalloc.stop()
+        if not traced:
+            break
+    peak = min(peaks) if peaks else None
+    spread = max(peaks) / peak - 1 if peak else 0.0
+    return {"seconds": best[0], "peak_bytes": peak, "peak_spread": spread, "profit": best[1]}
+
+def run_suite(solver_names, axes=AXES, base=BASE, seeds=3, timeout=10.0, seed=0, verbose=True):
+    """
+    One point per (solver, axis, value): the median seconds and the largest peak memory
+    over the instances of the point, with peak_noise the largest peak_spread among them.
+    status is "ok", "timeout" or "skipped".
+    """
+    points = []
+    for name in solver_names:
+        solvers.load(name)      # imports are not part of the measurement
+        for axis, values in axes.items():
+            timed_out = False
+            for value in values:
+                point = {"solver": name, "axis": axis, "value": value, "seconds": None, "peak_kib": None,
+                         "peak_noise": 0.0, "status": "ok"}
+                if timed_out:
+                    point["status"] = "skipped"
+                else:
+                    runs = []
+                    for jobs in family(axis, value, base, seeds, seed):
+                        runs.append(measure(name, jobs, timeout))
+                        if runs[-1] is None:
+                            break
+                    if None in runs:
+                        point["status"] = "timeout"
+                        # categorical values are not ordered by difficulty
+                        timed_out = axis != "processing"
+                    else:
+                        point["seconds"] = statistics.median(run["seconds"] for run in runs)
+                        peaks = [run["peak_bytes"] for run in runs if run["peak_bytes"] is not None]
+                        point["peak_kib"] = max(peaks) / 1024 if peaks else None
+                        point["peak_noise"] = max(run["peak_spread"] for run in runs)
+                points.append(point)
+                if verbose:
+                    shown = f"{point['seconds'] * 1000:10.2f} ms" if point["seconds"] is not None else f"{point['status']:>13}"
+                    print(f"{name:18} {axis:10} {str(value):>8} {shown}")
+    return points
+
+def _line_fit(xs, ys):
+    # least squares y = a + b x; returns (a, b, r2)
+    mean_x, mean_y = sum(xs) / len(xs), sum(ys) / len(ys)
+    sxx = sum((x - mean_x) ** 2 for x in xs)
+    if sxx == 0:
+        return mean_y, 0.0, 0.0
+    b = sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, ys)) / sxx
+    a = mean_y - b * mean_x
+    syy = sum((y - mean_y) ** 2 for y in ys)
+    residual = sum((y - a - b * x) ** 2 for x, y in zip(xs, ys))
+    return a, b, 1 - residual / syy if syy > 0 else 1.0
+
+def fit_scaling(xs, ys):
+    """
+    Fit y ~ c x^b and y ~ c g^x in log space, on the points with y > 0 (and x > 0 for the
+    power law), each from at least three points. Returns {"model": "power" | "exponential",
+    "coefficient", "rate", "r2", "curve"} for the better fit, rate being b or g, or None.
+    """
+    pairs = [(x, y) for x, y in zip(xs, ys) if y and y > 0]
+    candidates = []
+    positive = [(x, y) for x, y in pairs if x > 0]
+    if len(positive) >= 3:
+        a, b, r2 = _line_fit([math.log(x) for x, _ in positive], [math.log(y) for _, y in positive])
+        candidates.append({"model": "power", "coefficient": math.exp(a), "rate": b, "r2": r2, "curve": f"x^{b:.2f}"})
+    if len(pairs) >= 3:
+        a, b, r2 = _line_fit([x for x, _ in pairs], [math.log(y) for _, y in pairs])
+        candidates.append({"model": "exponential", "coefficient": math.exp(a), "rate": math.exp(b), "r2": r2,
+                           "curve": f"{math.exp(b):.3f}^x"})
+    return max(candidates, key=lambda fit: fit["r2"]) if candidates else None
+
+def fits(points):
+    # {(solver, axis): {"seconds": fit, "peak_kib": fit}} on the numeric axes
+    by_series = {}
+    for point in points:
+        if point["axis"] != "processing" and point["status"] == "ok":
+            by_series.setdefault((point["solver"], point["axis"]), []).append(point)
+    return {key: {metric: fit_scaling([p["value"] for p in series], [p[metric] for p in series])
+                  for metric in ("seconds", "peak_kib")}
+            for key, series in by_series.items()}
+
+def report(points):
+    fitted = fits(points)
+    for axis in dict.fromkeys(point["axis"] for point in points):
+        values = list(dict.fromkeys(point["value"] for point in points if point["axis"] == axis))
+        print(f"\n{axis} (others at {', '.join(f'{k}={v}' for k, v in BASE.items() if k != axis)})")
+        print(f"{'solver':18} {'':6}" + "".join(f"{str(v):>10}" for v in values) + "  fit")
+        for name in dict.fromkeys(point["solver"] for point in points):
+            series = {p["value"]: p for p in points if p["solver"] == name and p["axis"] == axis}
+            for metric, label, scale in (("seconds", "ms", 1000), ("peak_kib", "KiB", 1)):
+                cells = "".join(f"{series[v][metric] * scale:10.2f}" if series[v][metric] is not None
+                                else f"{series[v]['status'][:7]:>10}" for v in values)
+                fit = fitted.get((name, axis), {}).get(metric)
+                shown = f"  {fit['curve']} (r2 {fit['r2']:.2f})" if fit else ""
+                print(f"{name if metric == 'seconds' else '':18} {label:6}{cells}{shown}")
+
+def save(path, points, axes, seeds, timeout, seed):
+    data = {
+        "created": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "base": BASE, "axes": axes, "seeds": seeds, "timeout": timeout, "seed": seed,
+        "points": points,
+        "fits": [{"solver": name, "axis": axis, **{metric: fit for metric, fit in fitted.items()}}
+                 for (name, axis), fitted in fits(points).items()],
+    }
+    with open(path, "w") as f:
+        json.dump(data, f, indent=1)
+
+def load_baseline(path):
+    with open(path) as f:
+        return json.load(f)
+
+def _matched(points, baseline):
+    # (point, baseline point) pairs that finished in the baseline
+    before = {(p["solver"], p["axis"], str(p["value"])): p for p in baseline["points"]}
+    for point in points:
+        old = before.get((point["solver"], point["axis"], str(point["value"])))
+        if old is not None and old["status"] == "ok":
+            yield point, old
+
+def speed_ratio(points, baseline, min_seconds=0.0005):
+    # median of new / old seconds over the points both runs finished: how much slower the
+    # machine is overall (shared machines drift by tens of percent between runs)
+    ratios = [point["seconds"] / old["seconds"] for point, old in _matched(points, baseline)
+              if point["status"] == "ok" and old["seconds"] >= min_seconds]
+    return statistics.median(ratios) if ratios else 1.0
+
+def compare(points, baseline, threshold=25.0, scale=1.0, min_seconds=0.0005, min_noise=0.05):
+    """
+    Regressions against a baseline run: points whose time or peak memory grew by more than
+    threshold percent and by more than the noise, and points that finished in the baseline
+    but not now. Time noise is min_seconds; memory noise is relative, the larger peak_noise
+    of the two runs (at least min_noise) times the baseline peak. Baseline times are
+    multiplied by scale first (see speed_ratio). Returns text lines.
+    """
+    regressions = []
+    for point, old in _matched(points, baseline):
+        where = f"{point['solver']} {point['axis']}={point['value']}"
+        if point["status"] != "ok":
+            regressions.append(f"{where}: {point['status']} (baseline {old['seconds'] * 1000:.2f} ms)")
+            continue
+        noise = max(point.get("peak_noise", 0.0), old.get("peak_noise", 0.0), min_noise)
+        for metric, unit, factor, base_scale in (("seconds", "ms", 1000, scale), ("peak_kib", "KiB", 1, 1.0)):
+            new_value, old_value = point[metric], old[metric] and old[metric] * base_scale
+            if new_value is None or not old_value:
+                continue
+            floor = min_seconds if metric == "seconds" else noise * old_value
+            if new_value - old_value <= floor:
+                continue
+            change = (new_value - old_value) / old_value * 100
+            if change > threshold:
+                regressions.append(f"{where}: {metric} {old_value * factor:.2f} -> {new_value * factor:.2f} {unit} (+{change:.0f}%)")
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure how the solvers scale with n, horizon, slack and processing times.")
+    parser.add_argument("--solvers", nargs="+", default=SOLVER_NAMES, choices=sorted(solvers.SOLVERS))
+    parser.add_argument("--axes", nargs="+", default=list(AXES), choices=list(AXES), help="parameters to sweep")
+    parser.add_argument("--quick", action="store_true", help="fewer values per axis")
+    parser.add_argument("--seeds", type=int, default=3, help="instances per point")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--timeout", type=float, default=10.0, help="seconds per solver run (0: none)")
+    parser.add_argument("--output", default=None, help="write this run as JSON")
+    parser.add_argument("--save-baseline", default=None, help="write this run as the baseline file")
+    parser.add_argument("--baseline", default=None, help="compare against this baseline file")
+    parser.add_argument("--threshold", type=float, default=25.0, help="percent growth flagged as a regression")
+    parser.add_argument("--normalize", action="store_true", help="divide out the overall speed change against the baseline")
+    args = parser.parse_args(argv)
+
+    axes = {axis: values for axis, values in (QUICK_AXES if args.quick else AXES).items() if axis in args.axes}
+    if args.baseline:
+        # compare like with like: sweep what the baseline swept
+        baseline = load_baseline(args.baseline)
+        if baseline["base"] != BASE:
+            print(f"warning: baseline base point {baseline['base']} differs from {BASE}")
+        axes = {axis: values for axis, values in baseline["axes"].items() if axis in args.axes}
+        args.seeds, args.seed = baseline["seeds"], baseline["seed"]
+
+    start = time.perf_counter()
+    points = run_suite(args.solvers, axes, BASE, args.seeds, args.timeout or None, args.seed)
+    report(points)
+    print(f"\n{len(points)} points in {time.perf_counter() - start:.1f}s")
+    for path in (args.output, args.save_baseline):
+        if path:
+            save(path, points, axes, args.seeds, args.timeout, args.seed)
+            print(f"Results saved to {path}")
+
+    if args.baseline:
+        ratio = speed_ratio(points, baseline)
+        print(f"\nMedian time against the baseline: x{ratio:.2f}" + (" (divided out)" if args.normalize else ""))
+        regressions = compare(points, baseline, args.threshold, ratio if args.normalize else 1.0)
+        print(f"{len(regressions)} regressions over {args.threshold:g}% against {args.baseline}")
+        for line in regressions:
+            print("  " + line)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,134 @@
+import mmap
+import os
+import struct
+import sys
+import time
+from array import array
+import numpy as np
+from jobset import JobSet
+from read_file import parse_jobs
+
+# ---------------------------
+# Binary instance corpus
+# ---------------------------
+# python corpus.py job_scheduling_instances.zip corpus.jsc
+#
+# One file for a whole corpus, read through a memory map, so opening it parses nothing and
+# instance k is a slice of every column: O(1), no copy. Little-endian layout:
+#   header         magic, instances K, jobs N, name bytes       (HEADER)
+#   offsets        int64[K + 1]   jobs of instance k are offsets[k]:offsets[k + 1]
+#   name offsets   int64[K + 1]   same for the bytes of its name
+#   r, d, p, w, l  int32[N] each, all instances back to back
+#   names          utf-8
+# Job ids are not stored: they are 1..n within an instance, as in the text files.
+
+MAGIC = b"JSCORP\x00\x01"
+HEADER = struct.Struct("<8sQQQ")
+COLUMNS = ("r", "d", "p", "w", "l")
+
+def write_corpus(path, instances):
+    """
+    Write (name, jobs) pairs (job dicts or JobSets) as one corpus file; returns the number of
+    instances. Values must fit in int32 (OverflowError otherwise).
+    """
+    offsets, name_offsets, names = array("q", [0]), array("q", [0]), bytearray()
+    columns = {key: array("i") for key in COLUMNS}
+    for name, jobs in instances:
+        for key in COLUMNS:
+            columns[key].extend(job[key] for job in jobs)
+        offsets.append(len(columns["r"]))
+        names += name.encode()
+        name_offsets.append(len(names))
+    with open(path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, len(offsets) - 1, len(columns["r"]), len(names)))
+        f.write(np.asarray(offsets, dtype="<i8").tobytes())
+        f.write(np.asarray(name_offsets, dtype="<i8").tobytes())
+        for key in COLUMNS:
+            f.write(np.asarray(columns[key], dtype="<i4").tobytes())
+        f.write(names)
+    return len(offsets) - 1
+
+class Corpus:
+    """
+    A corpus file opened through a read-only memory map. columns(k) are zero-copy int32 views;
+    jobs(k) and jobset(k) copy instance k into the types the solvers take.
+    Views handed out keep the map alive; close() (or the with block) releases the corpus' own.
+    """
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, count, n_jobs, name_bytes = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path}: not a corpus file")
+        pos = HEADER.size
+        self.offsets = np.frombuffer(self._map, dtype="<i8", count=count + 1, offset=pos)
+        pos += 8 * (count + 1)
+        self.name_offsets = np.frombuffer(self._map, dtype="<i8", count=count + 1, offset=pos)
+        pos += 8 * (count + 1)
+        self._columns = {}
+        for key in COLUMNS:
+            self._columns[key] = np.frombuffer(self._map, dtype="<i4", count=n_jobs, offset=pos)
+            pos += 4 * n_jobs
+        self._names_at = pos
+        self._index = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.offsets = self.name_offsets = self._columns = None
+        try:
+            self._map.close()
+        except BufferError:
+            pass    # views still in use; the map goes with the last of them
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def name(self, k):
+        start, end = self.name_offsets[k], self.name_offsets[k + 1]
+        return self._map[self._names_at + start:self._names_at + end].decode()
+
+    def find(self, name):
+        # index of an instance by name (the name table is read on first use)
+        if self._index is None:
+            self._index = {self.name(k): k for k in range(len(self))}
+        return self._index[name]
+
+    def columns(self, k):
+        start, end = self.offsets[k], self.offsets[k + 1]
+        return {key: column[start:end] for key, column in self._columns.items()}
+
+    def jobs(self, k):
+        columns = self.columns(k)
+        rows = zip(*(columns[key].tolist() for key in COLUMNS))
+        return [{"id": j+1, "r": r, "d": d, "p": p, "w": w, "l": l} for j, (r, d, p, w, l) in enumerate(rows)]
+
+    def jobset(self, k):
+        columns = self.columns(k)
+        return JobSet.from_buffers(*(np.ascontiguousarray(columns[key], dtype=np.int64) for key in COLUMNS))
+
+    def items(self):
+        # (name, job dicts) for every instance, in order
+        for k in range(len(self)):
+            yield self.name(k), self.jobs(k)
+
+def convert(sources, path, pattern="*.txt"):
+    # text instances (files, globs, zips: as in run.py) into one corpus file
+    from run import iter_instances
+    instances = ((os.path.splitext(os.path.basename(name))[0], parse_jobs(text))
+                 for name, text in iter_instances(sources, pattern))
+    return write_corpus(path, instances)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 3:
+        print("usage: python corpus.py SOURCE [SOURCE ...] OUTPUT.jsc")
+        sys.exit(1)
+    start = time.perf_counter()
+    count = convert(sys.argv[1:-1], sys.argv[-1])
+    print(f"{count} instances written to {sys.argv[-1]} in {time.perf_counter() - start:.2f}s")
@@ -0,0 +1,91 @@
+import heapq
+
+# ---------------------------
+# EDF feasibility for preemptive unit-slot scheduling
+# ---------------------------
+def edf_runs(jobs):
+    """
+    Preemptive earliest-deadline-first on a single machine.
+    Returns a list of runs (job_id, start, length) covering every job's p slots,
+    or None if some job would miss its deadline. Work is O(n log n): the clock
+    jumps from event to event instead of stepping through every slot.
+    """
+    order = sorted(jobs, key=lambda x: x["r"])
+    runs = []
+    ready = []          # (d, id, remaining)
+    t = None
+    k = 0
+    n = len(order)
+    while k < n or ready:
+        if not ready:
+            t = order[k]["r"] if t is None else max(t, order[k]["r"])
+        while k < n and order[k]["r"] <= t:
+            j = order[k]
+            if j["p"] > 0:
+                heapq.heappush(ready, (j["d"], j["id"], j["p"]))
+            k += 1
+        if not ready:
+            continue
+        d, job_id, remaining = heapq.heappop(ready)
+        next_release = order[k]["r"] if k < n else None
+        length = remaining if next_release is None else min(remaining, next_release - t)
+        if t + length - 1 > d:
+            return None
+        runs.append((job_id, t, length))
+        t += length
+        if length < remaining:
+            heapq.heappush(ready, (d, job_id, remaining - length))
+    return runs
+
+def edf_feasible(jobs):
+    return edf_runs(jobs) is not None
+
+def edf_slots(jobs):
+    # expand EDF runs into concrete slot lists: {job_id: [t, ...]}
+    runs = edf_runs(jobs)
+    if runs is None:
+        return None
+    slots = {job["id"]: [] for job in jobs}
+    for job_id, start, length in runs:
+        slots[job_id].extend(range(start, start + length))
+    return slots
+
+# ---------------------------
+# Incremental Hall test for deadline-ordered acceptance
+# ---------------------------
+def fits_after(accepted, job):
+    """
+    Can job be added to the feasible set accepted, whose deadlines are all <= job["d"]?
+    By Hall's condition only the intervals [a, d_job] with a <= r_job can break, i.e.
+    (work released at or after a) + p_job <= d_job - a + 1 for every release a <= r_job.
+    accepted must be sorted by release; callers keep it so as they accept jobs
+    (bisect.insort(accepted, job, key=release)). Costs O(k) in the number of accepted
+    jobs, whatever the size of the time values.
+    """
+    load = job["p"]
+    a = job["r"]
+    for other in reversed(accepted):
+        if other["r"] < a:
+            if load > job["d"] - a + 1:
+                return False
+            a = other["r"]
+        load += other["p"]
+    return load <= job["d"] - a + 1
+
+def release(job):
+    return job["r"]
+
+def backlog_accept(backlog, points, job):
+    """
+    Jobs are decided in deadline order. For a time x, backlog[x] is the accepted work
+    that still has to run at or after x: max over a <= x of (work released at or after a)
+    - (x - a). A job fits iff backlog[r] + p <= d - r + 1, and these profiles are all the
+    later jobs need to know about the decisions made so far.
+    Returns the profile after accepting job, or None if it does not fit.
+    """
+    k = points.index(job["r"])
+    if backlog[k] + job["p"] > job["d"] - job["r"] + 1:
+        return None
+    carried = backlog[k] + job["p"]
+    return tuple(e + job["p"] if t <= job["r"] else max(e, carried - (t - job["r"]))
+                 for e, t in zip(backlog, points))
@@ -1,11 +1,9 @@
-
+import argparse
 import random
 import os
+import sys
 import zipfile
-
-# Create directory to hold instances
-output_dir = "job_scheduling_instances"
-os.makedirs(output_dir, exist_ok=True)
+import corpus
 
 # Configuration
 num_instances = 1000
@@ -14,33 +12,93 @@ max_jobs = 19
 min_time_slot = 1
 max_time_slot = 100
 
-for instance_id in range(1, num_instances + 1):
-    n = random.randint(min_jobs, max_jobs)
-    lines = [str(n)]
-    
-    for _ in range(n):
-        rj = random.randint(min_time_slot, max_time_slot - 10)
-        pj = random.randint(1, 10)
-        dj = random.randint(rj + pj, rj + pj + 20)
-        wj = random.randint(10, 100)
-        lj = random.randint(5, 50)
-        
-        line = f"{rj},{dj},{pj},{wj},{lj}"
-        lines.append(line)
-    
-    filename = f"instance_{instance_id:04d}.txt"
-    filepath = os.path.join(output_dir, filename)
-    
-    with open(filepath, 'w') as f:
-        f.write("\n".join(lines))
-
-# Zip all files
-zip_filename = "job_scheduling_instances.zip"
-with zipfile.ZipFile(zip_filename, 'w', zipfile.ZIP_DEFLATED) as zipf:
-    for root, _, files in os.walk(output_dir):
-        for file in files:
-            file_path = os.path.join(root, file)
-            arcname = os.path.relpath(file_path, output_dir)
-            zipf.write(file_path, arcname)
-
-print(f"All {num_instances} instances generated and zipped as '{zip_filename}'.")
\ No newline at end of file
+def generate_instance(rng=random):
+    # one random instance as job dicts (ids 1..n)
+    n = rng.randint(min_jobs, max_jobs)
+    jobs = []
+    for j in range(n):
+        rj = rng.randint(min_time_slot, max_time_slot - 10)
+        pj = rng.randint(1, 10)
+        dj = rng.randint(rj + pj, rj + pj + 20)
+        wj = rng.randint(10, 100)
+        lj = rng.randint(5, 50)
+        jobs.append({"id": j+1, "r": rj, "d": dj, "p": pj, "w": wj, "l": lj})
+    return jobs
+
+def generate_long_instance(batches, rng=random, spacing=50):
+    # batches instances laid out every spacing slots, so their windows overlap; ids 1..n
+    jobs = []
+    for k in range(batches):
+        for job in generate_instance(rng):
+            jobs.append(dict(job, id=len(jobs) + 1, r=job["r"] + spacing * k, d=job["d"] + spacing * k))
+    return jobs
+
+PROCESSING = {
+    # processing-time distributions for generate_scaled_instance: p_max -> one p
+    "uniform": lambda rng, p_max: rng.randint(1, p_max),
+    "short": lambda rng, p_max: rng.randint(1, max(1, p_max // 4)),
+    "long": lambda rng, p_max: rng.randint(max(1, 3 * p_max // 4), p_max),
+    "bimodal": lambda rng, p_max: 1 if rng.random() < 0.5 else rng.randint(max(1, 3 * p_max // 4), p_max),
+}
+
+def generate_scaled_instance(n, horizon, slack, processing="uniform", rng=random):
+    # n jobs inside slots 1..horizon; each window is p plus 0..slack spare slots, p <= horizon / 8
+    p_max = max(1, horizon // 8)
+    jobs = []
+    for j in range(n):
+        pj = min(PROCESSING[processing](rng, p_max), horizon)
+        window = min(pj + rng.randint(0, slack), horizon)
+        rj = rng.randint(1, horizon - window + 1)
+        jobs.append({"id": j+1, "r": rj, "d": rj + window - 1, "p": pj,
+                     "w": rng.randint(10, 100), "l": rng.randint(5, 50)})
+    return jobs
+
+def generate_instances(count=num_instances, seed=None):
+    # (name, jobs) pairs: instance_0001, instance_0002, ...
+    rng = random.Random(seed) if seed is not None else random
+    for instance_id in range(1, count + 1):
+        yield f"instance_{instance_id:04d}", generate_instance(rng)
+
+def instance_text(jobs):
+    lines = [str(len(jobs))]
+    for job in jobs:
+        lines.append(f"{job['r']},{job['d']},{job['p']},{job['w']},{job['l']}")
+    return "\n".join(lines)
+
+def write_text_instances(instances, output_dir="job_scheduling_instances", zip_filename="job_scheduling_instances.zip"):
+    # one .txt per instance in output_dir, then all of them zipped
+    os.makedirs(output_dir, exist_ok=True)
+    count = 0
+    for name, jobs in instances:
+        with open(os.path.join(output_dir, f"{name}.txt"), 'w') as f:
+            f.write(instance_text(jobs))
+        count += 1
+
+    with zipfile.ZipFile(zip_filename, 'w', zipfile.ZIP_DEFLATED) as zipf:
+        for root, _, files in os.walk(output_dir):
+            for file in files:
+                file_path = os.path.join(root, file)
+                arcname = os.path.relpath(file_path, output_dir)
+                zipf.write(file_path, arcname)
+    return count
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate random job scheduling instances.")
+    parser.add_argument("--instances", type=int, default=num_instances)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--output-dir", default="job_scheduling_instances")
+    parser.add_argument("--zip", default="job_scheduling_instances.zip")
+    parser.add_argument("--corpus", default=None, help="write a binary corpus (corpus.py) instead of text files")
+    args = parser.parse_args(argv)
+
+    instances = generate_instances(args.instances, args.seed)
+    if args.corpus:
+        count = corpus.write_corpus(args.corpus, instances)
+        print(f"All {count} instances generated into the corpus '{args.corpus}'.")
+    else:
+        count = write_text_instances(instances, args.output_dir, args.zip)
+        print(f"All {count} instances generated and zipped as '{args.zip}'.")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,152 @@
+from array import array
+from itertools import repeat
+
+# ---------------------------
+# Columnar jobs
+# ---------------------------
+# A JobSet keeps one typed column per field (array('q'), 8 bytes per value) instead of one
+# dict per job, and is never written by a solver: what a run changes (remaining work,
+# outcome, slots) lives in a RunState next to it. JobView is a read-only job on top of the
+# columns, with attribute and job["r"]-style access, for code that wants one job at a time.
+# Columns support the buffer protocol, e.g. numpy.frombuffer(jobs.r, dtype=numpy.int64).
+
+FIELDS = ("id", "r", "d", "p", "w", "l")
+
+class JobView:
+    __slots__ = ("jobs", "index")
+
+    def __init__(self, jobs, index):
+        self.jobs = jobs
+        self.index = index
+
+    def __getitem__(self, key):
+        if key not in FIELDS:
+            raise KeyError(key)
+        return getattr(self.jobs, key)[self.index]
+
+    def keys(self):
+        return FIELDS
+
+    def __repr__(self):
+        return f"JobView({dict(self)})"
+
+    id = property(lambda self: self.jobs.id[self.index])
+    r = property(lambda self: self.jobs.r[self.index])
+    d = property(lambda self: self.jobs.d[self.index])
+    p = property(lambda self: self.jobs.p[self.index])
+    w = property(lambda self: self.jobs.w[self.index])
+    l = property(lambda self: self.jobs.l[self.index])
+
+class JobSet:
+    """
+    n jobs as the columns id, r, d, p, w, l. Jobs are addressed by their index (0..n-1),
+    jobs[i] is a JobView and rows() iterates plain (id, r, d, p, w, l) tuples, the fast
+    way through a hot loop. parse/read take the instance file format of read_file.
+    """
+    __slots__ = FIELDS
+
+    def __init__(self, id=(), r=(), d=(), p=(), w=(), l=()):
+        self.id, self.r, self.d = array("q", id), array("q", r), array("q", d)
+        self.p, self.w, self.l = array("q", p), array("q", w), array("q", l)
+
+    @classmethod
+    def from_dicts(cls, jobs):
+        return cls(*([job[key] for job in jobs] for key in FIELDS))
+
+    @classmethod
+    def from_buffers(cls, r, d, p, w, l, id=None):
+        # columns copied from contiguous int64 buffers (e.g. numpy arrays), without Python ints
+        jobs = cls(id=range(1, len(r) + 1) if id is None else ())
+        if id is not None:
+            jobs.id.frombytes(memoryview(id).cast("B"))
+        for column, values in zip((jobs.r, jobs.d, jobs.p, jobs.w, jobs.l), (r, d, p, w, l)):
+            column.frombytes(memoryview(values).cast("B"))
+        return jobs
+
+    @classmethod
+    def zeros(cls, n):
+        # ids 1..n, every other column 0, to be filled in place (e.g. through numpy.frombuffer)
+        jobs = cls(id=range(1, n + 1))
+        for key in FIELDS[1:]:
+            setattr(jobs, key, array("q", [0]) * n)
+        return jobs
+
+    @classmethod
+    def parse(cls, text):
+        lines = [line for line in text.splitlines() if line.strip()]
+        n = int(lines[0])
+        jobs = cls(id=range(1, n + 1))
+        columns = (jobs.r, jobs.d, jobs.p, jobs.w, jobs.l)
+        for line in lines[1:n + 1]:
+            for column, value in zip(columns, line.split(",")):
+                column.append(int(value))
+        return jobs
+
+    @classmethod
+    def read(cls, filename):
+        with open(filename) as f:
+            return cls.parse(f.read())
+
+    def __len__(self):
+        return len(self.id)
+
+    def __getitem__(self, i):
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError(i)
+        return JobView(self, i)
+
+    def __iter__(self):
+        return (JobView(self, i) for i in range(len(self)))
+
+    def rows(self):
+        return zip(self.id, self.r, self.d, self.p, self.w, self.l)
+
+    @property
+    def nbytes(self):
+        return sum(getattr(self, key).itemsize * len(self) for key in FIELDS)
+
+    def to_dicts(self):
+        return [dict(zip(FIELDS, row)) for row in self.rows()]
+
+class RunState:
+    """
+    What one run on a JobSet changes: remaining work and done flag per job, and the busy
+    slots as parallel (slot_time, slot_job) columns, i.e. the calendar, in assignment order.
+    """
+    __slots__ = ("remaining", "done", "slot_time", "slot_job")
+
+    def __init__(self, jobs):
+        self.remaining = array("q", jobs.p)
+        self.done = array("b", bytes(len(jobs)))
+        self.slot_time = array("q")
+        self.slot_job = array("q")
+
+    def assign(self, i, slots):
+        # job i gets slots (an iterable of time slots)
+        start = len(self.slot_time)
+        self.slot_time.extend(slots)
+        self.slot_job.extend(repeat(i, len(self.slot_time) - start))
+
+    def slots(self):
+        # slot list per job index (empty if none), in assignment order
+        per_job = [[] for _ in range(len(self.done))]
+        for t, i in zip(self.slot_time, self.slot_job):
+            per_job[i].append(t)
+        return per_job
+
+    def assigned(self, jobs):
+        # {job id: [slots]}, the solvers.solve result format
+        return dict(zip(jobs.id, self.slots()))
+
+    def job_dicts(self, jobs):
+        # job dicts with assigned_slots (None if empty), for the reporting writers
+        dicts = jobs.to_dicts()
+        for job, slots in zip(dicts, self.slots()):
+            job["assigned_slots"] = slots or None
+        return dicts
+
+def as_job_dicts(jobs):
+    # job dicts for the solvers that annotate them; lists of dicts pass through unchanged
+    return jobs.to_dicts() if isinstance(jobs, JobSet) else jobs
@@ -1,129 +1,89 @@
-import os
-from datetime import datetime
-import pandas as pd
 from read_file import read_jobs
-
-# Test instance optimal profits for reference
-optimal_profits = {
-    "test1": 133,
-    "test2": 44,
-    "test3": 30,
-    "test4": 10,
-    "test5": 0,
-    "test6": 130,
-    "test7": 70
-}
+from jobset import as_job_dicts
+import reporting
+from reporting import optimal_profits, log_results_csv
+from timeline import segments, job_span, first_fit, expand
 
 def get_time_horizon(jobs):
     return max(job["d"] for job in jobs)   # deadline inclusive
 
-def dp_schedule(jobs, test_case_name):
+def dp_schedule(jobs, test_case_name, verbose=True, save=True):
     n = len(jobs)
-    jobs = sorted(jobs, key=lambda x: x["d"])
+    jobs = sorted(as_job_dicts(jobs), key=lambda x: x["d"])
+
+    # work on the compressed timeline: the state is the used slot count per segment
+    segs = segments(jobs)
+    spans = [job_span(segs, job) for job in jobs]
 
     from functools import lru_cache
     @lru_cache(None)
-    def dp(i, used_mask):
+    def dp(i, used):
         if i == n:
             return 0
         job = jobs[i]
         best = -10**9
-        skip_profit = -job["l"] + dp(i+1, used_mask)
+        skip_profit = -job["l"] + dp(i+1, used)
         best = max(best, skip_profit)
-        available_slots = [t for t in range(job["r"], job["d"]+1) if not (used_mask >> t) & 1]
-        if len(available_slots) >= job["p"]:
-            new_mask = used_mask
-            for t in available_slots[:job["p"]]:
-                new_mask |= (1 << t)
-            take_profit = job["w"] + dp(i+1, new_mask)
+        fit = first_fit(segs, used, spans[i], job["p"])
+        if fit is not None:
+            take_profit = job["w"] + dp(i+1, fit[0])
             best = max(best, take_profit)
         return best
 
-    total_profit = dp(0, 0)
+    empty = tuple(0 for _ in segs)
+    total_profit = dp(0, empty)
     assigned = {job["id"]: [] for job in jobs}
     status = {}
     scheduled_jobs = []
 
-    def reconstruct(i, used_mask):
+    def reconstruct(i, used):
         if i == n:
             return
         job = jobs[i]
-        skip_profit = -job["l"] + dp(i+1, used_mask)
-        best = dp(i, used_mask)
+        skip_profit = -job["l"] + dp(i+1, used)
+        best = dp(i, used)
         if best == skip_profit:
             status[job["id"]] = f"NOT done → -{job['l']}"
             job["assigned_slots"] = None
             scheduled_jobs.append(job)
-            reconstruct(i+1, used_mask)
+            reconstruct(i+1, used)
             return
-        available_slots = [t for t in range(job["r"], job["d"]+1) if not (used_mask >> t) & 1]
-        new_mask = used_mask
-        slots = []
-        for t in available_slots[:job["p"]]:
-            new_mask |= (1 << t)
-            assigned[job["id"]].append(t)
-            slots.append(t)
+        new_used, runs = first_fit(segs, used, spans[i], job["p"])
+        slots = expand(runs)
+        assigned[job["id"]].extend(slots)
         status[job["id"]] = f"DONE → +{job['w']}"
         job["assigned_slots"] = slots
         scheduled_jobs.append(job)
-        reconstruct(i+1, new_mask)
+        reconstruct(i+1, new_used)
+
+    reconstruct(0, empty)
 
-    reconstruct(0, 0)
+    if verbose:
+        # Pretty print
+        print("Schedule results:")
+        for job in jobs:
+            slots = assigned[job["id"]]
+            print(f"Job {job['id']} {status[job['id']]}, slots = {slots if slots else 'null'}")
 
-    # Pretty print
-    print("Schedule results:")
-    for job in jobs:
-        slots = assigned[job["id"]]
-        print(f"Job {job['id']} {status[job['id']]}, slots = {slots if slots else 'null'}")
-    
-    # Extract base test name and show optimal comparison
-    base_test_name = test_case_name.replace('_offline', '').replace('_online', '')
-    optimal = optimal_profits.get(base_test_name, 'N/A')
-    print(f"\nTotal profit: {total_profit} | Optimal: {optimal}")
+        # Extract base test name and show optimal comparison
+        base_test_name = test_case_name.replace('_offline', '').replace('_online', '')
+        optimal = optimal_profits.get(base_test_name, 'N/A')
+        print(f"\nTotal profit: {total_profit} | Optimal: {optimal}")
 
     # Save results
-    save_results_txt(test_case_name, scheduled_jobs, total_profit)
-    log_results_csv(test_case_name, scheduled_jobs, total_profit)
+    if save:
+        save_results_txt(test_case_name, scheduled_jobs, total_profit)
+        log_results_csv(test_case_name, scheduled_jobs, total_profit)
 
     return assigned, total_profit
 
 
-# ---------------------------
-# Save results to CSV
-# ---------------------------
-def log_results_csv(test_case_name, scheduled_jobs, total_profit, csv_file="results_log.csv"):
-    job_details = []
-    for job in scheduled_jobs:
-        slots = ",".join(map(str, job.get("assigned_slots", []))) if job.get("assigned_slots") else "null"
-        job_details.append(f"id:{job['id']} r:{job['r']} d:{job['d']} p:{job['p']} w:{job['w']} l:{job['l']} slots:{slots}")
-    log_data = {
-        "date": datetime.now().date(),
-        "time": datetime.now().time().strftime("%H:%M:%S"),
-        "test_case": test_case_name,
-        "total_profit": total_profit,
-        "job_details": " | ".join(job_details)
-    }
-    df_log = pd.DataFrame([log_data])
-    if os.path.exists(csv_file):
-        df_log.to_csv(csv_file, mode="a", index=False, header=False)
-    else:
-        df_log.to_csv(csv_file, index=False, header=True)
-
 # ---------------------------
 # Save results to txt file
 # ---------------------------
 def save_results_txt(test_case_name, scheduled_jobs, total_profit, output_folder="results"):
-    if not os.path.exists(output_folder):
-        os.makedirs(output_folder)
-    output_path = os.path.join(output_folder, f"{test_case_name}_offline.txt")
-    with open(output_path, "w") as f:
-        for job in sorted(scheduled_jobs, key=lambda x: x["id"]):
-            if job.get("assigned_slots"):
-                f.write(",".join(map(str, job["assigned_slots"])) + "\n")
-            else:
-                f.write("null\n")
-        f.write(str(total_profit) + "\n")
-    print(f"\nResults saved to {output_path}")
+    # offline schedules go to results/<test_case_name>_offline.txt
+    reporting.save_results_txt(f"{test_case_name}_offline", scheduled_jobs, total_profit, output_folder)
 
 
 if __name__ == "__main__":
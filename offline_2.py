@@ -1,152 +1,126 @@
-import os
-from datetime import datetime
-import pandas as pd
 import itertools
+import sys
 from read_file import read_jobs
-
-# Test instance optimal profits for reference
-optimal_profits = {
-    "test1": 133,
-    "test2": 44,
-    "test3": 15,
-    "test4": 10,
-    "test5": 0,
-    "test6": 130,
-    "test7": 70
-}
+from jobset import as_job_dicts
+from offline import optimal_profits, save_results_txt, log_results_csv
+from state_reduction import (layer_segments, segment_masks, canonical_key, canonical_choices,
+                             choice_counts, replay_choice, pointer_bytes, DominanceIndex)
 
 def get_time_horizon(jobs):
     return max(job["d"] for job in jobs)   # deadline inclusive
 
-def dp_schedule(jobs, test_case_name):
+def dp_schedule(jobs, test_case_name, reduce_states=True, stats=None, verbose=True, save=True):
     n = len(jobs)
-    jobs = sorted(jobs, key=lambda x: x["d"])
+    jobs = sorted(as_job_dicts(jobs), key=lambda x: x["d"])
+    segments = layer_segments(jobs)
+    masks = [segment_masks(layer) for layer in segments]
+    children = dominated = 0
+    index = DominanceIndex(n + 1)   # solved reduced states per layer
+
+    def state_key(i, used_mask):
+        # memo key: the used slots as seen by jobs i..n-1 (see state_reduction.py)
+        return canonical_key(used_mask, masks[i]) if reduce_states else used_mask
+
+    def choices(i, available_slots):
+        job = jobs[i]
+        if reduce_states:
+            return canonical_choices(available_slots, job["p"], segments[i+1])
+        return itertools.combinations(available_slots, job["p"])
+
+    memo = {}
+    pointers = {}   # same keys as memo: None (skip) or the winning choice, see record()
+
+    def record(i, chosen):
+        # a slot set only holds for the mask it was found on; reduced states store counts
+        return choice_counts(chosen, segments[i+1]) if reduce_states else chosen
 
-    from functools import lru_cache
-    @lru_cache(None)
     def dp(i, used_mask):
+        nonlocal children, dominated
         if i == n:
             return 0
+        key = (i, state_key(i, used_mask))
+        if key in memo:
+            return memo[key]
         job = jobs[i]
-        best = -10**9
-        skip_profit = -job["l"] + dp(i+1, used_mask)
-        best = max(best, skip_profit)
+        best = -job["l"] + dp(i+1, used_mask)
+        decision = None
         available_slots = [t for t in range(job["r"], job["d"]+1) if not (used_mask >> t) & 1]
         if len(available_slots) >= job["p"]:
-            for chosen in itertools.combinations(available_slots, job["p"]):
+            for chosen in choices(i, available_slots):
+                children += 1
                 new_mask = used_mask
                 for t in chosen:
                     new_mask |= (1 << t)
+                child = (i+1, state_key(i+1, new_mask))
+                if reduce_states and child not in memo and index.dominated(*child, best - job["w"]):
+                    dominated += 1      # cannot beat best, and ties keep the earlier choice anyway
+                    continue
                 take_profit = job["w"] + dp(i+1, new_mask)
-                best = max(best, take_profit)
+                if take_profit > best:      # ties keep the skip / the first combination
+                    best, decision = take_profit, record(i, chosen)
+        memo[key] = best
+        pointers[key] = decision
+        if reduce_states:
+            index.add(i, key[1], best)
         return best
 
     total_profit = dp(0, 0)
+    if stats is not None:
+        stats["states"] = len(memo)
+        stats["children"] = children
+        stats["dominated"] = dominated
+        stats["pointer_bytes"] = pointer_bytes(pointers)
     assigned = {job["id"]: [] for job in jobs}
     status = {}
     scheduled_jobs = []
 
-    def reconstruct(i, used_mask):
-        if i == n:
-            return
-        job = jobs[i]
-        skip_profit = -job["l"] + dp(i+1, used_mask)
-        best = dp(i, used_mask)
-        if best == skip_profit:
+    # Follow the recorded decisions from the empty calendar, one lookup per job
+    used_mask = 0
+    for i, job in enumerate(jobs):
+        decision = pointers[(i, state_key(i, used_mask))]
+        if decision is None:
             status[job["id"]] = f"NOT done → -{job['l']}"
             job["assigned_slots"] = None
             scheduled_jobs.append(job)
-            reconstruct(i+1, used_mask)
-            return
-        
-        # Find the best combination that leads to the optimal solution
-        available_slots = [t for t in range(job["r"], job["d"]+1) if not (used_mask >> t) & 1]
-        best_chosen = None
-        best_value = -10**9
-        
-        for chosen in itertools.combinations(available_slots, job["p"]):
-            new_mask = used_mask
-            for t in chosen:
-                new_mask |= (1 << t)
-            value = job["w"] + dp(i+1, new_mask)
-            if value > best_value:
-                best_value = value
-                best_chosen = chosen
-        
-        # Apply the best combination
-        new_mask = used_mask
-        slots = []
-        for t in best_chosen:
-            new_mask |= (1 << t)
+            continue
+        if reduce_states:
+            available_slots = [t for t in range(job["r"], job["d"]+1) if not (used_mask >> t) & 1]
+            decision = replay_choice(available_slots, job["p"], segments[i+1], decision)
+        for t in decision:
+            used_mask |= (1 << t)
             assigned[job["id"]].append(t)
-            slots.append(t)
-        
         status[job["id"]] = f"DONE → +{job['w']}"
-        job["assigned_slots"] = sorted(slots)
+        job["assigned_slots"] = sorted(decision)
         scheduled_jobs.append(job)
-        reconstruct(i+1, new_mask)
 
-    reconstruct(0, 0)
+    if verbose:
+        # Pretty print
+        print("Schedule results:")
+        for job in jobs:
+            slots = assigned[job["id"]]
+            print(f"Job {job['id']} {status[job['id']]}, slots = {slots if slots else 'null'}")
 
-    # Pretty print
-    print("Schedule results:")
-    for job in jobs:
-        slots = assigned[job["id"]]
-        print(f"Job {job['id']} {status[job['id']]}, slots = {slots if slots else 'null'}")
-    
-    # Extract base test name and show optimal comparison
-    base_test_name = test_case_name.replace('_offline', '').replace('_online', '')
-    optimal = optimal_profits.get(base_test_name, 'N/A')
-    print(f"\nTotal profit: {total_profit} | Optimal: {optimal}")
+        # Extract base test name and show optimal comparison
+        base_test_name = test_case_name.replace('_offline', '').replace('_online', '')
+        optimal = optimal_profits.get(base_test_name, 'N/A')
+        print(f"\nTotal profit: {total_profit} | Optimal: {optimal}")
 
     # Save results
-    save_results_txt(test_case_name, scheduled_jobs, total_profit)
-    log_results_csv(test_case_name, scheduled_jobs, total_profit)
+    if save:
+        save_results_txt(test_case_name, scheduled_jobs, total_profit)
+        log_results_csv(test_case_name, scheduled_jobs, total_profit)
 
     return assigned, total_profit
 
 
-# ---------------------------
-# Save results to CSV
-# ---------------------------
-def log_results_csv(test_case_name, scheduled_jobs, total_profit, csv_file="results_log.csv"):
-    job_details = []
-    for job in scheduled_jobs:
-        slots = ",".join(map(str, job.get("assigned_slots", []))) if job.get("assigned_slots") else "null"
-        job_details.append(f"id:{job['id']} r:{job['r']} d:{job['d']} p:{job['p']} w:{job['w']} l:{job['l']} slots:{slots}")
-    log_data = {
-        "date": datetime.now().date(),
-        "time": datetime.now().time().strftime("%H:%M:%S"),
-        "test_case": test_case_name,
-        "total_profit": total_profit,
-        "job_details": " | ".join(job_details)
-    }
-    df_log = pd.DataFrame([log_data])
-    if os.path.exists(csv_file):
-        df_log.to_csv(csv_file, mode="a", index=False, header=False)
-    else:
-        df_log.to_csv(csv_file, index=False, header=True)
-
-# ---------------------------
-# Save results to txt file
-# ---------------------------
-def save_results_txt(test_case_name, scheduled_jobs, total_profit, output_folder="results"):
-    if not os.path.exists(output_folder):
-        os.makedirs(output_folder)
-    output_path = os.path.join(output_folder, f"{test_case_name}_offline.txt")
-    with open(output_path, "w") as f:
-        for job in sorted(scheduled_jobs, key=lambda x: x["id"]):
-            if job.get("assigned_slots"):
-                f.write(",".join(map(str, job["assigned_slots"])) + "\n")
-            else:
-                f.write("null\n")
-        f.write(str(total_profit) + "\n")
-    print(f"\nResults saved to {output_path}")
-
-
 if __name__ == "__main__":
+    # python offline_2.py [--memory]     (--memory: also report the states and back-pointer memory)
+    memory = "--memory" in sys.argv
     test_cases = ["test1", "test2", "test3", "test4", "test5", "test6", "test7"]
     for test_case in test_cases:
         jobs = read_jobs(f"test/{test_case}.txt")
-        assigned, profit = dp_schedule(jobs, test_case)
+        stats = {} if memory else None
+        assigned, profit = dp_schedule(jobs, test_case, stats=stats)
+        if memory and stats:
+            print(f"{stats['states']} states, back-pointers {stats['pointer_bytes'] / 1024:.1f} KiB")
         print("\n" + "-"*50 + "\n")
@@ -1,155 +1,129 @@
-import os
-from datetime import datetime
-import pandas as pd
 from itertools import combinations
+import sys
 from read_file import read_jobs
-
-# Test instance optimal profits for reference
-optimal_profits = {
-    "test1": 133,
-    "test2": 44,
-    "test3": 15,
-    "test4": 10,
-    "test5": 0,
-    "test6": 130,
-    "test7": 70
-}
+from jobset import as_job_dicts
+from offline import optimal_profits, save_results_txt, log_results_csv
+import offline_subset
+from state_reduction import (layer_segments, segment_masks, canonical_key, canonical_choices,
+                             choice_counts, replay_choice, pointer_bytes, DominanceIndex)
 
 def get_time_horizon(jobs):
     return max(job["d"] for job in jobs)
 
-def dp_schedule(jobs, test_case_name):
+def dp_schedule(jobs, test_case_name, reduce_states=True, stats=None, verbose=True, save=True):
     n = len(jobs)
-    jobs = sorted(jobs, key=lambda x: x["d"])
-    
+    jobs = sorted(as_job_dicts(jobs), key=lambda x: x["d"])
+
     # Check time horizon limit for bitmask approach
     max_time = get_time_horizon(jobs)
     if max_time > 62:  # Safe limit for 64-bit systems
-        print(f"Error: Time horizon ({max_time}) exceeds bitmask limit (62). Need alternative approach.")
-        return {}, 0
+        if verbose:
+            print(f"Time horizon ({max_time}) exceeds bitmask limit (62), using the job-subset DP instead.")
+        return offline_subset.dp_schedule(jobs, test_case_name, verbose=verbose, save=save)
+
+    segments = layer_segments(jobs)
+    masks = [segment_masks(layer) for layer in segments]
+    children = dominated = 0
+    index = DominanceIndex(n + 1)   # solved reduced states per layer
+
+    def candidate_sets(i, avail):
+        # one slot set per distinct next state when reducing, else every combination
+        if reduce_states:
+            return canonical_choices(avail, jobs[i]["p"], segments[i+1])
+        return combinations(avail, jobs[i]["p"])
+
+    memo = {}
+    pointers = {}   # same keys as memo: None (skip) or the winning slot set, as counts when reducing
 
-    from functools import lru_cache
-    @lru_cache(None)
     def dp(i, used_mask):
+        nonlocal children, dominated
         if i == n:
             return 0
+        key = (i, canonical_key(used_mask, masks[i]) if reduce_states else used_mask)
+        if key in memo:
+            return memo[key]
         job = jobs[i]
-        best = -10**9
-        skip_profit = -job["l"] + dp(i+1, used_mask)
-        best = max(best, skip_profit)
+        best = -job["l"] + dp(i+1, used_mask)
+        best_S = None
         
         avail = [t for t in range(job["r"], job["d"] + 1) if not (used_mask >> t) & 1]
         if len(avail) >= job["p"]:
-            best_take = -10**9
-            for S in combinations(avail, job["p"]):
+            for S in candidate_sets(i, avail):
+                children += 1
                 new_mask = used_mask
                 for t in S:
                     new_mask |= (1 << t)
-                best_take = max(best_take, job["w"] + dp(i + 1, new_mask))
-            best = max(best, best_take)
+                child = (i+1, canonical_key(new_mask, masks[i+1]))
+                if reduce_states and child not in memo and index.dominated(*child, best - job["w"]):
+                    dominated += 1      # cannot beat best, and ties keep the earlier choice anyway
+                    continue
+                val = job["w"] + dp(i + 1, new_mask)
+                if val > best:
+                    best, best_S = val, S
+        memo[key] = best
+        # a slot set is only valid on the mask it was found on, counts per segment on any
+        pointers[key] = choice_counts(best_S, segments[i+1]) if reduce_states and best_S is not None else best_S
+        if reduce_states:
+            index.add(i, key[1], best)
         return best
 
     total_profit = dp(0, 0)
+    if stats is not None:
+        stats["states"] = len(memo)
+        stats["children"] = children
+        stats["dominated"] = dominated
+        stats["pointer_bytes"] = pointer_bytes(pointers)
     assigned = {job["id"]: [] for job in jobs}
     status = {}
     scheduled_jobs = []
 
-    def reconstruct(i, used_mask):
-        if i == n:
-            return
-        job = jobs[i]
-        skip_profit = -job["l"] + dp(i+1, used_mask)
-        best = dp(i, used_mask)
-        if best == skip_profit:
+    # Walk the back-pointers: one lookup per job, no re-enumeration
+    used_mask = 0
+    for i, job in enumerate(jobs):
+        key = (i, canonical_key(used_mask, masks[i]) if reduce_states else used_mask)
+        best_S = pointers[key]
+        if best_S is None:
             status[job["id"]] = f"NOT done → -{job['l']}"
             job["assigned_slots"] = None
             scheduled_jobs.append(job)
-            reconstruct(i+1, used_mask)
-            return
-        
-        avail = [t for t in range(job["r"], job["d"] + 1) if not (used_mask >> t) & 1]
-        if best != skip_profit:
-            best_S = None
-            best_take = -10**9
-            for S in combinations(avail, job["p"]):
-                nm = used_mask
-                for t in S:
-                    nm |= (1 << t)
-                val = job["w"] + dp(i + 1, nm)
-                if val > best_take:
-                    best_take, best_S = val, S
-            
-            # assign best_S
-            new_mask = used_mask
-            slots = []
-            for t in best_S:
-                new_mask |= (1 << t)
-                assigned[job["id"]].append(t)
-                slots.append(t)
-            status[job["id"]] = f"DONE → +{job['w']}"
-            job["assigned_slots"] = sorted(slots)
-            scheduled_jobs.append(job)
-            reconstruct(i+1, new_mask)
+            continue
+        if reduce_states:
+            avail = [t for t in range(job["r"], job["d"] + 1) if not (used_mask >> t) & 1]
+            best_S = replay_choice(avail, job["p"], segments[i+1], best_S)
+        for t in best_S:
+            used_mask |= (1 << t)
+            assigned[job["id"]].append(t)
+        status[job["id"]] = f"DONE → +{job['w']}"
+        job["assigned_slots"] = sorted(best_S)
+        scheduled_jobs.append(job)
 
-    reconstruct(0, 0)
+    if verbose:
+        # Pretty print with optimal comparison
+        print("Schedule results:")
+        for job in jobs:
+            slots = assigned[job["id"]]
+            print(f"Job {job['id']} {status[job['id']]}, slots = {slots if slots else 'null'}")
 
-    # Pretty print with optimal comparison
-    print("Schedule results:")
-    for job in jobs:
-        slots = assigned[job["id"]]
-        print(f"Job {job['id']} {status[job['id']]}, slots = {slots if slots else 'null'}")
-    
-    # Extract base test name for optimal lookup
-    base_test_name = test_case_name.replace('_offline', '').replace('_online', '')
-    optimal = optimal_profits.get(base_test_name, 'N/A')
-    print(f"\nTotal profit: {total_profit} | Optimal: {optimal}")
+        # Extract base test name for optimal lookup
+        base_test_name = test_case_name.replace('_offline', '').replace('_online', '')
+        optimal = optimal_profits.get(base_test_name, 'N/A')
+        print(f"\nTotal profit: {total_profit} | Optimal: {optimal}")
 
     # Save results
-    save_results_txt(test_case_name, scheduled_jobs, total_profit)
-    log_results_csv(test_case_name, scheduled_jobs, total_profit)
+    if save:
+        save_results_txt(test_case_name, scheduled_jobs, total_profit)
+        log_results_csv(test_case_name, scheduled_jobs, total_profit)
 
     return assigned, total_profit
 
-# ---------------------------
-# Save results to CSV
-# ---------------------------
-def log_results_csv(test_case_name, scheduled_jobs, total_profit, csv_file="results_log.csv"):
-    job_details = []
-    for job in scheduled_jobs:
-        slots = ",".join(map(str, job.get("assigned_slots", []))) if job.get("assigned_slots") else "null"
-        job_details.append(f"id:{job['id']} r:{job['r']} d:{job['d']} p:{job['p']} w:{job['w']} l:{job['l']} slots:{slots}")
-    log_data = {
-        "date": datetime.now().date(),
-        "time": datetime.now().time().strftime("%H:%M:%S"),
-        "test_case": test_case_name,
-        "total_profit": total_profit,
-        "job_details": " | ".join(job_details)
-    }
-    df_log = pd.DataFrame([log_data])
-    if os.path.exists(csv_file):
-        df_log.to_csv(csv_file, mode="a", index=False, header=False)
-    else:
-        df_log.to_csv(csv_file, index=False, header=True)
-
-# ---------------------------
-# Save results to txt file
-# ---------------------------
-def save_results_txt(test_case_name, scheduled_jobs, total_profit, output_folder="results"):
-    if not os.path.exists(output_folder):
-        os.makedirs(output_folder)
-    output_path = os.path.join(output_folder, f"{test_case_name}_offline.txt")
-    with open(output_path, "w") as f:
-        for job in sorted(scheduled_jobs, key=lambda x: x["id"]):
-            if job.get("assigned_slots"):
-                f.write(",".join(map(str, job["assigned_slots"])) + "\n")
-            else:
-                f.write("null\n")
-        f.write(str(total_profit) + "\n")
-    print(f"\nResults saved to {output_path}")
-
 if __name__ == "__main__":
+    # python offline_3.py [--memory]     (--memory: also report the states and back-pointer memory)
+    memory = "--memory" in sys.argv
     test_cases = ["test1", "test2", "test3", "test4", "test5", "test6", "test7"]
     for test_case in test_cases:
         jobs = read_jobs(f"test/{test_case}.txt")
-        assigned, profit = dp_schedule(jobs, test_case)
+        stats = {} if memory else None
+        assigned, profit = dp_schedule(jobs, test_case, stats=stats)
+        if memory and stats:
+            print(f"{stats['states']} states, back-pointers {stats['pointer_bytes'] / 1024:.1f} KiB")
         print("\n" + "-"*50 + "\n")
\ No newline at end of file
@@ -0,0 +1,177 @@
+import numpy as np
+from read_file import read_jobs
+from jobset import as_job_dicts
+from feasibility import edf_slots, backlog_accept
+from offline import optimal_profits, save_results_txt, log_results_csv
+import online_abbas
+
+# ---------------------------
+# Branch and bound over accepted job sets
+# ---------------------------
+# Profit = sum(w accepted) - sum(l rejected) = sum(w + l accepted) - sum(l all),
+# so we search for the feasible job set with the largest total gain (w + l).
+
+class HallSlack:
+    """
+    Slack of every Hall interval [R[a], D[b]] (a release to a deadline): its length minus
+    the processing of the jobs whose windows lie inside it. A job set is feasible iff no
+    slack is negative, and a job with window [r, d] can take at most the smallest slack
+    over the intervals containing [r, d]. Only distinct r and d values are indexed, so the
+    size of the matrix depends on n, not on the horizon.
+    """
+    def __init__(self, jobs):
+        releases = sorted({job["r"] for job in jobs})
+        deadlines = sorted({job["d"] for job in jobs})
+        self.ia = {t: i for i, t in enumerate(releases)}
+        self.ib = {t: i for i, t in enumerate(deadlines)}
+        self.length = np.subtract.outer(np.array(deadlines, dtype=np.int64) + 1,
+                                        np.array(releases, dtype=np.int64)).T
+
+    def fresh(self, accepted=()):
+        slack = self.length.copy()
+        for job in accepted:
+            self.take(slack, job, job["p"])
+        return slack
+
+    def room(self, slack, job):
+        return int(slack[:self.ia[job["r"]] + 1, self.ib[job["d"]]:].min())
+
+    def take(self, slack, job, amount):
+        slack[:self.ia[job["r"]] + 1, self.ib[job["d"]]:] -= amount
+
+def lp_bound(candidates, k, slack, hall):
+    # LP relaxation of the remaining decisions: greedy by gain density is optimal because
+    # the fractional feasible region is a polymatroid. Returns (bound, amounts).
+    slack = slack.copy()
+    bound = 0
+    amounts = []
+    for job in candidates[k:]:
+        amount = min(job["p"], hall.room(slack, job))
+        if amount > 0:
+            bound += (job["w"] + job["l"]) * amount / job["p"]
+            hall.take(slack, job, amount)
+        else:
+            amount = 0
+        amounts.append(amount)
+    return bound, amounts
+
+def greedy_completion(candidates, k, slack, hall):
+    # integral counterpart of lp_bound: take whole jobs in density order while they fit
+    slack = slack.copy()
+    gain = 0
+    chosen = []
+    for job in candidates[k:]:
+        if hall.room(slack, job) >= job["p"]:
+            hall.take(slack, job, job["p"])
+            gain += job["w"] + job["l"]
+            chosen.append(job)
+    return gain, chosen
+
+def online_incumbent(jobs, candidates):
+    # seed with the high-score online policy; it works on its own copies of the jobs
+    # (without the p = 0 jobs, which have no score and are accepted anyway)
+    seed_jobs = [dict(job) for job in jobs if job["p"] > 0]
+    online_abbas.HighScoreScheduler().run(seed_jobs)
+    done = {job["id"] for job in seed_jobs if job["feasible"] and job["remaining"] == 0}
+    return [job for job in candidates if job["id"] in done]
+
+def bnb_schedule(jobs, test_case_name, verbose=True, save=True):
+    jobs = as_job_dicts(jobs)
+    # jobs that can never be done, or gain nothing by being done, are rejected up front
+    candidates = [job for job in jobs if job["d"] - job["r"] + 1 >= job["p"] and job["w"] + job["l"] > 0]
+    # and jobs with p = 0 need no slot, so they are accepted up front
+    free = [job for job in candidates if job["p"] == 0]
+    candidates = [job for job in candidates if job["p"] > 0]
+    by_density = sorted(candidates, key=lambda x: (-(x["w"] + x["l"]) / x["p"], x["d"], x["id"]))
+    hall = HallSlack(candidates)
+
+    best_set = online_incumbent(jobs, candidates)
+    best_gain = sum(job["w"] + job["l"] for job in best_set)
+    greedy_gain, greedy_set = greedy_completion(by_density, 0, hall.fresh(), hall)
+    if greedy_gain > best_gain:
+        best_gain, best_set = greedy_gain, greedy_set
+
+    # Upper bound for every suffix of the deadline order: the LP relaxation of those jobs
+    # on an empty machine (whatever was accepted before only takes capacity away).
+    candidates.sort(key=lambda x: (x["d"], x["r"], x["id"]))
+    m = len(candidates)
+    upper = [0] * (m + 1)
+    for i in range(m):
+        suffix = {job["id"] for job in candidates[i:]}
+        upper[i], _ = lp_bound([job for job in by_density if job["id"] in suffix], 0, hall.length, hall)
+    # the backlog only has to be tracked at the releases of the undecided jobs
+    points = [sorted({job["r"] for job in candidates[i:]}) for i in range(m + 1)]
+
+    # Breadth-first over the decisions; nodes with the same backlog profile are merged
+    # (only the better one can lead to an optimum) and a node is pruned once its gain plus
+    # the suffix bound cannot beat the incumbent.
+    # layer: backlog -> (gain, accepted) with accepted a linked tuple (job, parent)
+    layer = {tuple(0 for _ in points[0]): (0, None)}
+    nodes = 0
+    for i, job in enumerate(candidates):
+        next_points = set(points[i + 1])
+        keep = [k for k, t in enumerate(points[i]) if t in next_points]
+        merged = {}
+        for backlog, (gain, accepted) in layer.items():
+            nodes += 1
+            # gains are integers, so a node must promise at least one more unit to be worth it
+            if int(gain + upper[i] + 1e-9) <= best_gain:
+                continue
+            children = [(backlog, gain, accepted)]
+            grown = backlog_accept(backlog, points[i], job)
+            if grown is not None:
+                children.append((grown, gain + job["w"] + job["l"], (job, accepted)))
+            for child, child_gain, child_accepted in children:
+                key = tuple(child[k] for k in keep)
+                if key not in merged or merged[key][0] < child_gain:
+                    merged[key] = (child_gain, child_accepted)
+        layer = merged
+
+    for gain, accepted in layer.values():
+        if gain > best_gain:
+            best_gain = gain
+            best_set = []
+            while accepted is not None:
+                best_set.append(accepted[0])
+                accepted = accepted[1]
+
+    total_profit = best_gain + sum(job["w"] + job["l"] for job in free) - sum(job["l"] for job in jobs)
+    slots = edf_slots(free + best_set)
+    assigned = {job["id"]: [] for job in jobs}
+    status = {}
+    scheduled_jobs = []
+    for job in sorted(jobs, key=lambda x: x["d"]):
+        if job["id"] in slots:
+            assigned[job["id"]] = sorted(slots[job["id"]])
+            status[job["id"]] = f"DONE → +{job['w']}"
+            job["assigned_slots"] = assigned[job["id"]]
+        else:
+            status[job["id"]] = f"NOT done → -{job['l']}"
+            job["assigned_slots"] = None
+        scheduled_jobs.append(job)
+
+    if verbose:
+        # Pretty print
+        print("Schedule results:")
+        for job in scheduled_jobs:
+            slots_out = assigned[job["id"]]
+            print(f"Job {job['id']} {status[job['id']]}, slots = {slots_out if slots_out else 'null'}")
+
+        base_test_name = test_case_name.replace('_offline', '').replace('_online', '')
+        optimal = optimal_profits.get(base_test_name, 'N/A')
+        print(f"\nTotal profit: {total_profit} | Optimal: {optimal} | B&B nodes: {nodes}")
+
+    # Save results
+    if save:
+        save_results_txt(test_case_name, scheduled_jobs, total_profit)
+        log_results_csv(test_case_name, scheduled_jobs, total_profit)
+
+    return assigned, total_profit
+
+
+if __name__ == "__main__":
+    test_cases = ["test1", "test2", "test3", "test4", "test5", "test6", "test7"]
+    for test_case in test_cases:
+        jobs = read_jobs(f"test/{test_case}.txt")
+        assigned, profit = bnb_schedule(jobs, test_case)
+        print("\n" + "-"*50 + "\n")
@@ -0,0 +1,319 @@
+import random
+import sys
+import time
+from read_file import read_jobs
+from jobset import as_job_dicts
+from feasibility import edf_slots, backlog_accept
+from offline import optimal_profits, save_results_txt, log_results_csv
+
+# ---------------------------
+# Incremental offline solver
+# ---------------------------
+# python offline_incremental.py                 (test cases)
+# python offline_incremental.py --edits 200     (random edits on a long job list, timed)
+#
+# Same model as offline_bnb: pick the feasible job set with the largest gain w + l, jobs
+# decided in deadline order, the state between two decisions being the backlog profile at
+# the releases still to come. The solver is a session: jobs are added, removed and
+# updated between solve() calls, and everything that does not depend on an edited job is
+# kept.
+#   - Jobs split into blocks that no window crosses; each block is solved on its own.
+#   - Inside a block, prefixes and suffixes of the deadline order get ids (hash-consed on
+#     the jobs, so an unchanged prefix or suffix gets its old id back). Forward frontiers
+#     (best gain per state after a prefix) are cached by prefix id, backward values (best
+#     gain of a suffix from a state) by suffix id. An edit at position k leaves the
+#     frontiers up to k and the values after k valid; a re-solve sweeps forward from the
+#     last valid frontier, sweeps backward from the first valid values and meets in
+#     the middle, so its cost is the distance between the edit and the last meeting point.
+#   - An edit that cannot change the optimum (e.g. a rejected job gets a smaller gain or
+#     a tighter window) keeps the incumbent without solving anything.
+
+def job_key(job):
+    # what the DP sees of a job; the id is there because frontiers carry accepted ids
+    return (job["id"], job["r"], job["d"], job["p"], job["w"] + job["l"])
+
+def can_gain(job):
+    return job["d"] - job["r"] + 1 >= job["p"] and job["w"] + job["l"] > 0
+
+def split_blocks(jobs):
+    # groups of jobs whose windows chain together; no window crosses from one to another
+    blocks = []
+    end = None
+    for job in sorted(jobs, key=lambda x: (x["r"], x["id"])):
+        if end is None or job["r"] > end:
+            blocks.append([])
+            end = job["d"]
+        blocks[-1].append(job)
+        end = max(end, job["d"])
+    return blocks
+
+def keeps_optimum(old, new, accepted):
+    """
+    Is the optimum for the jobs before the edit (old -> new, None for insert / delete) still
+    optimal after it? Yes if every job set holding the job got worse or infeasible while the
+    optimum does not hold it, or every one gained the same while the optimum holds it.
+    """
+    if old is None:
+        return not can_gain(new)
+    if new is None:
+        return old["id"] not in accepted
+    if old["id"] in accepted:
+        return (new["r"], new["d"], new["p"]) == (old["r"], old["d"], old["p"]) and new["w"] + new["l"] >= old["w"] + old["l"]
+    return (new["r"] >= old["r"] and new["d"] <= old["d"] and new["p"] >= old["p"]
+            and new["w"] + new["l"] <= old["w"] + old["l"])
+
+class IncrementalSolver:
+    """
+    add / remove / update jobs, solve() after any number of edits. The session owns copies
+    of the jobs. solve() returns (assigned, total_profit) like the other offline solvers;
+    stats holds the work of the last solve (layers swept forward, states expanded backward,
+    whether the incumbent was kept).
+    """
+    def __init__(self, jobs=(), verbose=False):
+        self.verbose = verbose
+        self.jobs = {}
+        self.chains = {}        # ("s" | "p", job key, next / previous id) -> prefix or suffix id
+        self.next_chain = 1     # 0 is the empty prefix / suffix
+        self.memo = {}          # suffix id -> {backlog: best gain of the suffix}
+        self.frontiers = {}     # (prefix id, releases) -> {backlog: (gain, accepted)}
+        self.accepted = set()
+        self.optimal = False    # accepted is known optimal for the current jobs
+        self.stats = {}
+        self.scheduled_jobs = []
+        self.total_profit = None
+        for job in as_job_dicts(jobs):
+            self.add(job)
+
+    # ---------------------------
+    # Edits
+    # ---------------------------
+    def add(self, job):
+        job = dict(job)
+        if "id" not in job:
+            job["id"] = max(self.jobs, default=0) + 1
+        if job["id"] in self.jobs:
+            raise ValueError(f"job {job['id']} already exists")
+        self.jobs[job["id"]] = job
+        self._edited(None, job)
+        return job["id"]
+
+    def remove(self, job_id):
+        self._edited(self.jobs.pop(job_id), None)
+
+    def update(self, job_id, **fields):
+        unknown = set(fields) - {"r", "d", "p", "w", "l"}
+        if unknown:
+            raise ValueError(f"cannot update {sorted(unknown)}")
+        old = self.jobs[job_id]
+        self.jobs[job_id] = dict(old, **fields)
+        self._edited(old, self.jobs[job_id])
+
+    def _edited(self, old, new):
+        if self.optimal and not keeps_optimum(old, new, self.accepted):
+            self.optimal = False
+
+    # ---------------------------
+    # Solving
+    # ---------------------------
+    def _chain(self, key):
+        chain = self.chains.get(key)
+        if chain is None:
+            chain = self.chains[key] = self.next_chain
+            self.next_chain += 1
+        return chain
+
+    def _solve_block(self, jobs, live):
+        jobs = sorted(jobs, key=lambda x: (x["d"], x["r"], x["id"]))
+        m = len(jobs)
+        keys = [job_key(job) for job in jobs]
+        sid = [0] * (m + 1)
+        for i in range(m - 1, -1, -1):
+            sid[i] = self._chain(("s", keys[i], sid[i + 1]))
+        pid = [0] * (m + 1)
+        for i in range(m):
+            pid[i + 1] = self._chain(("p", keys[i], pid[i]))
+        # the backlog only has to be tracked at the releases of the undecided jobs
+        points = [()] * (m + 1)
+        for i in range(m - 1, -1, -1):
+            points[i] = tuple(sorted(set(points[i + 1]) | {jobs[i]["r"]}))
+        keep = []
+        for i in range(m):
+            later = set(points[i + 1])
+            keep.append([k for k, t in enumerate(points[i]) if t in later])
+        live["s"].update(sid)
+        live["p"].update(pid)
+        live["f"].update(zip(pid, points))
+
+        def children(i, backlog):
+            # next states after skipping / taking job i (None if it does not fit)
+            skip = tuple(backlog[k] for k in keep[i])
+            grown = backlog_accept(backlog, points[i], jobs[i])
+            return skip, None if grown is None else tuple(grown[k] for k in keep[i])
+
+        def value(i, backlog):
+            # best gain of jobs i.. from backlog, once evaluate has reached the state
+            return 0 if i == m else self.memo[sid[i]][backlog]
+
+        def evaluate(i, states):
+            # backward values of states at layer i, without recursion: a forward pass collects
+            # the later states that have no cached value yet, a backward pass values them
+            pending = []
+            while i < m:
+                values = self.memo.setdefault(sid[i], {})
+                todo = {backlog: children(i, backlog) for backlog in states if backlog not in values}
+                if not todo:
+                    break
+                pending.append((i, values, todo))
+                states = {child for pair in todo.values() for child in pair if child is not None}
+                i += 1
+            for i, values, todo in reversed(pending):
+                for backlog, (skip, take) in todo.items():
+                    self.stats["expanded"] += 1
+                    best = value(i + 1, skip)
+                    if take is not None:
+                        best = max(best, keys[i][4] + value(i + 1, take))
+                    values[backlog] = best
+
+        # a: last cached frontier, c: first cached suffix; meet in the middle of the gap
+        self.frontiers.setdefault((0, points[0]), {tuple(0 for _ in points[0]): (0, None)})
+        a = max(i for i in range(m + 1) if (pid[i], points[i]) in self.frontiers)
+        c = min(i for i in range(m + 1) if i == m or sid[i] in self.memo)
+        meet = a if a >= c else (a + c) // 2
+
+        frontier = self.frontiers[(pid[a], points[a])]
+        for i in range(a, meet):
+            self.stats["swept"] += 1
+            layer = {}
+            for backlog, (gain, accepted) in frontier.items():
+                skip, take = children(i, backlog)
+                for child, child_gain, child_accepted in ((skip, gain, accepted),
+                                                          (take, gain + keys[i][4], (jobs[i]["id"], accepted))):
+                    if child is not None and (child not in layer or layer[child][0] < child_gain):
+                        layer[child] = (child_gain, child_accepted)
+            frontier = self.frontiers[(pid[i + 1], points[i + 1])] = layer
+
+        evaluate(meet, frontier)
+        best_gain, best_state, accepted = None, None, None
+        for backlog, (gain, prefix) in frontier.items():
+            total = gain + value(meet, backlog)
+            if best_gain is None or total > best_gain:
+                best_gain, best_state, accepted = total, backlog, prefix
+
+        # the accepted prefix from the frontier, the rest by following the backward values
+        chosen = []
+        while accepted is not None:
+            chosen.append(accepted[0])
+            accepted = accepted[1]
+        backlog = best_state
+        for i in range(meet, m):
+            skip, take = children(i, backlog)
+            if take is not None and value(i, backlog) != value(i + 1, skip):
+                chosen.append(jobs[i]["id"])
+                backlog = take
+            else:
+                backlog = skip
+        return chosen
+
+    def solve(self):
+        start = time.perf_counter()
+        self.stats = {"blocks": 0, "swept": 0, "expanded": 0, "kept_incumbent": self.optimal}
+        if not self.optimal:
+            live = {"s": {0}, "p": {0}, "f": set()}
+            accepted = set()
+            blocks = split_blocks([job for job in self.jobs.values() if can_gain(job)])
+            for block in blocks:
+                accepted.update(self._solve_block(block, live))
+            self.stats["blocks"] = len(blocks)
+            # drop what belongs to prefixes and suffixes that no longer exist
+            self.memo = {sid: values for sid, values in self.memo.items() if sid in live["s"]}
+            self.frontiers = {key: frontier for key, frontier in self.frontiers.items() if key in live["f"]}
+            self.chains = {key: chain for key, chain in self.chains.items()
+                           if chain in (live["s"] if key[0] == "s" else live["p"])}
+            self.accepted = accepted
+            self.optimal = True
+        self.stats["seconds"] = time.perf_counter() - start
+
+        slots = edf_slots([self.jobs[job_id] for job_id in self.accepted])
+        assigned = {job_id: sorted(slots.get(job_id, [])) for job_id in self.jobs}
+        self.total_profit = sum(job["w"] if job["id"] in self.accepted else -job["l"] for job in self.jobs.values())
+        self.scheduled_jobs = []
+        for job in sorted(self.jobs.values(), key=lambda x: (x["d"], x["id"])):
+            self.scheduled_jobs.append(dict(job, assigned_slots=assigned[job["id"]] or None))
+
+        if self.verbose:
+            print("Schedule results:")
+            for job in self.scheduled_jobs:
+                status = f"DONE → +{job['w']}" if job["assigned_slots"] else f"NOT done → -{job['l']}"
+                print(f"Job {job['id']} {status}, slots = {job['assigned_slots'] or 'null'}")
+        return assigned, self.total_profit
+
+    def save(self, test_case_name):
+        save_results_txt(test_case_name, self.scheduled_jobs, self.total_profit)
+        log_results_csv(test_case_name, self.scheduled_jobs, self.total_profit)
+
+def incremental_schedule(jobs, test_case_name, verbose=True, save=True):
+    # one cold solve, the solvers.py entry point
+    solver = IncrementalSolver(jobs, verbose=verbose)
+    assigned, total_profit = solver.solve()
+    if verbose:
+        base_test_name = test_case_name.replace('_offline', '').replace('_online', '')
+        optimal = optimal_profits.get(base_test_name, 'N/A')
+        print(f"\nTotal profit: {total_profit} | Optimal: {optimal}")
+    if save:
+        solver.save(test_case_name)
+    return assigned, total_profit
+
+# ---------------------------
+# Edit benchmark
+# ---------------------------
+def random_edit(solver, rng):
+    # one insert, delete or change of w / l / r / d, like a job list changing in production
+    from instance_generator import generate_instance
+    job = solver.jobs[rng.choice(list(solver.jobs))]
+    kind = rng.choice(["w", "l", "window", "add", "remove"])
+    if kind == "remove" and len(solver.jobs) == 1:
+        kind = "w"
+    if kind == "add":
+        new = generate_instance(rng)[0]
+        shift = rng.randint(0, max(job["d"] for job in solver.jobs.values()))
+        solver.add({"r": new["r"] + shift, "d": new["d"] + shift, "p": new["p"], "w": new["w"], "l": new["l"]})
+    elif kind == "remove":
+        solver.remove(job["id"])
+    elif kind == "window":
+        r = max(0, job["r"] + rng.randint(-5, 5))
+        solver.update(job["id"], r=r, d=max(r + job["p"] - 1, job["d"] + rng.randint(-5, 5)))
+    else:
+        solver.update(job["id"], **{kind: rng.randint(5, 100)})
+    return kind
+
+def edit_benchmark(edits, batches=20, seed=0):
+    from instance_generator import generate_long_instance
+    rng = random.Random(seed)
+    solver = IncrementalSolver(generate_long_instance(batches, rng))
+    solver.solve()
+    cold = warm = 0.0
+    kept = 0
+    for _ in range(edits):
+        random_edit(solver, rng)
+        _, profit = solver.solve()
+        warm += solver.stats["seconds"]
+        kept += solver.stats["kept_incumbent"]
+        start = time.perf_counter()
+        _, check = IncrementalSolver(list(solver.jobs.values())).solve()
+        cold += time.perf_counter() - start
+        if check != profit:
+            print(f"Mismatch after an edit: incremental {profit}, cold {check}")
+            return
+    print(f"{len(solver.jobs)} jobs, {edits} edits: cold solve {1000 * cold / edits:.2f} ms, "
+          f"re-solve {1000 * warm / edits:.2f} ms ({warm / cold:.0%}), incumbent kept on {kept} edits")
+
+
+if __name__ == "__main__":
+    if "--edits" in sys.argv:
+        edit_benchmark(int(sys.argv[sys.argv.index("--edits") + 1]))
+        sys.exit(0)
+    test_cases = ["test1", "test2", "test3", "test4", "test5", "test6", "test7"]
+    for test_case in test_cases:
+        jobs = read_jobs(f"test/{test_case}.txt")
+        assigned, profit = incremental_schedule(jobs, test_case)
+        print("\n" + "-"*50 + "\n")
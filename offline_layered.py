@@ -0,0 +1,126 @@
+import sys
+from read_file import read_jobs
+from jobset import as_job_dicts
+from offline import optimal_profits, save_results_txt, log_results_csv
+from timeline import segments, job_span, first_fit, expand
+
+# ---------------------------
+# Layered (bottom-up) version of offline.dp_schedule
+# ---------------------------
+# Same model as offline.py: jobs in deadline order, a taken job gets the first p free
+# slots of its window. Instead of recursing once per job through an lru_cache, the
+# jobs are processed one layer at a time and only the current frontier is kept:
+#   frontier[used] = (profit so far, path)
+# used is the used slot count per timeline segment and path is the back-pointer: bit
+# n-1-i is set when job i was taken. Two states with the same counts have the same
+# future, so only the better one is kept; on equal profit the smaller path wins, which
+# is the schedule offline.reconstruct picks (skip on ties).
+# With memory_limit_mb, the size of the layer being built is kept as a running total and
+# MemoryError is raised as soon as it passes the limit.
+
+def state_bytes(used, path):
+    # rough size of a frontier entry: dict slot + key + value tuple + its two ints
+    return 104 + sys.getsizeof(used) + sys.getsizeof(path)
+
+def dp_schedule(jobs, test_case_name, memory_limit_mb=None, verbose=True, save=True):
+    n = len(jobs)
+    jobs = sorted(as_job_dicts(jobs), key=lambda x: x["d"])
+
+    segs = segments(jobs)
+    spans = [job_span(segs, job) for job in jobs]
+    # A state only holds the counts of the segments some job has reached and a later job can
+    # still use: last[s] is the last job whose window covers segment s, after it the count
+    # never matters again, and a segment no job has reached yet is still empty.
+    last = [0] * len(segs)
+    for i, span in enumerate(spans):
+        for s in span:
+            last[s] = i
+    live = []
+
+    limit = memory_limit_mb * 2**20 if memory_limit_mb is not None else None
+    frontier = {(): (0, 0)}
+    peak_states = 1
+    for i, job in enumerate(jobs):
+        bit = 1 << (n - 1 - i)
+        layer = {}
+        layer_bytes = 0
+        reached = sorted(set(live) | set(spans[i]))
+        grow = None
+        if len(reached) > len(live):
+            old = {s: k for k, s in enumerate(live)}
+            grow = [old.get(s, -1) for s in reached]
+        position = {s: k for k, s in enumerate(reached)}
+        local_segs = [segs[s] for s in reached]
+        local_span = range(position[spans[i].start], position[spans[i].start] + len(spans[i])) if spans[i] else range(0)
+        live = [s for s in reached if last[s] > i]
+        project = [position[s] for s in live]
+
+        def keep(used, profit, path):
+            nonlocal layer_bytes
+            used = tuple(used[k] for k in project)
+            current = layer.get(used)
+            if current is None or profit > current[0] or (profit == current[0] and path < current[1]):
+                layer[used] = (profit, path)
+                if limit is not None:
+                    layer_bytes += (state_bytes(used, path) if current is None
+                                    else sys.getsizeof(path) - sys.getsizeof(current[1]))
+                    if layer_bytes > limit:
+                        raise MemoryError(f"DP frontier at job {i+1}/{n} ({len(layer)} states) "
+                                          f"exceeds {memory_limit_mb} MB")
+
+        for used, (profit, path) in frontier.items():
+            if grow is not None:
+                used = tuple(used[k] if k >= 0 else 0 for k in grow)
+            keep(used, profit - job["l"], path)
+            fit = first_fit(local_segs, used, local_span, job["p"])
+            if fit is not None:
+                keep(fit[0], profit + job["w"], path | bit)
+
+        # the previous layer is released here
+        frontier = layer
+        peak_states = max(peak_states, len(frontier))
+
+    total_profit, path = max(frontier.values(), key=lambda x: (x[0], -x[1]))
+
+    # Replay the decisions to get the slots
+    assigned = {job["id"]: [] for job in jobs}
+    status = {}
+    scheduled_jobs = []
+    used = tuple(0 for _ in segs)
+    for i, job in enumerate(jobs):
+        if (path >> (n - 1 - i)) & 1:
+            used, runs = first_fit(segs, used, spans[i], job["p"])
+            slots = expand(runs)
+            assigned[job["id"]] = slots
+            status[job["id"]] = f"DONE → +{job['w']}"
+            job["assigned_slots"] = slots
+        else:
+            status[job["id"]] = f"NOT done → -{job['l']}"
+            job["assigned_slots"] = None
+        scheduled_jobs.append(job)
+
+    if verbose:
+        # Pretty print
+        print("Schedule results:")
+        for job in jobs:
+            slots = assigned[job["id"]]
+            print(f"Job {job['id']} {status[job['id']]}, slots = {slots if slots else 'null'}")
+
+        base_test_name = test_case_name.replace('_offline', '').replace('_online', '')
+        optimal = optimal_profits.get(base_test_name, 'N/A')
+        print(f"\nTotal profit: {total_profit} | Optimal: {optimal} | Peak frontier: {peak_states} states")
+
+    # Save results
+    if save:
+        save_results_txt(test_case_name, scheduled_jobs, total_profit)
+        log_results_csv(test_case_name, scheduled_jobs, total_profit)
+
+    return assigned, total_profit
+
+
+if __name__ == "__main__":
+    test_cases = ["test1", "test2", "test3", "test4", "test5", "test6", "test7"]
+    for test_case in test_cases:
+        jobs = read_jobs(f"test/{test_case}.txt")
+        assigned, profit = dp_schedule(jobs, test_case)
+        print("\n" + "-"*50 + "\n")
@@ -0,0 +1,208 @@
+import math
+import random
+import sys
+import time
+from read_file import read_jobs
+from jobset import as_job_dicts
+from feasibility import edf_slots
+from offline import optimal_profits, save_results_txt, log_results_csv
+from offline_bnb import HallSlack, lp_bound, greedy_completion, online_incumbent
+
+# ---------------------------
+# Anytime offline solver: large-neighbourhood search
+# ---------------------------
+# python offline_lns.py [--time-limit 0.2]
+#
+# Same job-set model as offline_bnb (gain w + l per accepted job, feasibility by Hall
+# slack). The incumbent starts as the better of the online_abbas high-score schedule and
+# the greedy density packing. Each step frees a neighbourhood: the jobs whose windows meet
+# a time window around a job, or a random mix of accepted and rejected jobs. It keeps every
+# other accepted job fixed and re-solves the free jobs exactly: the slack of the fixed
+# jobs is the incumbent's slack with the freed jobs given back, and a small depth-first
+# search finds the best subset of free jobs that fits in it. The upper bound is the LP
+# relaxation of offline_bnb; once a neighbourhood covers every job, the incumbent is
+# proven optimal and the bound drops to it.
+
+def repair(hall, slack, free):
+    """
+    Best subset of free (job dicts, p > 0) that fits in the Hall slack of the fixed jobs: depth
+    first in gain density order, pruned when even all remaining free jobs cannot beat the
+    best subset so far. slack is updated in place and left as it was. Returns (gain, chosen
+    jobs).
+    """
+    free = sorted(free, key=lambda x: (-(x["w"] + x["l"]) / x["p"], x["d"], x["id"]))
+    rest = [0] * (len(free) + 1)
+    for i in range(len(free) - 1, -1, -1):
+        rest[i] = rest[i + 1] + free[i]["w"] + free[i]["l"]
+    best = [0, []]
+
+    def search(i, slack, gain, taken):
+        if gain > best[0]:
+            best[:] = [gain, taken]
+        if i == len(free) or gain + rest[i] <= best[0]:
+            return
+        job = free[i]
+        if hall.room(slack, job) >= job["p"]:
+            # taken in place and given back afterwards: no copies of the matrix
+            hall.take(slack, job, job["p"])
+            search(i + 1, slack, gain + job["w"] + job["l"], taken + [job])
+            hall.take(slack, job, -job["p"])
+        search(i + 1, slack, gain, taken)
+
+    search(0, slack, 0, [])
+    return best[0], best[1]
+
+class LNSSolver:
+    """
+    incumbent (accepted ids), profit, upper_bound and gap() can be read at any moment;
+    run(time_limit) improves the incumbent until the budget is used or the gap is closed and
+    can be called again to continue. timeline holds (seconds, profit) at every improvement.
+    The gap is taken on the gain (profit + penalty), which is never negative:
+    (bound - incumbent) / bound. The p = 0 jobs (zero) are accepted but not in incumbent.
+    """
+    def __init__(self, jobs, seed=0, neighbourhood=10, verbose=False):
+        start = time.perf_counter()
+        self.jobs = as_job_dicts(jobs)
+        self.verbose = verbose
+        self.neighbourhood = neighbourhood
+        self.rng = random.Random(seed)
+        candidates = [job for job in self.jobs if job["d"] - job["r"] + 1 >= job["p"] and job["w"] + job["l"] > 0]
+        # jobs with p = 0 need no slot: accepted up front and left out of the search, their
+        # gain taken off the penalty
+        self.zero = [job for job in candidates if job["p"] == 0]
+        self.penalty = sum(job["l"] for job in self.jobs) - sum(job["w"] + job["l"] for job in self.zero)
+        self.candidates = sorted((job for job in candidates if job["p"] > 0), key=lambda x: (x["d"], x["r"], x["id"]))
+        self.by_id = {job["id"]: job for job in self.candidates}
+        self.steps = 0
+
+        by_density = sorted(self.candidates, key=lambda x: (-(x["w"] + x["l"]) / x["p"], x["d"], x["id"]))
+        hall = self.hall = HallSlack(self.candidates)
+        bound, _ = lp_bound(by_density, 0, hall.length, hall)
+        self.bound_gain = math.floor(bound + 1e-9)
+        seed_set = online_incumbent(self.jobs, self.candidates)
+        greedy_gain, greedy_set = greedy_completion(by_density, 0, hall.fresh(), hall)
+        if greedy_gain > sum(job["w"] + job["l"] for job in seed_set):
+            seed_set = greedy_set
+        self.incumbent = {job["id"] for job in seed_set}
+        self.gain = sum(job["w"] + job["l"] for job in seed_set)
+        self.slack = hall.fresh(seed_set)      # Hall slack left by the incumbent
+        # seconds spent so far, setting up included: the Hall matrix has one entry per
+        # (release, deadline) pair, so on thousands of jobs this is a noticeable part
+        self.elapsed = time.perf_counter() - start
+        self.timeline = [(self.elapsed, self.profit)]
+
+    @property
+    def profit(self):
+        return self.gain - self.penalty
+
+    @property
+    def upper_bound(self):
+        return self.bound_gain - self.penalty
+
+    def gap(self):
+        return (self.bound_gain - self.gain) / self.bound_gain if self.bound_gain > 0 else 0.0
+
+    def destroy(self):
+        # free ids: a time window around a job (preferably a rejected one), or a random mix
+        k = self.neighbourhood
+        rejected = [job for job in self.candidates if job["id"] not in self.incumbent]
+        if self.rng.random() < 0.5 and rejected:
+            pivot = self.rng.choice(rejected)
+            width = self.rng.randint(0, pivot["d"] - pivot["r"] + 1)
+            start, end = pivot["r"] - width, pivot["d"] + width
+            near = [job["id"] for job in self.candidates if job["r"] <= end and job["d"] >= start and job is not pivot]
+            return {pivot["id"], *self.rng.sample(near, min(k - 1, len(near)))}
+        accepted = list(self.incumbent)
+        half = self.rng.randint(0, k)
+        return set(self.rng.sample(accepted, min(half, len(accepted)))) | {
+            job["id"] for job in self.rng.sample(rejected, min(k - half, len(rejected)))}
+
+    def step(self):
+        if len(self.candidates) <= self.neighbourhood:
+            free = set(self.by_id)
+        else:
+            free = self.destroy()
+        # the fixed jobs' slack: the incumbent's with the freed accepted jobs given back
+        released = [self.by_id[job_id] for job_id in free & self.incumbent]
+        for job in released:
+            self.hall.take(self.slack, job, -job["p"])
+        free_gain, chosen = repair(self.hall, self.slack, [self.by_id[job_id] for job_id in free])
+        fixed = self.incumbent - free
+        gain = sum(self.by_id[job_id]["w"] + self.by_id[job_id]["l"] for job_id in fixed) + free_gain
+        self.steps += 1
+        if len(free) == len(self.by_id):
+            self.bound_gain = gain          # everything was free: the repair was exact
+        # equal gains move too, so the search can drift across plateaus
+        improved = gain > self.gain
+        if gain >= self.gain:
+            self.incumbent, self.gain = fixed | {job["id"] for job in chosen}, gain
+        else:
+            chosen = released
+        for job in chosen:
+            self.hall.take(self.slack, job, job["p"])
+        return improved
+
+    def run(self, time_limit=0.2):
+        start = time.perf_counter()
+        while self.gain < self.bound_gain and time.perf_counter() - start < time_limit:
+            if self.step():
+                self.timeline.append((self.elapsed + time.perf_counter() - start, self.profit))
+                if self.verbose:
+                    print(f"{self.timeline[-1][0]:8.3f}s  profit {self.profit}  bound {self.upper_bound}  gap {self.gap():.2%}")
+        self.elapsed += time.perf_counter() - start
+        return self.incumbent
+
+def lns_schedule(jobs, test_case_name, time_limit=0.2, seed=0, neighbourhood=10, stats=None, verbose=True, save=True):
+    """
+    Best schedule found within time_limit seconds (setting up included). stats (a dict, optional) receives the
+    upper bound, gap, improvement timeline, steps and whether the optimum was proven.
+    """
+    jobs = as_job_dicts(jobs)
+    solver = LNSSolver(jobs, seed=seed, neighbourhood=neighbourhood)
+    solver.run(max(0.0, time_limit - solver.elapsed))
+    total_profit = solver.profit
+    if stats is not None:
+        stats.update(upper_bound=solver.upper_bound, gap=solver.gap(), timeline=solver.timeline,
+                     steps=solver.steps, proven=solver.gain == solver.bound_gain)
+
+    slots = edf_slots([solver.by_id[job_id] for job_id in solver.incumbent] + solver.zero)
+    assigned = {job["id"]: [] for job in jobs}
+    status = {}
+    scheduled_jobs = []
+    for job in sorted(jobs, key=lambda x: x["d"]):
+        if job["id"] in slots:
+            assigned[job["id"]] = sorted(slots[job["id"]])
+            status[job["id"]] = f"DONE → +{job['w']}"
+            job["assigned_slots"] = assigned[job["id"]]
+        else:
+            status[job["id"]] = f"NOT done → -{job['l']}"
+            job["assigned_slots"] = None
+        scheduled_jobs.append(job)
+
+    if verbose:
+        # Pretty print
+        print("Schedule results:")
+        for job in scheduled_jobs:
+            slots_out = assigned[job["id"]]
+            print(f"Job {job['id']} {status[job['id']]}, slots = {slots_out if slots_out else 'null'}")
+
+        base_test_name = test_case_name.replace('_offline', '').replace('_online', '')
+        optimal = optimal_profits.get(base_test_name, 'N/A')
+        print(f"\nTotal profit: {total_profit} | Optimal: {optimal} | Upper bound: {solver.upper_bound} "
+              f"| Gap: {solver.gap():.2%} | {solver.steps} LNS steps")
+
+    # Save results
+    if save:
+        save_results_txt(test_case_name, scheduled_jobs, total_profit)
+        log_results_csv(test_case_name, scheduled_jobs, total_profit)
+
+    return assigned, total_profit
+
+
+if __name__ == "__main__":
+    time_limit = float(sys.argv[sys.argv.index("--time-limit") + 1]) if "--time-limit" in sys.argv else 0.2
+    test_cases = ["test1", "test2", "test3", "test4", "test5", "test6", "test7"]
+    for test_case in test_cases:
+        jobs = read_jobs(f"test/{test_case}.txt")
+        assigned, profit = lns_schedule(jobs, test_case, time_limit=time_limit)
+        print("\n" + "-"*50 + "\n")
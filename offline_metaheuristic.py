@@ -0,0 +1,483 @@
+import argparse
+import heapq
+import math
+import random
+import sys
+import time
+from bisect import bisect_right
+from itertools import chain
+from multiprocessing import Pool
+from read_file import read_jobs
+from jobset import as_job_dicts
+from feasibility import edf_slots
+from timeline import segments, capacities, job_span
+from offline import optimal_profits, save_results_txt, log_results_csv
+
+# ---------------------------
+# Multi-start metaheuristic over accepted job sets
+# ---------------------------
+# python offline_metaheuristic.py --time-limit 2                       (test cases)
+# python offline_metaheuristic.py --batches 200 --workers 4 --strategy tabu
+#
+# For job lists far beyond the exact solvers. The state is the accepted job set, the
+# objective its gain w + l, and a move adds a rejected job, drops an accepted one or swaps
+# the two. Every move is checked on a SegmentCalendar (units of the accepted jobs per
+# timeline segment), which re-schedules only the few segments around the job being added.
+# Each restart runs simulated annealing (or tabu search) from its own seeded greedy start;
+# restarts run in epochs on a process pool, and after every epoch the weaker half restarts
+# from the best set found so far. The search stops early once the best set reaches an upper
+# bound, or once every restart has stalled on a set that no add or swap improves. Moves
+# evaluated per second are reported next to the profit.
+
+class SegmentCalendar:
+    """
+    The accepted jobs' units per timeline segment (timeline.py): alloc[s] = {job index: units
+    in segment s}, used[s] their total. There are at most 2n - 1 segments whatever the time
+    values, so memory and the cost of a move depend on the jobs, not on the horizon.
+    try_add(i) looks for room for job i: starting from the segments of its window it grows an
+    interval over the windows of the jobs holding units in it until it has p free units, then
+    re-runs EDF, segment by segment, on that interval alone. The jobs holding units in it keep
+    them there (clipped to it), so a success is always a feasible set; once the interval stops
+    growing the answer is exact.
+    Returns a patch [(s, {job index: units}), ...] to apply, or None if job i cannot be added.
+    """
+    def __init__(self, jobs):
+        self.jobs = jobs
+        self.segs = segments(jobs)
+        self.starts = [start for start, _ in self.segs]
+        self.capacity = capacities(self.segs)
+        self.spans = [job_span(self.segs, job) for job in jobs]
+        self.alloc = [{} for _ in self.segs]
+        self.used = [0] * len(self.segs)
+
+    def fill(self, accepted):
+        # place a set on the empty calendar; False (nothing placed) if it is not feasible
+        patch = self._edf(0, len(self.segs) - 1, {i: self.jobs[i]["p"] for i in accepted})
+        if patch is None:
+            return False
+        self.apply(patch)
+        return True
+
+    def try_add(self, i):
+        lo, hi = self.spans[i].start, self.spans[i].stop - 1
+        p = self.jobs[i]["p"]
+        units = {}
+        free = 0
+        reach_lo, reach_hi = lo, hi     # hull of the windows of the jobs in units
+        added = range(lo, hi + 1)       # segments not counted yet
+        while True:
+            for s in added:
+                free += self.capacity[s] - self.used[s]
+                for k, u in self.alloc[s].items():
+                    if k not in units:
+                        units[k] = 0
+                        reach_lo = min(reach_lo, self.spans[k].start)
+                        reach_hi = max(reach_hi, self.spans[k].stop - 1)
+                    units[k] += u
+            if free >= p:
+                patch = self._edf(lo, hi, {**units, i: p})
+                if patch is not None:
+                    return patch
+            if (reach_lo, reach_hi) == (lo, hi):
+                return None
+            added = chain(range(reach_lo, lo), range(hi + 1, reach_hi + 1))
+            lo, hi = reach_lo, reach_hi
+
+    def _edf(self, lo, hi, units):
+        # units[k] of every job k on segments lo..hi, within its window; events only happen at
+        # segment boundaries, so earliest deadline first per segment is exact
+        pending = sorted((max(self.spans[k].start, lo), min(self.spans[k].stop - 1, hi), k) for k in units)
+        ready = []
+        patch = []
+        n = 0
+        for s in range(lo, hi + 1):
+            while n < len(pending) and pending[n][0] <= s:
+                _, last, k = pending[n]
+                heapq.heappush(ready, (last, k))
+                n += 1
+            room = self.capacity[s]
+            placed = {}
+            while ready and room:
+                last, k = ready[0]
+                if last < s:
+                    return None
+                take = min(room, units[k])
+                placed[k] = take
+                room -= take
+                units[k] -= take
+                if units[k] == 0:
+                    heapq.heappop(ready)
+            patch.append((s, placed))
+        return None if ready or n < len(pending) else patch
+
+    def apply(self, patch):
+        for s, placed in patch:
+            self.alloc[s] = placed
+            self.used[s] = sum(placed.values())
+
+    def owner(self, t):
+        # the job holding slot t, -1 if free (t inside a window); a segment's used units are
+        # counted from its start
+        s = bisect_right(self.starts, t) - 1
+        left = t - self.segs[s][0]
+        for k, u in self.alloc[s].items():
+            if left < u:
+                return k
+            left -= u
+        return -1
+
+    def holders(self, i):
+        # the jobs holding units in the window of job i
+        return {k for s in self.spans[i] for k in self.alloc[s]}
+
+    def drop(self, i):
+        removed = {}
+        for s in self.spans[i]:
+            u = self.alloc[s].pop(i, 0)
+            if u:
+                self.used[s] -= u
+                removed[s] = u
+        return removed
+
+    def restore(self, i, removed):
+        for s, u in removed.items():
+            self.alloc[s][i] = u
+            self.used[s] += u
+
+class Search:
+    """
+    One restart. jobs are the candidates (indexed, p > 0), accepted a set of indices that
+    must be feasible. run(seconds) anneals (or runs tabu search) and keeps best / best_gain.
+    """
+    def __init__(self, jobs, accepted, seed, strategy="anneal", tenure=20, sample=8):
+        self.jobs = jobs
+        self.gains = [job["w"] + job["l"] for job in jobs]
+        self.rng = random.Random(seed)
+        self.strategy = strategy
+        self.tenure = tenure
+        self.sample = sample
+        self.load(accepted)
+        self.best, self.best_gain = set(self.accepted), self.gain
+        self.moves = 0
+        self.tabu = {}          # job index -> move number until which it may not be moved again
+        self.stuck = False      # the last run stopped on a set no add or swap improves
+
+    def load(self, accepted):
+        # make accepted the current set
+        self.calendar = SegmentCalendar(self.jobs)
+        self.accepted = set(accepted) if self.calendar.fill(accepted) else set()
+        self.rejected = [i for i in range(len(self.jobs)) if i not in self.accepted]
+        self.position = {i: n for n, i in enumerate(self.rejected)}     # O(1) removal
+        self.gain = sum(self.gains[i] for i in self.accepted)
+
+    # ---------------------------
+    # Moves: (delta, drop index or None, add index or None)
+    # ---------------------------
+    def propose(self):
+        kind = self.rng.random()
+        if kind < 0.2 and self.accepted or not self.rejected:
+            a = self._pick_accepted()
+            return None if a is None else (-self.gains[a], a, None)
+        b = self.rng.choice(self.rejected)
+        if kind < 0.6:
+            return (self.gains[b], None, b)
+        # swap: b against a job holding a slot of its window
+        job = self.jobs[b]
+        t = self.rng.randint(job["r"], job["d"])
+        a = self.calendar.owner(t)
+        return (self.gains[b] - self.gains[a], a, b) if a >= 0 else (self.gains[b], None, b)
+
+    def _pick_accepted(self):
+        # a job holding a slot that some rejected job could use
+        if not self.accepted:
+            return None
+        job = self.jobs[self.rng.choice(self.rejected)] if self.rejected else self.jobs[self.rng.randrange(len(self.jobs))]
+        t = self.rng.randint(job["r"], job["d"])
+        k = self.calendar.owner(t)
+        return k if k >= 0 else None
+
+    def evaluate(self, move):
+        # the patch that makes the move, or None if the added job does not fit
+        _, a, b = move
+        self.moves += 1
+        if b is None:
+            return []
+        slots = self.calendar.drop(a) if a is not None else None
+        patch = self.calendar.try_add(b)
+        if a is not None:
+            self.calendar.restore(a, slots)
+        return patch
+
+    def apply(self, move, patch):
+        delta, a, b = move
+        if a is not None:
+            self.calendar.drop(a)
+            self.accepted.discard(a)
+            self.position[a] = len(self.rejected)
+            self.rejected.append(a)
+            self.tabu[a] = self.moves + self.tenure
+        if b is not None:
+            self.calendar.apply(patch)
+            self.accepted.add(b)
+            last = self.rejected.pop()
+            if last != b:
+                self.rejected[self.position[b]] = last
+                self.position[last] = self.position[b]
+            del self.position[b]
+            self.tabu[b] = self.moves + self.tenure
+        self.gain += delta
+        if self.gain > self.best_gain:
+            self.best, self.best_gain = set(self.accepted), self.gain
+
+    def improving_move(self):
+        # an add or swap that raises the gain of the current set, as (move, patch), or None
+        for b in self.rejected:
+            for a in [None] + sorted(self.calendar.holders(b)):
+                delta = self.gains[b] - (self.gains[a] if a is not None else 0)
+                if delta > 0:
+                    move = (delta, a, b)
+                    patch = self.evaluate(move)
+                    if patch is not None:
+                        return move, patch
+        return None
+
+    def is_tabu(self, move):
+        _, a, b = move
+        return any(k is not None and self.tabu.get(k, -1) > self.moves for k in (a, b))
+
+    # ---------------------------
+    # Strategies
+    # ---------------------------
+    def run(self, seconds, bound=None, patience=None):
+        """
+        Search for up to seconds. Stops early once best_gain reaches bound (an upper bound on
+        the gain), or, after patience moves without a new best (default max(1000, 20 n)), once
+        no add or swap improves the best set (then stuck is set): the search goes back to the
+        best set and makes an improving move if there is one.
+        """
+        start = time.perf_counter()
+        temperature = start_temperature = max(1.0, sorted(self.gains)[len(self.gains) // 2] / 2) if self.gains else 1.0
+        patience = patience or max(1000, 20 * len(self.jobs))
+        last_best, last_moves = self.best_gain, self.moves
+        self.stuck = not self.jobs
+        steps = 0
+        while not self.stuck:
+            if steps % 64 == 0:
+                elapsed = time.perf_counter() - start
+                if elapsed >= seconds or (bound is not None and self.best_gain >= bound):
+                    break
+                # geometric cooling over the budget, down to 1% of the start
+                temperature = start_temperature * 0.01 ** (elapsed / seconds)
+                if self.best_gain > last_best:
+                    last_best, last_moves = self.best_gain, self.moves
+                elif self.moves - last_moves >= patience:
+                    self.load(self.best)
+                    found = self.improving_move()
+                    if found is None:
+                        self.stuck = True
+                        break
+                    self.apply(*found)
+                    last_moves = self.moves
+            steps += 1
+            if self.strategy == "tabu":
+                self._tabu_step()
+            else:
+                self._anneal_step(temperature)
+
+    def _anneal_step(self, temperature):
+        move = self.propose()
+        if move is None:
+            self.moves += 1
+            return
+        if move[0] < 0 and self.rng.random() >= math.exp(move[0] / temperature):
+            self.moves += 1
+            return
+        patch = self.evaluate(move)
+        if patch is not None:
+            self.apply(move, patch)
+
+    def _tabu_step(self):
+        # best admissible move of a sample; a tabu move only if it beats the best set
+        best_move, best_patch = None, None
+        for _ in range(self.sample):
+            move = self.propose()
+            if move is None or (best_move is not None and move[0] <= best_move[0]):
+                continue
+            if self.is_tabu(move) and self.gain + move[0] <= self.best_gain:
+                continue
+            patch = self.evaluate(move)
+            if patch is not None:
+                best_move, best_patch = move, patch
+        if best_move is None:
+            self.moves += 1
+        else:
+            self.apply(best_move, best_patch)
+
+def greedy_start(jobs, rng):
+    # density order with a little noise, adding whatever fits (jobs have p > 0)
+    gains = [job["w"] + job["l"] for job in jobs]
+    order = sorted(range(len(jobs)), key=lambda i: -gains[i] / jobs[i]["p"] * rng.uniform(0.8, 1.2))
+    calendar = SegmentCalendar(jobs)
+    accepted = set()
+    for i in order:
+        patch = calendar.try_add(i)
+        if patch is not None:
+            calendar.apply(patch)
+            accepted.add(i)
+    return accepted
+
+BOUND_JOBS = 300        # the LP bound is only computed up to this many candidates
+
+def upper_bound(candidates):
+    # gain bound: offline_bnb's LP relaxation on small instances (its Hall matrix has an entry
+    # per release / deadline pair), else every candidate accepted
+    total = sum(job["w"] + job["l"] for job in candidates)
+    if not candidates or len(candidates) > BOUND_JOBS:
+        return total
+    from offline_bnb import HallSlack, lp_bound
+    by_density = sorted(candidates, key=lambda x: -(x["w"] + x["l"]) / x["p"])
+    hall = HallSlack(candidates)
+    bound, _ = lp_bound(by_density, 0, hall.length, hall)
+    return min(total, math.floor(bound + 1e-9))
+
+# ---------------------------
+# Process pool
+# ---------------------------
+_jobs = None
+
+def _init_worker(jobs):
+    global _jobs
+    _jobs = jobs
+
+def _run_epoch(task):
+    # one restart for one epoch: (best gain, best set, moves evaluated, stuck)
+    accepted, seed, seconds, strategy, bound = task
+    if accepted is None:
+        accepted = greedy_start(_jobs, random.Random(seed))
+    search = Search(_jobs, accepted, seed, strategy)
+    search.run(seconds, bound)
+    return search.best_gain, search.best, search.moves, search.stuck
+
+def multistart(candidates, time_limit=2.0, workers=1, restarts=None, epochs=4, strategy="anneal", seed=0):
+    """
+    restarts (default: workers) independent searches for epochs rounds within time_limit
+    seconds. After each epoch the weaker half continues from the best set found. Stops
+    early once the best gain reaches upper_bound, or after an epoch that found nothing better
+    and left every restart stuck. Returns (best gain, best set of candidate indices, stats).
+    """
+    restarts = restarts or workers
+    bound = upper_bound(candidates)
+    seconds = time_limit / epochs
+    starts = [None] * restarts
+    best_gain, best = -1, set()
+    moves = 0
+    done = 0
+    start = time.perf_counter()
+    pool = Pool(workers, initializer=_init_worker, initargs=(candidates,)) if workers > 1 else None
+    if pool is None:
+        _init_worker(candidates)
+    try:
+        for epoch in range(epochs):
+            tasks = [(starts[k], seed * 100003 + epoch * 1009 + k, seconds, strategy, bound) for k in range(restarts)]
+            results = pool.map(_run_epoch, tasks) if pool is not None else list(map(_run_epoch, tasks))
+            moves += sum(result[2] for result in results)
+            done += 1
+            ranked = sorted(range(restarts), key=lambda k: -results[k][0])
+            improved = results[ranked[0]][0] > best_gain
+            if improved:
+                best_gain, best = results[ranked[0]][0], results[ranked[0]][1]
+            if best_gain >= bound or (not improved and all(result[3] for result in results)):
+                break
+            for rank, k in enumerate(ranked):
+                starts[k] = results[k][1] if rank < (restarts + 1) // 2 else best
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+    elapsed = time.perf_counter() - start
+    stats = {"moves": moves, "seconds": elapsed, "moves_per_second": moves / elapsed if elapsed else 0.0,
+             "restarts": restarts, "epochs": done, "bound_gain": bound, "proven": best_gain >= bound}
+    return best_gain, best, stats
+
+def metaheuristic_schedule(jobs, test_case_name, time_limit=2.0, workers=1, restarts=None, epochs=4,
+                           strategy="anneal", seed=0, stats=None, verbose=True, save=True):
+    """
+    Best schedule found by the multi-start search within at most about time_limit seconds.
+    stats (a dict, optional) receives the moves evaluated, moves per second, epochs run, the
+    upper bound on the profit and whether the optimum was proven.
+    """
+    jobs = as_job_dicts(jobs)
+    candidates = [job for job in jobs if job["d"] - job["r"] + 1 >= job["p"] and job["w"] + job["l"] > 0]
+    # jobs with p = 0 need no slot, so they are accepted up front and left out of the search
+    zero = [job for job in candidates if job["p"] == 0]
+    candidates = [job for job in candidates if job["p"] > 0]
+    best_gain, best, search_stats = multistart(candidates, time_limit, workers, restarts, epochs, strategy, seed)
+    accepted = [candidates[i] for i in best] + zero
+    search_stats["upper_bound"] = (search_stats["bound_gain"] + sum(job["w"] + job["l"] for job in zero)
+                                   - sum(job["l"] for job in jobs))
+    if stats is not None:
+        stats.update(search_stats)
+    total_profit = sum(job["w"] + job["l"] for job in accepted) - sum(job["l"] for job in jobs)
+
+    slots = edf_slots(accepted)
+    assigned = {job["id"]: [] for job in jobs}
+    status = {}
+    scheduled_jobs = []
+    for job in sorted(jobs, key=lambda x: x["d"]):
+        if job["id"] in slots:
+            assigned[job["id"]] = sorted(slots[job["id"]])
+            status[job["id"]] = f"DONE → +{job['w']}"
+            job["assigned_slots"] = assigned[job["id"]]
+        else:
+            status[job["id"]] = f"NOT done → -{job['l']}"
+            job["assigned_slots"] = None
+        scheduled_jobs.append(job)
+
+    if verbose:
+        # Pretty print
+        print("Schedule results:")
+        for job in scheduled_jobs:
+            slots_out = assigned[job["id"]]
+            print(f"Job {job['id']} {status[job['id']]}, slots = {slots_out if slots_out else 'null'}")
+
+        base_test_name = test_case_name.replace('_offline', '').replace('_online', '')
+        optimal = optimal_profits.get(base_test_name, 'N/A')
+        print(f"\nTotal profit: {total_profit} | Optimal: {optimal} | "
+              f"{search_stats['moves']} moves, {search_stats['moves_per_second']:.0f} moves/s")
+
+    # Save results
+    if save:
+        save_results_txt(test_case_name, scheduled_jobs, total_profit)
+        log_results_csv(test_case_name, scheduled_jobs, total_profit)
+
+    return assigned, total_profit
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Multi-start simulated annealing / tabu search for the offline schedule.")
+    parser.add_argument("--time-limit", type=float, default=2.0, help="seconds per instance")
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--restarts", type=int, default=None, help="independent searches (default: workers)")
+    parser.add_argument("--epochs", type=int, default=4, help="rounds between which the best set is shared")
+    parser.add_argument("--strategy", choices=["anneal", "tabu"], default="anneal")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--batches", type=int, default=None, help="solve one long generated list of this many instances")
+    args = parser.parse_args(argv)
+
+    if args.batches:
+        from instance_generator import generate_long_instance
+        instances = [(f"long_{args.batches}", generate_long_instance(args.batches, random.Random(args.seed)))]
+    else:
+        instances = [(test_case, read_jobs(f"test/{test_case}.txt"))
+                     for test_case in ["test1", "test2", "test3", "test4", "test5", "test6", "test7"]]
+    for name, jobs in instances:
+        stats = {}
+        assigned, profit = metaheuristic_schedule(jobs, name, args.time_limit, args.workers, args.restarts, args.epochs,
+                                                  args.strategy, args.seed, stats=stats, verbose=not args.batches)
+        if args.batches:
+            print(f"{name}: {len(jobs)} jobs, profit {profit}, {stats['moves']} moves, "
+                  f"{stats['moves_per_second']:.0f} moves/s over {stats['restarts']} restarts")
+        print("\n" + "-"*50 + "\n")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
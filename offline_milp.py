@@ -0,0 +1,125 @@
+import math
+import numpy as np
+from scipy.optimize import milp, LinearConstraint, Bounds
+from scipy.sparse import coo_matrix
+from read_file import read_jobs
+from jobset import as_job_dicts
+from feasibility import edf_slots
+from timeline import segments, capacities, job_span
+from offline import optimal_profits, save_results_txt, log_results_csv
+
+# ---------------------------
+# MILP backend (HiGHS through scipy.optimize.milp)
+# ---------------------------
+# Interval-compressed transportation model on the timeline segments (timeline.py): a
+# segment of length c can hold c units of work from the jobs whose windows cover it.
+#   x_j  in {0, 1}  job j is done
+#   y_js >= 0       units of job j placed in segment s (only segments inside [r_j, d_j])
+#   sum_s y_js = p_j x_j      for every job
+#   sum_j y_js <= c_s         for every segment
+# max sum (w_j + l_j) x_j - sum l_j
+# For integral x the flow part is a transportation problem, so a fractional y means an
+# integral one exists (Hall); EDF then turns the accepted set into concrete slots.
+
+def build_model(jobs):
+    segs = segments(jobs)
+    n = len(jobs)
+    cols = [(j, s) for j, job in enumerate(jobs) for s in job_span(segs, job)]   # y variables
+
+    m = n + len(cols)
+    c = np.zeros(m)
+    c[:n] = [-(job["w"] + job["l"]) for job in jobs]     # milp minimizes
+    integrality = np.zeros(m)
+    integrality[:n] = 1
+    upper = np.full(m, np.inf)
+    upper[:n] = [1 if job["d"] - job["r"] + 1 >= job["p"] else 0 for job in jobs]
+
+    rows, columns, values = [], [], []
+    # job rows: sum_s y_js - p_j x_j = 0
+    for j, job in enumerate(jobs):
+        rows.append(j)
+        columns.append(j)
+        values.append(-job["p"])
+    # segment rows: sum_j y_js <= c_s
+    for k, (j, s) in enumerate(cols):
+        rows += [j, n + s]
+        columns += [n + k, n + k]
+        values += [1, 1]
+    A = coo_matrix((values, (rows, columns)), shape=(n + len(segs), m)).tocsr()
+    lower_rows = np.concatenate([np.zeros(n), np.full(len(segs), -np.inf)])
+    upper_rows = np.concatenate([np.zeros(n), capacities(segs)])
+    return c, integrality, Bounds(np.zeros(m), upper), LinearConstraint(A, lower_rows, upper_rows)
+
+def milp_schedule(jobs, test_case_name, time_limit=None, mip_gap=None, stats=None, verbose=True, save=True):
+    """
+    Optimal schedule (within mip_gap, by default HiGHS's 1e-4) found within time_limit seconds.
+    stats (a dict, optional) receives, as lns_schedule's do, the upper bound on the profit, the
+    gap (None if the solver had no bound to compare with), whether the optimum was proven
+    and the solver's message. Raises RuntimeError if the solver found no solution.
+    """
+    jobs = sorted(as_job_dicts(jobs), key=lambda x: x["d"])
+    c, integrality, bounds, constraints = build_model(jobs)
+    options = {}
+    if time_limit is not None:
+        options["time_limit"] = time_limit
+    if mip_gap is not None:
+        options["mip_rel_gap"] = mip_gap
+    res = milp(c, integrality=integrality, bounds=bounds, constraints=constraints, options=options)
+    if res.x is None:
+        raise RuntimeError(f"MILP solver found no solution ({res.message})")
+
+    done = [res.x[j] > 0.5 for j in range(len(jobs))]
+    accepted = [job for job, flag in zip(jobs, done) if flag]
+    total_profit = sum(job["w"] if flag else -job["l"] for job, flag in zip(jobs, done))
+    # a MIP gap of None means the solver had no bound to compare with
+    gap = getattr(res, "mip_gap", None)
+    if stats is not None:
+        # the dual bound is on the minimized objective -sum (w + l) x, profits are integers
+        dual = getattr(res, "mip_dual_bound", None)
+        upper_bound = -dual - sum(job["l"] for job in jobs) if dual is not None else None
+        stats.update(upper_bound=upper_bound, gap=gap, message=res.message,
+                     proven=upper_bound is not None and math.floor(upper_bound + 1e-6) <= total_profit)
+
+    slots = edf_slots(accepted)
+    if slots is None:
+        # only if the solution violates the capacities beyond the solver's tolerances
+        raise RuntimeError(f"MILP accepted set of {len(accepted)} jobs has no EDF schedule")
+    assigned = {job["id"]: [] for job in jobs}
+    status = {}
+    scheduled_jobs = []
+    for job in jobs:
+        if job["id"] in slots:
+            assigned[job["id"]] = sorted(slots[job["id"]])
+            status[job["id"]] = f"DONE → +{job['w']}"
+            job["assigned_slots"] = assigned[job["id"]]
+        else:
+            status[job["id"]] = f"NOT done → -{job['l']}"
+            job["assigned_slots"] = None
+        scheduled_jobs.append(job)
+
+    if verbose:
+        # Pretty print
+        print("Schedule results:")
+        for job in jobs:
+            slots_out = assigned[job["id"]]
+            print(f"Job {job['id']} {status[job['id']]}, slots = {slots_out if slots_out else 'null'}")
+
+        base_test_name = test_case_name.replace('_offline', '').replace('_online', '')
+        optimal = optimal_profits.get(base_test_name, 'N/A')
+        gap_text = f"{gap:.2%}" if gap is not None else "N/A"
+        print(f"\nTotal profit: {total_profit} | Optimal: {optimal} | MIP gap: {gap_text} ({res.message})")
+
+    # Save results
+    if save:
+        save_results_txt(test_case_name, scheduled_jobs, total_profit)
+        log_results_csv(test_case_name, scheduled_jobs, total_profit)
+
+    return assigned, total_profit
+
+
+if __name__ == "__main__":
+    test_cases = ["test1", "test2", "test3", "test4", "test5", "test6", "test7"]
+    for test_case in test_cases:
+        jobs = read_jobs(f"test/{test_case}.txt")
+        assigned, profit = milp_schedule(jobs, test_case)
+        print("\n" + "-"*50 + "\n")
@@ -0,0 +1,100 @@
+from read_file import read_jobs
+from jobset import as_job_dicts
+from feasibility import backlog_accept, edf_slots
+from offline import optimal_profits, save_results_txt, log_results_csv
+
+# ---------------------------
+# DP over accepted job sets
+# ---------------------------
+# Same decisions as offline.dp, but the state is what the accepted jobs leave for the
+# later ones instead of a bitmask over time slots: jobs are decided in deadline order and
+# the state is the backlog profile at the releases of the undecided jobs (see
+# feasibility.backlog_accept), so accepted sets that leave the same backlog share one
+# entry. Feasibility is a Hall/EDF property of the jobs themselves, so the state space
+# grows with n and the time values can be as large as we like. Layer by layer, without
+# recursion: a forward pass collects the reachable profiles, a backward pass values them.
+
+def dp_schedule(jobs, test_case_name, verbose=True, save=True):
+    n = len(jobs)
+    jobs = sorted(as_job_dicts(jobs), key=lambda x: x["d"])
+    # the backlog only has to be tracked at the releases of the undecided jobs
+    points = [sorted({job["r"] for job in jobs[i:]}) for i in range(n + 1)]
+
+    # layers[i]: profile at points[i] -> (profile after skipping job i, after taking it or None)
+    layers = [{tuple(0 for _ in points[0]): None}]
+    for i, job in enumerate(jobs):
+        next_points = set(points[i + 1])
+        keep = [k for k, t in enumerate(points[i]) if t in next_points]
+        reached = {}
+        for backlog in layers[i]:
+            skip = tuple(backlog[k] for k in keep)
+            grown = backlog_accept(backlog, points[i], job) if job["d"] - job["r"] + 1 >= job["p"] else None
+            take = tuple(grown[k] for k in keep) if grown is not None else None
+            layers[i][backlog] = (skip, take)
+            reached[skip] = reached[take] = None
+        reached.pop(None, None)
+        layers.append(reached)
+
+    # value[i][profile]: best profit of jobs i.. from that profile
+    value = [None] * n + [{profile: 0 for profile in layers[n]}]
+    for i in range(n - 1, -1, -1):
+        job = jobs[i]
+        value[i] = {}
+        for backlog, (skip, take) in layers[i].items():
+            best = -job["l"] + value[i + 1][skip]
+            if take is not None:
+                best = max(best, job["w"] + value[i + 1][take])
+            value[i][backlog] = best
+    backlog = next(iter(layers[0]))
+    total_profit = value[0][backlog]
+
+    # Walk the optimal decisions (skip preferred on ties, as in offline.py)
+    accepted = []
+    for i, job in enumerate(jobs):
+        skip, take = layers[i][backlog]
+        if value[i][backlog] != -job["l"] + value[i + 1][skip]:
+            accepted.append(job)
+            backlog = take
+        else:
+            backlog = skip
+
+    # Slots are only materialised here, by running EDF on the accepted set
+    slots = edf_slots(accepted)
+    assigned = {job["id"]: [] for job in jobs}
+    status = {}
+    scheduled_jobs = []
+    for job in jobs:
+        if job["id"] in slots:
+            assigned[job["id"]] = slots[job["id"]]
+            status[job["id"]] = f"DONE → +{job['w']}"
+            job["assigned_slots"] = slots[job["id"]]
+        else:
+            status[job["id"]] = f"NOT done → -{job['l']}"
+            job["assigned_slots"] = None
+        scheduled_jobs.append(job)
+
+    if verbose:
+        # Pretty print
+        print("Schedule results:")
+        for job in jobs:
+            slots_out = assigned[job["id"]]
+            print(f"Job {job['id']} {status[job['id']]}, slots = {slots_out if slots_out else 'null'}")
+
+        base_test_name = test_case_name.replace('_offline', '').replace('_online', '')
+        optimal = optimal_profits.get(base_test_name, 'N/A')
+        print(f"\nTotal profit: {total_profit} | Optimal: {optimal}")
+
+    # Save results
+    if save:
+        save_results_txt(test_case_name, scheduled_jobs, total_profit)
+        log_results_csv(test_case_name, scheduled_jobs, total_profit)
+
+    return assigned, total_profit
+
+
+if __name__ == "__main__":
+    test_cases = ["test1", "test2", "test3", "test4", "test5", "test6", "test7"]
+    for test_case in test_cases:
+        jobs = read_jobs(f"test/{test_case}.txt")
+        assigned, profit = dp_schedule(jobs, test_case)
+        print("\n" + "-"*50 + "\n")
@@ -1,21 +1,11 @@
 import os
-from datetime import datetime
-import pandas as pd
 from read_file import read_jobs
-
-# Test instance optimal profits for reference
-optimal_profits = {
-    "test1": 133,
-    "test2": 44,
-    "test3": 30,
-    "test4": 10,
-    "test5": 0,
-    "test6": 130,
-    "test7": 70
-}
+from jobset import JobSet, RunState
+import reporting
+from reporting import optimal_profits
 
 # ---------------------------
-# Online scheduler state
+# Last run of the module-level functions (kept for the scripts and notebooks)
 # ---------------------------
 calendar = {}
 scheduled_jobs = []
@@ -32,95 +22,138 @@ def compute_score(job):
     job["score"] = (job["w"] + job["l"]) / job["p"] if job["feasible"] else -1
     return job
 
-def schedule_job(job):
-    global calendar, total_profit
-    if not job["feasible"]:
-        job["assigned_slots"] = None
-        total_profit -= job["l"]
-        print(f"Job {job['id']} NOT done → -{job['l']}, slots = null")
-        scheduled_jobs.append(job)
+class NextFreeSlot:
+    """
+    Disjoint-set "next free slot" index over the calendar: find(t) is the first free slot
+    >= t. A taken slot t is linked to t + 1 and finds halve their paths, so they cost close
+    to O(α). Slots are dict keys, so the horizon never has to be known or allocated.
+    """
+    def __init__(self):
+        self.parent = {}
+
+    def find(self, t):
+        parent = self.parent
+        while t in parent:
+            up = parent[t]
+            if up in parent:
+                up = parent[t] = parent[up]
+            t = up
+        return t
+
+    def first_fit(self, r, d, p):
+        # take the first p free slots of [r, d]; None (nothing taken) if there are fewer
+        slots = []
+        t = self.find(r)
+        while t <= d and len(slots) < p:
+            slots.append(t)
+            t = self.find(t + 1)
+        if len(slots) < p:
+            return None
+        for t in slots:
+            self.parent[t] = t + 1
+        return slots
+
+class GreedyScheduler:
+    """
+    First-fit greedy in arrival order: a job gets the first p free slots of its window,
+    or is rejected. Every instance owns its calendar and profit, so any number of them
+    can run side by side (threads included). Printing is off unless verbose; nothing is
+    written to disk unless save() is called.
+    Every run() starts from an empty calendar; schedule_job() adds one job to the current one.
+    A JobSet is scheduled straight from its columns and left untouched; the slots then go
+    to self.state (a RunState, which also stands in for the calendar).
+    """
+    def __init__(self, verbose=False):
+        self.verbose = verbose
+        self.calendar = {}          # t -> job_id
+        self.scheduled_jobs = []
+        self.total_profit = 0
+        self.free = NextFreeSlot()
+        self.state = None           # RunState of a JobSet run
+
+    def schedule_job(self, job):
+        if not job["feasible"]:
+            job["assigned_slots"] = None
+            self.total_profit -= job["l"]
+            if self.verbose:
+                print(f"Job {job['id']} NOT done → -{job['l']}, slots = null")
+            self.scheduled_jobs.append(job)
+            return job
+
+        slots = self.free.first_fit(job["r"], job["d"], job["p"])
+
+        if slots is not None:
+            job["assigned_slots"] = slots
+            for t in job["assigned_slots"]:
+                self.calendar[t] = job["id"]
+            self.total_profit += job["w"]
+            if self.verbose:
+                print(f"Job {job['id']} DONE → +{job['w']}, slots = {job['assigned_slots']}")
+        else:
+            job["assigned_slots"] = None
+            self.total_profit -= job["l"]
+            if self.verbose:
+                print(f"Job {job['id']} NOT done → -{job['l']}, slots = null")
+
+        self.scheduled_jobs.append(job)
         return job
 
-    needed = job["p"]
-    available_slots = [t for t in range(job["r"], job["d"] + 1) if calendar.get(t,0)==0]
-
-    if len(available_slots) >= needed:
-        job["assigned_slots"] = available_slots[:needed]
-        for t in job["assigned_slots"]:
-            calendar[t] = job["id"]
-        total_profit += job["w"]
-        print(f"Job {job['id']} DONE → +{job['w']}, slots = {job['assigned_slots']}")
-    else:
-        job["assigned_slots"] = None
-        total_profit -= job["l"]
-        print(f"Job {job['id']} NOT done → -{job['l']}, slots = null")
-
-    scheduled_jobs.append(job)
-    return job
+    def run(self, jobs):
+        # schedule the jobs in arrival order; annotates the job dicts and returns the total profit
+        self.calendar = {}
+        self.scheduled_jobs = []
+        self.total_profit = 0
+        self.free = NextFreeSlot()
+        self.state = None
+        if isinstance(jobs, JobSet):
+            return self._run_columns(jobs)
+        for job in jobs:
+            job = filter_infeasible(job)
+            job = compute_score(job)
+            self.schedule_job(job)
+        return self.total_profit
+
+    def _run_columns(self, jobs):
+        self.scheduled_jobs = jobs
+        self.state = state = RunState(jobs)
+        for i, (job_id, r, d, p, w, l) in enumerate(jobs.rows()):
+            slots = self.free.first_fit(r, d, p) if d - r + 1 >= p else None
+            if slots is not None:
+                state.assign(i, slots)
+                state.remaining[i] = 0
+                state.done[i] = 1
+                self.total_profit += w
+                if self.verbose:
+                    print(f"Job {job_id} DONE → +{w}, slots = {slots}")
+            else:
+                self.total_profit -= l
+                if self.verbose:
+                    print(f"Job {job_id} NOT done → -{l}, slots = null")
+        return self.total_profit
+
+    def save(self, test_case_name, output_folder="results", csv_file="results_log.csv"):
+        jobs = self.state.job_dicts(self.scheduled_jobs) if self.state is not None else self.scheduled_jobs
+        reporting.log_results_csv(test_case_name, jobs, self.total_profit, csv_file)
+        reporting.save_results_txt(test_case_name, jobs, self.total_profit, output_folder)
 
 # ---------------------------
-# Save results to CSV
+# Save results (results/<test_case_name>.txt and results_log.csv)
 # ---------------------------
 def log_results_csv(test_case_name, csv_file="results_log.csv"):
-    global scheduled_jobs, total_profit
-    job_details = []
-    for job in scheduled_jobs:
-        slots = ",".join(map(str, job["assigned_slots"])) if job["assigned_slots"] else "null"
-        job_details.append(f"id:{job['id']} r:{job['r']} d:{job['d']} p:{job['p']} w:{job['w']} l:{job['l']} slots:{slots}")
-    log_data = {
-        "date": datetime.now().date(),
-        "time": datetime.now().time().strftime("%H:%M:%S"),
-        "test_case": test_case_name,
-        "total_profit": total_profit,
-        "job_details": " | ".join(job_details)
-    }
-    df_log = pd.DataFrame([log_data])
-    if os.path.exists(csv_file):
-        df_log.to_csv(csv_file, mode="a", index=False, header=False)
-    else:
-        df_log.to_csv(csv_file, index=False, header=True)
+    reporting.log_results_csv(test_case_name, scheduled_jobs, total_profit, csv_file)
 
-# ---------------------------
-# Save results to txt file
-# ---------------------------
 def save_results_txt(test_case_name, output_folder="results"):
-    global scheduled_jobs, total_profit
-    if not os.path.exists(output_folder):
-        os.makedirs(output_folder)
-    
-    output_path = os.path.join(output_folder, f"{test_case_name}.txt")
-
-    with open(output_path, "w") as f:
-        for job in sorted(scheduled_jobs, key=lambda x: x["id"]):
-            if job["assigned_slots"]:
-                f.write(",".join(map(str, job["assigned_slots"])) + "\n")
-            else:
-                f.write("null\n")
-        f.write(str(total_profit) + "\n")
-
-    print(f"\nResults saved to {output_path}")
-
-
+    reporting.save_results_txt(test_case_name, scheduled_jobs, total_profit, output_folder)
 
 # ---------------------------
 # Main online execution
 # ---------------------------
 def run_online_algorithm_from_file(input_file):
-    global calendar, scheduled_jobs, total_profit
-    # reset state
-    calendar = {}
-    scheduled_jobs = []
-    total_profit = 0
-
     jobs = read_jobs(input_file)
     test_case_name = os.path.splitext(os.path.basename(input_file))[0] + "_online"
     print(f"Running online scheduling for {test_case_name}\n")
+    run_online_algorithm(jobs)
 
-    for job in jobs:
-        job = filter_infeasible(job)
-        job = compute_score(job)
-        schedule_job(job)
-    
     # Extract base test name (without _online or .txt)
     base_test_name = os.path.splitext(os.path.basename(input_file))[0]
     optimal = optimal_profits.get(base_test_name.replace('_online','').replace('_offline',''), 'N/A')
@@ -128,6 +161,14 @@ def run_online_algorithm_from_file(input_file):
     log_results_csv(test_case_name)
     save_results_txt(test_case_name)
 
+def run_online_algorithm(jobs, verbose=True):
+    # one GreedyScheduler run; its state is also published as the module-level results
+    global calendar, scheduled_jobs, total_profit
+    scheduler = GreedyScheduler(verbose)
+    scheduler.run(jobs)
+    calendar, scheduled_jobs, total_profit = scheduler.calendar, scheduler.scheduled_jobs, scheduler.total_profit
+    return total_profit
+
 # ---------------------------
 # Example usage
 # ---------------------------
@@ -1,24 +1,12 @@
 import os
-from datetime import datetime
-import pandas as pd
 import heapq
 from read_file import read_jobs
+from jobset import JobSet, RunState
+import reporting
+from reporting import optimal_profits
 
 # ---------------------------
-# Test instance optimal profits (optional, for printout)
-# ---------------------------
-optimal_profits = {
-    "test1": 133,
-    "test2": 44,
-    "test3": 30,
-    "test4": 10,
-    "test5": 0,
-    "test6": 130,
-    "test7": 70
-}
-
-# ---------------------------
-# Online scheduler state
+# Last run of the module-level functions (kept for the scripts and notebooks)
 # ---------------------------
 calendar = {}           # t -> job_id (or 0 if idle)
 scheduled_jobs = []     # list of job dicts with annotations
@@ -27,13 +15,28 @@ total_profit = 0
 # ---------------------------
 # Helpers
 # ---------------------------
+# The policy is defined here once, on plain field values, so the job dict path and the
+# JobSet column path share it.
+def is_feasible(r, d, p):
+    return (d - r + 1) >= p
+
+def score(w, l, p):
+    # density-like priority; used for selection
+    return (w + l) / p
+
+def priority(w, l, p, d, job_id):
+    # heap key of the policy, smallest first: highest score, then higher w, earlier d, smaller id
+    return (-score(w, l, p), -w, d, job_id)
+
+def job_priority(job):
+    return priority(job["w"], job["l"], job["p"], job["d"], job["id"])
+
 def mark_infeasible(job):
-    job["feasible"] = (job["d"] - job["r"] + 1) >= job["p"]
+    job["feasible"] = is_feasible(job["r"], job["d"], job["p"])
     return job
 
 def compute_score(job):
-    # density-like priority; used for selection
-    job["score"] = (job["w"] + job["l"]) / job["p"] if job["feasible"] else -1
+    job["score"] = score(job["w"], job["l"], job["p"]) if job["feasible"] else -1
     return job
 
 def annotate_job(job):
@@ -44,43 +47,92 @@ def annotate_job(job):
     job["penalized_now"] = False     # to avoid double-penalizing
     return job
 
+# ---------------------------
+# Event loop of the policy
+# ---------------------------
+class HighScoreEvents:
+    """
+    The high-score policy driven by events, on job indices; HighScoreScheduler and
+    online_stream.HighScoreStream both run on it. Jobs are described by the functions
+    release(i), deadline(i) and priority(i) (heap key, smallest runs first), and remaining, a
+    list or array indexed by job that is updated in place.
+    Between two releases the job on top of the heap cannot change (scores are static), so it
+    gets every slot up to the next release, its deadline or its completion in one run,
+    reported as on_run(i, start, stop); idle gaps are skipped. on_done(i, t) is called when a
+    job completes at t, and on_expire(i, d) (optional: only then are deadlines tracked) when a
+    job passes its deadline d unfinished. Every submit, run, completion and deadline costs
+    O(log n).
+    """
+    def __init__(self, release, deadline, priority, remaining, on_run, on_done=None, on_expire=None):
+        self.release, self.deadline, self.priority = release, deadline, priority
+        self.remaining = remaining
+        self.on_run, self.on_done, self.on_expire = on_run, on_done, on_expire
+        self.now = None         # first slot not simulated yet
+        self.pending = []       # (r, i) submitted, not released yet
+        self.active = []        # (priority, i, d) released, may be finished or expired
+        self.deadlines = []     # (d, i) released, not settled yet (with on_expire only)
+
+    def submit(self, i):
+        heapq.heappush(self.pending, (self.release(i), i))
+
+    def advance(self, until):
+        # simulate every slot t < until
+        if self.now is None:
+            if not self.pending:
+                return
+            self.now = self.pending[0][0]
+        pending, active, deadlines, remaining = self.pending, self.active, self.deadlines, self.remaining
+        t = self.now
+        while True:
+            while pending and pending[0][0] <= t:
+                _, i = heapq.heappop(pending)
+                heapq.heappush(active, (self.priority(i), i, self.deadline(i)))
+                if self.on_expire is not None:
+                    heapq.heappush(deadlines, (self.deadline(i), i))
+            while deadlines and (deadlines[0][0] < t or remaining[deadlines[0][1]] == 0):
+                d, i = heapq.heappop(deadlines)
+                if remaining[i] > 0:
+                    self.on_expire(i, d)
+            if t >= until:
+                break
+            while active and (remaining[active[0][1]] == 0 or active[0][2] < t):
+                heapq.heappop(active)
+            next_release = pending[0][0] if pending else None
+            if not active:
+                # idle; only a release can follow
+                if next_release is None:
+                    break
+                t = min(next_release, until)
+                continue
+            _, i, d = active[0]
+            stop = min(until, d + 1, t + remaining[i])
+            if next_release is not None:
+                stop = min(stop, next_release)
+            remaining[i] -= stop - t
+            self.on_run(i, t, stop)
+            t = stop
+            if remaining[i] == 0:
+                heapq.heappop(active)
+                if self.on_done is not None:
+                    self.on_done(i, t - 1)
+        self.now = max(self.now, min(t, until))
+
 def log_results_csv(test_case_name, csv_file="results_log.csv"):
-    global scheduled_jobs, total_profit
-    rows = []
-    job_details = []
-    for job in scheduled_jobs:
-        slots = ",".join(map(str, job["assigned_slots"])) if job["assigned_slots"] else "null"
-        job_details.append(f"id:{job['id']} r:{job['r']} d:{job['d']} p:{job['p']} w:{job['w']} l:{job['l']} slots:{slots}")
-    rows.append({
-        "date": datetime.now().date(),
-        "time": datetime.now().time().strftime("%H:%M:%S"),
-        "test_case": test_case_name,
-        "total_profit": total_profit,
-        "job_details": " | ".join(job_details)
-    })
-    df = pd.DataFrame(rows)
-    if os.path.exists(csv_file):
-        df.to_csv(csv_file, mode="a", index=False, header=False)
-    else:
-        df.to_csv(csv_file, index=False, header=True)
+    reporting.log_results_csv(test_case_name, scheduled_jobs, total_profit, csv_file)
 
 def save_results_txt(test_case_name, output_folder="results"):
-    global scheduled_jobs, total_profit
-    os.makedirs(output_folder, exist_ok=True)
-    path = os.path.join(output_folder, f"{test_case_name}.txt")
-    with open(path, "w") as f:
-        for job in sorted(scheduled_jobs, key=lambda x: x["id"]):
-            if job["assigned_slots"]:
-                f.write(",".join(map(str, job["assigned_slots"])) + "\n")
-            else:
-                f.write("null\n")
-        f.write(str(total_profit) + "\n")
-    print(f"\nResults saved to {path}")
+    reporting.save_results_txt(test_case_name, scheduled_jobs, total_profit, output_folder)
 
 # ---------------------------
 # Main online algorithm
 # ---------------------------
 def run_online_algorithm_from_file(input_file):
+    # Load jobs
+    jobs = read_jobs(input_file)
+    run_online_algorithm(jobs)
+    finalize_and_save(input_file)
+
+class HighScoreScheduler:
     """
     Online preemptive policy:
       - Time ticks t from min(r) to max(d).
@@ -88,100 +140,187 @@ def run_online_algorithm_from_file(input_file):
       - Pick job with highest score = (w + l) / p. (Break ties by: higher w, earlier d, smaller id.)
       - Assign 1 unit at time t to that job (preemption allowed).
       - At the end: +w if remaining == 0; otherwise -l. Infeasible at arrival => immediate -l.
+    run() annotates the job dicts in place and returns the total profit.
+    Every instance owns its calendar and profit, so any number of them can run side by side
+    (threads included). Printing is off unless verbose; nothing is written unless save() is called.
+    With event_driven (the default) the clock jumps from event to event and a job gets its
+    whole run of slots at once (HighScoreEvents): O(n log n) for the decisions instead of
+    O(T log n) for horizon T, same schedule. Writing the slot lists and the calendar still
+    costs O(1) per busy slot; the calendar then only holds busy slots (calendar.get(t, 0) for
+    idle).
+    A JobSet is always run event-driven, straight from its columns, and left untouched; the
+    slots and outcomes then go to self.state (a RunState, which also stands in for the calendar).
     """
-    global calendar, scheduled_jobs, total_profit
-    calendar = {}
-    scheduled_jobs = []
-    total_profit = 0
+    def __init__(self, verbose=False, event_driven=True):
+        self.verbose = verbose
+        self.event_driven = event_driven
+        self.calendar = {}          # t -> job_id (or 0 if idle)
+        self.scheduled_jobs = []    # list of job dicts with annotations
+        self.total_profit = 0
+        self.state = None           # RunState of a JobSet run
 
-    # Load jobs
-    jobs = read_jobs(input_file)
+    def run(self, jobs):
+        self.calendar = {}
+        self.scheduled_jobs = []
+        self.total_profit = 0
+        self.state = None
+        if isinstance(jobs, JobSet):
+            return self._run_columns(jobs)
 
-    # Preprocess jobs
-    for job in jobs:
-        mark_infeasible(job)
-        compute_score(job)
-        annotate_job(job)
-
-    # Immediately reject infeasible jobs with penalty
-    for job in jobs:
-        if not job["feasible"]:
-            job["rejected"] = True
-            job["penalized_now"] = True
-            total_profit -= job["l"]
-            print(f"Job {job['id']} infeasible → -{job['l']}, slots = null")
-
-    # If all feasible jobs are rejected, we still want to output their null lines later
-    scheduled_jobs = jobs[:]  # keep original order for final output
-
-    # Determine simulation horizon
-    feasible_jobs = [j for j in jobs if j["feasible"] and not j["rejected"]]
-    if feasible_jobs:
-        T_min = min(j["r"] for j in feasible_jobs)
-        T_max = max(j["d"] for j in feasible_jobs)
-    else:
-        # nothing schedulable; just finalize and save
-        finalize_and_save(input_file)
-        return
-
-    # Active heap: max-heap by score (use negatives for heapq). Tie-breakers: -w, d, id
-    # Entry = (-score, -w, d, id, job_ref)
-    active = []
-    # Jobs keyed by release times for efficient insertion
-    releases = {}
-    for j in feasible_jobs:
-        releases.setdefault(j["r"], []).append(j)
-
-    # Simulation over time
-    for t in range(T_min, T_max + 1):
-        # Add newly released jobs
-        for j in releases.get(t, []):
-            if j["remaining"] > 0:
-                heapq.heappush(active, (-j["score"], -j["w"], j["d"], j["id"], j))
-
-        # Drop expired or finished jobs from the top as needed
-        while active and (active[0][4]["remaining"] == 0 or t > active[0][4]["d"]):
-            heapq.heappop(active)
-
-        # Also lazily skip expired/finished entries when popped later
-
-        # Pick best available job (if any)
-        chosen_job = None
-        while active:
-            _, _, _, _, cand = heapq.heappop(active)
-            if cand["remaining"] > 0 and t <= cand["d"]:
-                chosen_job = cand
-                break
-            # else skip finished/expired stales and keep popping
-
-        if chosen_job is not None:
-            # Assign one unit at time t
-            chosen_job["assigned_slots"].append(t)
-            chosen_job["remaining"] -= 1
-            calendar[t] = chosen_job["id"]
-            # If still has remaining and deadline not yet passed, push back for future consideration
-            if chosen_job["remaining"] > 0 and t < chosen_job["d"]:
-                heapq.heappush(active, (-chosen_job["score"], -chosen_job["w"], chosen_job["d"], chosen_job["id"], chosen_job))
+        # Preprocess jobs
+        for job in jobs:
+            mark_infeasible(job)
+            compute_score(job)
+            annotate_job(job)
+
+        # Immediately reject infeasible jobs with penalty
+        for job in jobs:
+            if not job["feasible"]:
+                job["rejected"] = True
+                job["penalized_now"] = True
+                self.total_profit -= job["l"]
+                if self.verbose:
+                    print(f"Job {job['id']} infeasible → -{job['l']}, slots = null")
+
+        # If all feasible jobs are rejected, we still want to output their null lines later
+        self.scheduled_jobs = jobs[:]  # keep original order for final output
+
+        # Determine simulation horizon
+        feasible_jobs = [j for j in jobs if j["feasible"] and not j["rejected"]]
+        if feasible_jobs:
+            T_min = min(j["r"] for j in feasible_jobs)
+            T_max = max(j["d"] for j in feasible_jobs)
         else:
-            # Idle
-            calendar[t] = 0
-
-    # Settle rewards/penalties
-    for job in jobs:
-        if job["rejected"]:
-            # already penalized
-            continue
-        if not job["feasible"]:
-            # already handled as rejected
-            continue
-        if job["remaining"] == 0:
-            total_profit += job["w"]
-            print(f"Job {job['id']} DONE → +{job['w']}, slots = {job['assigned_slots']}")
+            # nothing schedulable; caller finalizes and saves
+            return self.total_profit
+
+        if self.event_driven:
+            self._simulate_events(feasible_jobs)
         else:
-            total_profit -= job["l"]
-            print(f"Job {job['id']} NOT done → -{job['l']}, slots = {job['assigned_slots'] if job['assigned_slots'] else 'null'}")
+            self._simulate_ticks(feasible_jobs, T_min, T_max)
 
-    finalize_and_save(input_file)
+        # Settle rewards/penalties
+        for job in jobs:
+            if job["rejected"]:
+                # already penalized
+                continue
+            if not job["feasible"]:
+                # already handled as rejected
+                continue
+            if job["remaining"] == 0:
+                self.total_profit += job["w"]
+                if self.verbose:
+                    print(f"Job {job['id']} DONE → +{job['w']}, slots = {job['assigned_slots']}")
+            else:
+                self.total_profit -= job["l"]
+                if self.verbose:
+                    print(f"Job {job['id']} NOT done → -{job['l']}, slots = {job['assigned_slots'] if job['assigned_slots'] else 'null'}")
+
+        return self.total_profit
+
+    def _simulate_ticks(self, feasible_jobs, T_min, T_max):
+        # Reference mode: one heap round-trip per time slot, idle slots included
+        # Active heap: min-heap by job_priority(job), entry = (priority, job_ref)
+        active = []
+        # Jobs keyed by release times for efficient insertion
+        releases = {}
+        for j in feasible_jobs:
+            releases.setdefault(j["r"], []).append(j)
+
+        # Simulation over time
+        for t in range(T_min, T_max + 1):
+            # Add newly released jobs
+            for j in releases.get(t, []):
+                if j["remaining"] > 0:
+                    heapq.heappush(active, (job_priority(j), j))
+
+            # Drop expired or finished jobs from the top as needed
+            while active and (active[0][1]["remaining"] == 0 or t > active[0][1]["d"]):
+                heapq.heappop(active)
+
+            # Pick best available job (if any)
+            chosen_job = None
+            while active:
+                _, cand = heapq.heappop(active)
+                if cand["remaining"] > 0 and t <= cand["d"]:
+                    chosen_job = cand
+                    break
+                # else skip finished/expired stales and keep popping
+
+            if chosen_job is not None:
+                # Assign one unit at time t
+                chosen_job["assigned_slots"].append(t)
+                chosen_job["remaining"] -= 1
+                self.calendar[t] = chosen_job["id"]
+                # If still has remaining and deadline not yet passed, push back for future consideration
+                if chosen_job["remaining"] > 0 and t < chosen_job["d"]:
+                    heapq.heappush(active, (job_priority(chosen_job), chosen_job))
+            else:
+                # Idle
+                self.calendar[t] = 0
+
+    def _simulate_events(self, feasible_jobs):
+        remaining = [j["remaining"] for j in feasible_jobs]
+
+        def on_run(i, start, stop):
+            job = feasible_jobs[i]
+            job["assigned_slots"].extend(range(start, stop))
+            self.calendar.update(dict.fromkeys(range(start, stop), job["id"]))
+
+        events = HighScoreEvents(lambda i: feasible_jobs[i]["r"], lambda i: feasible_jobs[i]["d"],
+                                 lambda i: job_priority(feasible_jobs[i]), remaining, on_run)
+        for i in range(len(feasible_jobs)):
+            events.submit(i)
+        events.advance(max(j["d"] for j in feasible_jobs) + 1)
+        for job, left in zip(feasible_jobs, remaining):
+            job["remaining"] = left
+
+    def _run_columns(self, jobs):
+        # the same event loop on the JobSet columns, with the run's state in a RunState
+        self.scheduled_jobs = jobs
+        self.state = state = RunState(jobs)
+        ids, r, d, p, w, l = jobs.id, jobs.r, jobs.d, jobs.p, jobs.w, jobs.l
+        remaining = state.remaining
+        events = HighScoreEvents(r.__getitem__, d.__getitem__, lambda i: priority(w[i], l[i], p[i], d[i], ids[i]), remaining,
+                                 lambda i, start, stop: state.assign(i, range(start, stop)))
+        feasible = []
+        for i in range(len(jobs)):
+            if is_feasible(r[i], d[i], p[i]):
+                feasible.append(i)
+                events.submit(i)
+            else:
+                remaining[i] = 0
+                self.total_profit -= l[i]
+                if self.verbose:
+                    print(f"Job {ids[i]} infeasible → -{l[i]}, slots = null")
+        if feasible:
+            events.advance(max(d[i] for i in feasible) + 1)
+
+        per_job = state.slots() if self.verbose else None
+        for i in feasible:
+            if remaining[i] == 0:
+                state.done[i] = 1
+                self.total_profit += w[i]
+                if self.verbose:
+                    print(f"Job {ids[i]} DONE → +{w[i]}, slots = {per_job[i]}")
+            else:
+                self.total_profit -= l[i]
+                if self.verbose:
+                    print(f"Job {ids[i]} NOT done → -{l[i]}, slots = {per_job[i] if per_job[i] else 'null'}")
+        return self.total_profit
+
+    def save(self, test_case_name, output_folder="results", csv_file="results_log.csv"):
+        jobs = self.state.job_dicts(self.scheduled_jobs) if self.state is not None else self.scheduled_jobs
+        reporting.log_results_csv(test_case_name, jobs, self.total_profit, csv_file)
+        reporting.save_results_txt(test_case_name, jobs, self.total_profit, output_folder)
+
+def run_online_algorithm(jobs, verbose=True, event_driven=True):
+    # one HighScoreScheduler run; its state is also published as the module-level results
+    global calendar, scheduled_jobs, total_profit
+    scheduler = HighScoreScheduler(verbose, event_driven)
+    scheduler.run(jobs)
+    calendar, scheduled_jobs, total_profit = scheduler.calendar, scheduler.scheduled_jobs, scheduler.total_profit
+    return total_profit
 
 def finalize_and_save(input_file):
     # Pretty print + persist
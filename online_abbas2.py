@@ -1,12 +1,10 @@
 import os
-from datetime import datetime
-import pandas as pd
+import heapq
+import math
 from read_file import read_jobs
-
-# Optional: known optimal profits for printout
-optimal_profits = {
-    "test1": 133, "test2": 44, "test3": 30, "test4": 10, "test5": 0, "test6": 130, "test7": 70
-}
+from jobset import as_job_dicts
+import reporting
+from reporting import optimal_profits
 
 # ---------------------------
 # Config for the scoring exponents
@@ -18,7 +16,7 @@ D = 1.0  # exponent for frac_work_left
 EPS = 1e-12  # numerical safety
 
 # ---------------------------
-# Global state
+# Last run of the module-level functions (kept for the scripts and notebooks)
 # ---------------------------
 calendar = {}           # t -> job_id (or 0 if idle)
 scheduled_jobs = []     # list of annotated job dicts
@@ -49,137 +47,320 @@ def frac_work_left(job):
         return 1.0  # degenerate, but won't be scheduled
     return max(job["remaining"] / job["p"], EPS)
 
-def dynamic_score(job, t):
-    # (w+l)^A / (p^B * frac_time_left^C * frac_work_left^D)
+def dynamic_score(job, t, exponents=None):
+    # (w+l)^A / (p^B * frac_time_left^C * frac_work_left^D); exponents = (A, B, C, D), default the module config
+    a, b, c, d = exponents if exponents is not None else (A, B, C, D)
     if job["remaining"] <= 0:
         return -float("inf")
-    num = (job["w"] + job["l"]) ** A
-    denom = (max(job["p"], EPS) ** B) * (frac_time_left(job, t) ** C) * (frac_work_left(job) ** D)
+    num = (job["w"] + job["l"]) ** a
+    denom = (max(job["p"], EPS) ** b) * (frac_time_left(job, t) ** c) * (frac_work_left(job) ** d)
     return num / denom
 
+# ---------------------------
+# Kinetic tournament for the best-job selection
+# ---------------------------
+# log score_t = alpha - C * log(d + 1 - t), with alpha = A log(w + l) - B log p + C log window
+# - D log(remaining / p) fixed while the job waits. Two waiting jobs therefore swap order at
+# most once, at a time that can be solved for, so a tournament tree over the active jobs only
+# has to replay a match when that time comes, when a child's winner changes or when the
+# running job's remaining drops. Matches are decided on the exact dynamic_score keys; the
+# log form only says when to look again, and gaps under KINETIC_MARGIN are replayed every tick.
+KINETIC_MARGIN = 1e-9
+KINETIC_MIN_OVERLAP = 32    # below this many overlapping windows the plain scan is faster
+NEVER = math.inf
+
+def max_overlap(jobs):
+    # most windows [r, d] containing one time slot
+    overlap = most = 0
+    for _, step in sorted([(j["r"], 1) for j in jobs] + [(j["d"] + 1, -1) for j in jobs]):
+        overlap += step
+        most = max(most, overlap)
+    return most
+
+class ScoreTournament:
+    """
+    Tournament tree over the jobs in play, at most capacity at a time (each takes a free leaf);
+    best(t) returns the index in jobs of the job the scan loop would pick at t
+    (max (score, w, -d, -id)), or -1 if no job is in play.
+    Only jobs with remaining > 0 go in (alpha takes log p and log remaining).
+    insert/remove/update mark a leaf; best(t) replays the matches above it and those whose
+    recheck time has come, bottom-up, stopping where the winner stays the same: O(log n) each.
+    """
+    def __init__(self, jobs, exponents, capacity):
+        self.jobs = jobs
+        self.exponents = exponents
+        self.size = 1
+        while self.size < capacity:
+            self.size *= 2
+        self.leaf = {}                          # job index -> leaf node
+        self.free = list(range(2 * self.size - 1, self.size - 1, -1))
+        self.winner = [-1] * (2 * self.size)    # job index winning each subtree, -1 if empty
+        self.recheck = [NEVER] * (2 * self.size)
+        self.events = []                        # (recheck time, node), may be stale
+        self.alpha = [0.0] * len(jobs)
+        self.dirty = set()                      # nodes to replay at the next best()
+        self.changed = set()                    # jobs whose alpha changed since then
+
+    def insert(self, i):
+        self.leaf[i] = self.free.pop()
+        self.winner[self.leaf[i]] = i
+        self.update(i)
+
+    def update(self, i):
+        # job i changed its remaining work
+        a, b, c, d = self.exponents
+        job = self.jobs[i]
+        value = job["w"] + job["l"]
+        self.alpha[i] = ((a * math.log(value) if value > 0 else (0.0 if a == 0 else -math.inf))
+                         - b * math.log(job["p"]) + c * math.log(job["d"] - job["r"] + 1)
+                         - d * math.log(job["remaining"] / job["p"]))
+        self.changed.add(i)
+        self.dirty.add(self.leaf[i] // 2)
+
+    def remove(self, i):
+        node = self.leaf.pop(i)
+        self.winner[node] = -1
+        self.free.append(node)
+        self.dirty.add(node // 2)
+
+    def best(self, t):
+        while self.events and self.events[0][0] <= t:
+            time, node = heapq.heappop(self.events)
+            if self.recheck[node] == time:
+                self.dirty.add(node)
+        # replay bottom-up (children have larger indices than their parent); a parent only
+        # needs a replay if the winner below it is new or has changed its remaining work
+        queue = [-node for node in self.dirty if node >= 1]
+        heapq.heapify(queue)
+        queued = self.dirty
+        keys = {}
+        while queue:
+            node = -heapq.heappop(queue)
+            before = self.winner[node]
+            self._play(node, t, keys)
+            parent = node // 2
+            if parent >= 1 and parent not in queued and (self.winner[node] != before or before in self.changed):
+                queued.add(parent)
+                heapq.heappush(queue, -parent)
+        self.dirty = set()
+        self.changed.clear()
+        return self.winner[1]
+
+    def _key(self, i, t, keys):
+        if i not in keys:
+            job = self.jobs[i]
+            keys[i] = (dynamic_score(job, t, self.exponents), job["w"], -job["d"], -job["id"])
+        return keys[i]
+
+    def _play(self, node, t, keys):
+        i, k = self.winner[2 * node], self.winner[2 * node + 1]
+        if i < 0 or k < 0:
+            self.winner[node] = max(i, k)
+            self.recheck[node] = NEVER
+            return
+        if self._key(k, t, keys) > self._key(i, t, keys):
+            i, k = k, i
+        self.winner[node] = i
+        self.recheck[node] = self._next_check(i, k, t)
+        if self.recheck[node] != NEVER:
+            heapq.heappush(self.events, (self.recheck[node], node))
+
+    def _next_check(self, i, k, t):
+        # first tick at which k might catch up with the winner i, both waiting; early is safe
+        c = self.exponents[2]
+        alpha_i, alpha_k = self.alpha[i], self.alpha[k]
+        if not (math.isfinite(alpha_i) and math.isfinite(alpha_k)):
+            return NEVER    # a zero score stays zero
+        x_i, x_k = self.jobs[i]["d"] + 1, self.jobs[k]["d"] + 1
+        gap = alpha_i - alpha_k - c * (math.log(x_i - t) - math.log(x_k - t))
+        if gap <= KINETIC_MARGIN:
+            return t + 1
+        if c * (x_i - x_k) <= 0:
+            return NEVER    # the gap is constant or growing
+        # gap(t') = KINETIC_MARGIN where (x_i - t') / (x_k - t') = exp(q)
+        q = (alpha_i - alpha_k - KINETIC_MARGIN) / c
+        cross = x_k + (x_k - x_i) / math.expm1(q) if q < 700 else x_k
+        check = max(t + 1, math.floor(cross) - 1)
+        return check if check < min(x_i, x_k) else NEVER
+
 def log_results_csv(test_case_name, csv_file="results_log.csv"):
-    global scheduled_jobs, total_profit
-    rows = []
-    details = []
-    for job in scheduled_jobs:
-        slots = ",".join(map(str, job["assigned_slots"])) if job["assigned_slots"] else "null"
-        details.append(
-            f"id:{job['id']} r:{job['r']} d:{job['d']} p:{job['p']} w:{job['w']} l:{job['l']} slots:{slots}"
-        )
-    rows.append({
-        "date": datetime.now().date(),
-        "time": datetime.now().time().strftime("%H:%M:%S"),
-        "test_case": test_case_name,
-        "total_profit": total_profit,
-        "job_details": " | ".join(details),
-    })
-    df = pd.DataFrame(rows)
-    if os.path.exists(csv_file):
-        df.to_csv(csv_file, mode="a", index=False, header=False)
-    else:
-        df.to_csv(csv_file, index=False, header=True)
+    reporting.log_results_csv(test_case_name, scheduled_jobs, total_profit, csv_file)
 
 def save_results_txt(test_case_name, output_folder="results"):
-    global scheduled_jobs, total_profit
-    os.makedirs(output_folder, exist_ok=True)
-    path = os.path.join(output_folder, f"{test_case_name}.txt")
-    with open(path, "w") as f:
-        for job in sorted(scheduled_jobs, key=lambda x: x["id"]):
-            if job["assigned_slots"]:
-                f.write(",".join(map(str, job["assigned_slots"])) + "\n")
-            else:
-                f.write("null\n")
-        f.write(str(total_profit) + "\n")
-    print(f"\nResults saved to {path}")
+    reporting.save_results_txt(test_case_name, scheduled_jobs, total_profit, output_folder)
 
 # ---------------------------
 # Main online algorithm (dynamic-score policy)
 # ---------------------------
 def run_online_algorithm_from_file(input_file):
+    jobs = read_jobs(input_file)
+    run_online_algorithm(jobs)
+    finalize_and_save(input_file)
+
+class DynamicScoreScheduler:
     """
     Online preemptive scheduling with dynamic score:
       score_t = (w + l)^A / (p^B * frac_time_left(t)^C * frac_work_left(t)^D).
     At each integer time t, among jobs with r <= t <= d and remaining > 0,
     pick the job with maximum current score; break ties by higher w, earlier d, smaller id.
+    run() annotates the job dicts in place and returns the total profit.
+    Every instance owns its state and exponents (A, B, C, D; default the module config when it
+    is created), so any number of them can run side by side (threads included). Printing is
+    off unless verbose; nothing is written unless save() is called.
+    With kinetic the pick comes from a ScoreTournament instead of rescoring every active job:
+    O(log n) per tick and per order change, idle gaps skipped, same schedule. The calendar
+    then only holds busy slots (calendar.get(t, 0) for idle). The default (None) uses it when
+    more than KINETIC_MIN_OVERLAP windows overlap.
     """
-    global calendar, scheduled_jobs, total_profit
-    calendar = {}
-    scheduled_jobs = []
-    total_profit = 0
+    def __init__(self, verbose=False, exponents=None, kinetic=None):
+        self.verbose = verbose
+        self.exponents = exponents if exponents is not None else (A, B, C, D)
+        self.kinetic = kinetic
+        self.calendar = {}          # t -> job_id (or 0 if idle)
+        self.scheduled_jobs = []    # list of annotated job dicts
+        self.total_profit = 0
 
-    jobs = read_jobs(input_file)
+    def run(self, jobs):
+        # a JobSet is run on job dicts made from it (self.scheduled_jobs)
+        jobs = as_job_dicts(jobs)
+        self.calendar = {}
+        self.scheduled_jobs = []
+        self.total_profit = 0
+
+        # Preprocess
+        for job in jobs:
+            mark_infeasible(job)
+            annotate_job(job)
+
+        # Immediate penalties for infeasible on arrival
+        for job in jobs:
+            if not job["feasible"]:
+                job["rejected"] = True
+                self.total_profit -= job["l"]
+                if self.verbose:
+                    print(f"Job {job['id']} infeasible → -{job['l']}, slots = null")
+
+        self.scheduled_jobs = jobs[:]  # keep for final writeout
+
+        feasible = [j for j in jobs if j["feasible"] and not j["rejected"]]
+        if not feasible:
+            # nothing schedulable; caller finalizes and saves
+            return self.total_profit
+
+        # at most as many jobs in play as windows overlap; the log form ignores the EPS floor
+        # of frac_time_left, reached only for huge windows
+        capacity = max_overlap(feasible)
+        kinetic = self.kinetic if self.kinetic is not None else capacity > KINETIC_MIN_OVERLAP
+        if kinetic and max(j["d"] - j["r"] + 1 for j in feasible) * EPS < 1:
+            self._simulate_kinetic(feasible, capacity)
+        else:
+            self._simulate_scan(feasible)
+
+        # Settle rewards/penalties
+        for job in jobs:
+            if job["rejected"]:
+                continue
+            if not job["feasible"]:
+                continue
+            if job["remaining"] == 0:
+                self.total_profit += job["w"]
+                if self.verbose:
+                    print(f"Job {job['id']} DONE → +{job['w']}, slots = {job['assigned_slots']}")
+            else:
+                self.total_profit -= job["l"]
+                if self.verbose:
+                    print(f"Job {job['id']} NOT done → -{job['l']}, slots = {job['assigned_slots'] if job['assigned_slots'] else 'null'}")
+
+        return self.total_profit
+
+    def _simulate_scan(self, feasible):
+        # Reference mode: rescore every active job at every tick, idle ticks included
+        T_min = min(j["r"] for j in feasible)
+        T_max = max(j["d"] for j in feasible)
+
+        # Group by release for O(1) arrivals
+        releases = {}
+        for j in feasible:
+            releases.setdefault(j["r"], []).append(j)
+
+        active = []  # simple list; we recompute scores each step for clarity
+
+        for t in range(T_min, T_max + 1):
+            # Add newly released jobs
+            for j in releases.get(t, []):
+                if j["remaining"] > 0:
+                    active.append(j)
+
+            # Remove expired / finished from active
+            active = [j for j in active if j["remaining"] > 0 and t <= j["d"]]
+
+            # Pick job with max dynamic score (tie-breakers: w desc, d asc, id asc)
+            if active:
+                # Compute scores
+                best = None
+                best_key = None
+                for j in active:
+                    s = dynamic_score(j, t, self.exponents)
+                    # We maximize (s, w, -d, -id) effectively
+                    key = (s, j["w"], -j["d"], -j["id"])
+                    if (best is None) or (key > best_key):
+                        best = j
+                        best_key = key
+                # Execute one unit on the chosen job
+                best["assigned_slots"].append(t)
+                best["remaining"] -= 1
+                self.calendar[t] = best["id"]
+            else:
+                self.calendar[t] = 0  # idle
+
+    def _simulate_kinetic(self, feasible, capacity):
+        arrivals = sorted(range(len(feasible)), key=lambda i: feasible[i]["r"])
+        expiries = []   # (d, index) of released jobs
+        tournament = ScoreTournament(feasible, self.exponents, capacity)
+        k = 0
+        t = feasible[arrivals[0]]["r"]
+        while True:
+            # Drop expired jobs, add newly released ones
+            while expiries and expiries[0][0] < t:
+                _, i = heapq.heappop(expiries)
+                if feasible[i]["remaining"] > 0:
+                    tournament.remove(i)
+            while k < len(arrivals) and feasible[arrivals[k]]["r"] <= t:
+                # p = 0 jobs are done on arrival and never in play, as in the scan
+                if feasible[arrivals[k]]["remaining"] > 0:
+                    tournament.insert(arrivals[k])
+                    heapq.heappush(expiries, (feasible[arrivals[k]]["d"], arrivals[k]))
+                k += 1
+
+            i = tournament.best(t)
+            if i < 0:
+                if k == len(arrivals):
+                    break
+                t = feasible[arrivals[k]]["r"]     # idle until the next release
+                continue
 
-    # Preprocess
-    for job in jobs:
-        mark_infeasible(job)
-        annotate_job(job)
-
-    # Immediate penalties for infeasible on arrival
-    for job in jobs:
-        if not job["feasible"]:
-            job["rejected"] = True
-            total_profit -= job["l"]
-            print(f"Job {job['id']} infeasible → -{job['l']}, slots = null")
-
-    scheduled_jobs = jobs[:]  # keep for final writeout
-
-    feasible = [j for j in jobs if j["feasible"] and not j["rejected"]]
-    if not feasible:
-        finalize_and_save(input_file)
-        return
-
-    T_min = min(j["r"] for j in feasible)
-    T_max = max(j["d"] for j in feasible)
-
-    # Group by release for O(1) arrivals
-    releases = {}
-    for j in feasible:
-        releases.setdefault(j["r"], []).append(j)
-
-    active = []  # simple list; we recompute scores each step for clarity
-
-    for t in range(T_min, T_max + 1):
-        # Add newly released jobs
-        for j in releases.get(t, []):
-            if j["remaining"] > 0:
-                active.append(j)
-
-        # Remove expired / finished from active
-        active = [j for j in active if j["remaining"] > 0 and t <= j["d"]]
-
-        # Pick job with max dynamic score (tie-breakers: w desc, d asc, id asc)
-        if active:
-            # Compute scores
-            best = None
-            best_key = None
-            for j in active:
-                s = dynamic_score(j, t)
-                # We maximize (s, w, -d, -id) effectively
-                key = (s, j["w"], -j["d"], -j["id"])
-                if (best is None) or (key > best_key):
-                    best = j
-                    best_key = key
             # Execute one unit on the chosen job
+            best = feasible[i]
             best["assigned_slots"].append(t)
             best["remaining"] -= 1
-            calendar[t] = best["id"]
-        else:
-            calendar[t] = 0  # idle
-
-    # Settle rewards/penalties
-    for job in jobs:
-        if job["rejected"]:
-            continue
-        if not job["feasible"]:
-            continue
-        if job["remaining"] == 0:
-            total_profit += job["w"]
-            print(f"Job {job['id']} DONE → +{job['w']}, slots = {job['assigned_slots']}")
-        else:
-            total_profit -= job["l"]
-            print(f"Job {job['id']} NOT done → -{job['l']}, slots = {job['assigned_slots'] if job['assigned_slots'] else 'null'}")
+            self.calendar[t] = best["id"]
+            if best["remaining"] == 0:
+                tournament.remove(i)
+            else:
+                tournament.update(i)
+            t += 1
 
-    finalize_and_save(input_file)
+    def save(self, test_case_name, output_folder="results", csv_file="results_log.csv"):
+        reporting.log_results_csv(test_case_name, self.scheduled_jobs, self.total_profit, csv_file)
+        reporting.save_results_txt(test_case_name, self.scheduled_jobs, self.total_profit, output_folder)
+
+def run_online_algorithm(jobs, verbose=True, kinetic=None):
+    # one DynamicScoreScheduler run; its state is also published as the module-level results
+    global calendar, scheduled_jobs, total_profit
+    scheduler = DynamicScoreScheduler(verbose, kinetic=kinetic)
+    scheduler.run(jobs)
+    calendar, scheduled_jobs, total_profit = scheduler.calendar, scheduler.scheduled_jobs, scheduler.total_profit
+    return total_profit
 
 def finalize_and_save(input_file):
     base = os.path.splitext(os.path.basename(input_file))[0]
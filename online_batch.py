@@ -0,0 +1,99 @@
+import sys
+import time
+import zipfile
+import numpy as np
+import online_abbas2
+from online_abbas2 import EPS
+from read_file import parse_jobs
+
+# ---------------------------
+# Lockstep simulation of the dynamic-score policy over many instances
+# ---------------------------
+# The instances of a batch are padded to one (instances x jobs) array per field and advanced
+# together, one tick at a time: every tick scores the active jobs of all instances at once
+# and picks one per instance with the same key as online_abbas2 (score, then higher w,
+# earlier d, smaller id). Powers go through Python's ** on the distinct values of the tick,
+# so the scores are the very floats of dynamic_score and the profits match it exactly.
+
+def pack(instances):
+    # padding jobs are infeasible (d < r) with l = 0, so they never run and cost nothing
+    n = max((len(jobs) for jobs in instances), default=0) or 1
+    fields = {key: np.zeros((len(instances), n), dtype=np.int64) for key in ("id", "r", "d", "p", "w", "l")}
+    fields["d"][:] = -1
+    fields["p"][:] = 1
+    for row, jobs in enumerate(instances):
+        for col, job in enumerate(jobs):
+            for key in fields:
+                fields[key][row, col] = job[key]
+    return fields
+
+def _pow(x, e):
+    # x ** e exactly as the scalar code computes it (numpy's power may differ in the last bit)
+    if e == 1:
+        return x
+    if e == 0:
+        return np.ones_like(x)
+    values, inverse = np.unique(x, return_inverse=True)
+    return np.array([v ** e for v in values.tolist()], dtype=np.float64)[inverse]
+
+def simulate(fields, exponents=None):
+    """
+    Run the dynamic-score policy on a packed batch; returns the total profit per instance.
+    exponents = (A, B, C, D), default online_abbas2's module config.
+    """
+    a, b, c, e = exponents if exponents is not None else (online_abbas2.A, online_abbas2.B, online_abbas2.C, online_abbas2.D)
+    r, d, p, w, l, ids = (fields[key] for key in ("r", "d", "p", "w", "l", "id"))
+    feasible = (d - r + 1) >= p
+    remaining = np.where(feasible, p, 0)
+    window = np.maximum(d - r + 1, 1)
+    num = _pow((w + l).astype(np.float64), a)
+    p_term = _pow(np.maximum(p, EPS).astype(np.float64), b)
+
+    if feasible.any():
+        for t in range(int(r[feasible].min()), int(d[feasible].max()) + 1):
+            rows, cols = np.nonzero(feasible & (r <= t) & (t <= d) & (remaining > 0))
+            if len(rows) == 0:
+                continue
+            left = np.maximum(d[rows, cols] - t + 1, 0)
+            time_left = np.maximum(left / window[rows, cols], EPS)
+            work_left = np.maximum(remaining[rows, cols] / p[rows, cols], EPS)
+            score = num[rows, cols] / (p_term[rows, cols] * _pow(time_left, c) * _pow(work_left, e))
+            # per instance the first entry by (-score, -w, d, id) is the one to run
+            order = np.lexsort((ids[rows, cols], d[rows, cols], -w[rows, cols], -score, rows))
+            first = order[np.r_[True, rows[order][1:] != rows[order][:-1]]]
+            remaining[rows[first], cols[first]] -= 1
+
+    done = feasible & (remaining == 0)
+    return np.where(done, w, -l).sum(axis=1)
+
+def simulate_batch(instances, exponents=None, batch_size=1024):
+    """
+    Total profit of the dynamic-score policy on every instance (lists of job dicts), in order.
+    Instances are packed by size so the padding stays small.
+    """
+    profits = [0] * len(instances)
+    by_size = sorted(range(len(instances)), key=lambda i: len(instances[i]))
+    for start in range(0, len(by_size), batch_size):
+        chunk = by_size[start:start + batch_size]
+        for i, profit in zip(chunk, simulate(pack([instances[i] for i in chunk]), exponents)):
+            profits[i] = int(profit)
+    return profits
+
+
+if __name__ == "__main__":
+    zip_path = sys.argv[1] if len(sys.argv) > 1 else "job_scheduling_instances.zip"
+    with zipfile.ZipFile(zip_path) as archive:
+        names = sorted(name for name in archive.namelist() if name.endswith(".txt"))
+        instances = [parse_jobs(archive.read(name).decode()) for name in names]
+
+    start = time.perf_counter()
+    batched = simulate_batch(instances)
+    batch_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    scalar = [online_abbas2.DynamicScoreScheduler().run([dict(job) for job in jobs]) for jobs in instances]
+    scalar_seconds = time.perf_counter() - start
+
+    mismatches = sum(x != y for x, y in zip(batched, scalar))
+    print(f"{len(instances)} instances: batched {batch_seconds:.2f}s, scalar {scalar_seconds:.2f}s, "
+          f"total profit {sum(batched)}, {mismatches} mismatches")
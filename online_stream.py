@@ -0,0 +1,169 @@
+import time
+import online
+import online_abbas
+from read_file import read_jobs
+
+# ---------------------------
+# Streaming online scheduling
+# ---------------------------
+# The batch schedulers read a whole file before they start; a stream takes one arrival at
+# a time instead. feed(job) moves the clock to the job's release and submits it, poll()
+# returns the decisions committed since the last call and finish() settles whatever is
+# left. Per-arrival latency is recorded, so a live source can be measured directly.
+#   GreedyStream      decides every job when it arrives (same schedule as online.py)
+#   HighScoreStream   event-driven version of online_abbas.py; arrivals must come in
+#                     release order and the clock jumps from event to event
+
+class OnlineStream:
+    # shared driver: clock, decisions, latency bookkeeping
+    def __init__(self, verbose=False):
+        self.verbose = verbose
+        self.total_profit = 0
+        self.decisions = []     # committed outcomes, in commit order
+        self.latencies = []     # seconds per arrival (advance + submit)
+        self._polled = 0
+
+    def commit(self, job, outcome, t, delta):
+        self.total_profit += delta
+        slots = job["assigned_slots"] or []
+        decision = {"id": job["id"], "outcome": outcome, "time": t, "profit": delta, "slots": slots}
+        self.decisions.append(decision)
+        if self.verbose:
+            sign = f"+{delta}" if delta >= 0 else f"{delta}"
+            print(f"t={t}: Job {job['id']} {outcome} → {sign}, slots = {slots if slots else 'null'}")
+        return decision
+
+    def poll(self):
+        # decisions committed since the previous poll
+        new = self.decisions[self._polled:]
+        self._polled = len(self.decisions)
+        return new
+
+    def feed(self, job):
+        start = time.perf_counter()
+        self.advance(job["r"])
+        self.submit(job)
+        self.latencies.append(time.perf_counter() - start)
+
+    def latency_summary(self):
+        if not self.latencies:
+            return {"arrivals": 0}
+        ordered = sorted(self.latencies)
+        pick = lambda q: ordered[min(len(ordered) - 1, int(q * len(ordered)))] * 1e6
+        return {
+            "arrivals": len(ordered),
+            "mean_us": sum(ordered) / len(ordered) * 1e6,
+            "p50_us": pick(0.5),
+            "p99_us": pick(0.99),
+            "max_us": ordered[-1] * 1e6,
+        }
+
+class GreedyStream(OnlineStream):
+    # first-fit on arrival on online.NextFreeSlot, same decisions as online.GreedyScheduler for
+    # the same arrival order
+    def __init__(self, verbose=False):
+        super().__init__(verbose)
+        self.free = online.NextFreeSlot()
+
+    def advance(self, until):
+        # greedy decisions do not depend on the clock
+        pass
+
+    def submit(self, job):
+        online.filter_infeasible(job)
+        online.compute_score(job)
+        slots = self.free.first_fit(job["r"], job["d"], job["p"]) if job["feasible"] else None
+        job["assigned_slots"] = slots
+        if slots is None:
+            return self.commit(job, "NOT done", job["r"], -job["l"])
+        return self.commit(job, "DONE", job["r"], job["w"])
+
+    def finish(self):
+        return self.total_profit
+
+class HighScoreStream(OnlineStream):
+    """
+    online_abbas's policy (highest (w + l) / p first, ties: higher w, earlier d, smaller id)
+    on its event loop, online_abbas.HighScoreEvents: between two releases the chosen job stays
+    on top, so it gets the whole run of slots until the next release, its deadline or its
+    completion in one step. Every arrival, completion and deadline costs O(log n), plus O(1)
+    per slot written to the job's slot list.
+    """
+    def __init__(self, verbose=False):
+        super().__init__(verbose)
+        self.jobs = []          # submitted feasible jobs, by event index
+        self.remaining = []
+        self.events = online_abbas.HighScoreEvents(
+            lambda i: self.jobs[i]["r"], lambda i: self.jobs[i]["d"], lambda i: online_abbas.job_priority(self.jobs[i]),
+            self.remaining, self._run, self._done, self._expire)
+        self.horizon = None
+
+    @property
+    def now(self):
+        # first slot not simulated yet
+        return self.events.now
+
+    def _run(self, i, start, stop):
+        job = self.jobs[i]
+        job["assigned_slots"].extend(range(start, stop))
+        job["remaining"] = self.remaining[i]
+
+    def _done(self, i, t):
+        self.commit(self.jobs[i], "DONE", t, self.jobs[i]["w"])
+
+    def _expire(self, i, d):
+        self.commit(self.jobs[i], "NOT done", d, -self.jobs[i]["l"])
+
+    def submit(self, job):
+        if self.now is not None and job["r"] < self.now:
+            raise ValueError(f"Job {job['id']} released at {job['r']}, the stream is at {self.now}")
+        online_abbas.mark_infeasible(job)
+        online_abbas.compute_score(job)
+        online_abbas.annotate_job(job)
+        if not job["feasible"]:
+            job["rejected"] = True
+            job["penalized_now"] = True
+            return self.commit(job, "infeasible", job["r"], -job["l"])
+        self.jobs.append(job)
+        self.remaining.append(job["remaining"])
+        self.events.submit(len(self.jobs) - 1)
+        self.horizon = job["d"] if self.horizon is None else max(self.horizon, job["d"])
+
+    def advance(self, until):
+        # simulate every slot t < until
+        self.events.advance(until)
+
+    def finish(self):
+        if self.horizon is not None:
+            self.advance(self.horizon + 1)
+        return self.total_profit
+
+# ---------------------------
+# Drivers
+# ---------------------------
+def stream_jobs(stream, jobs):
+    # feed an iterable of jobs, then settle; returns the stream
+    for job in jobs:
+        stream.feed(job)
+    stream.finish()
+    return stream
+
+async def stream_jobs_async(stream, jobs):
+    # same for an async iterator, e.g. a live arrival source
+    async for job in jobs:
+        stream.feed(job)
+    stream.finish()
+    return stream
+
+
+if __name__ == "__main__":
+    tests = ["test1", "test2", "test3", "test4", "test5", "test6", "test7"]
+    for test_case in tests:
+        for stream in (GreedyStream(), HighScoreStream()):
+            jobs = read_jobs(f"test/{test_case}.txt")
+            if isinstance(stream, HighScoreStream):
+                jobs.sort(key=lambda x: x["r"])      # arrivals in release order
+            stream_jobs(stream, jobs)
+            latency = stream.latency_summary()
+            print(f"{test_case} {type(stream).__name__}: profit {stream.total_profit}, "
+                  f"{latency['arrivals']} arrivals, mean {latency['mean_us']:.1f} us, p99 {latency['p99_us']:.1f} us")
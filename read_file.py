@@ -1,3 +1,5 @@
+import mmap
+
 def read_jobs(filename):
     jobs = []
     with open(filename, "r") as f:
@@ -15,6 +17,108 @@ def read_jobs(filename):
             })
     return jobs
 
+def parse_jobs(text):
+    # same format as read_jobs, from an in-memory string (e.g. a zip member)
+    lines = [line for line in text.splitlines() if line.strip()]
+    n = int(lines[0].strip())
+    jobs = []
+    for j in range(n):
+        r, d, p, w, l = map(int, lines[j+1].strip().split(","))
+        jobs.append({
+            "id": j+1,
+            "r": r,
+            "d": d,
+            "p": p,
+            "w": w,
+            "l": l
+        })
+    return jobs
+
+# ---------------------------
+# Memory-mapped parsers for large files
+# ---------------------------
+SEPARATORS = bytes.maketrans(b",", b" ")
+CHUNK_BYTES = 1 << 20
+
+def iter_int_chunks(buffer, chunk_bytes=CHUNK_BYTES):
+    """
+    The integers of a bytes-like buffer (an mmap included), separated by commas and/or
+    whitespace, as one numpy array per chunk of about chunk_bytes. Chunks end on a line end,
+    so no number is split, and only one chunk of the text is copied at a time.
+    """
+    import numpy as np
+    start, size = 0, len(buffer)
+    while start < size:
+        end = size
+        if start + chunk_bytes < size:
+            cut = buffer.rfind(b"\n", start, start + chunk_bytes)
+            if cut < 0:
+                cut = buffer.find(b"\n", start + chunk_bytes)    # a line longer than a chunk
+            end = size if cut < 0 else cut + 1
+        yield np.fromstring(bytes(buffer[start:end]).translate(SEPARATORS), dtype=np.int64, sep=" ")
+        start = end
+
+def parse_ints(buffer):
+    # every integer in a bytes-like buffer, in order, separated by commas and/or whitespace
+    import numpy as np
+    chunks = list(iter_int_chunks(buffer))
+    return np.concatenate(chunks) if chunks else np.empty(0, dtype=np.int64)
+
+def read_jobset(filename):
+    """
+    Bulk parser: memory-maps the file and converts its numbers chunk by chunk with numpy's C
+    text reader (any whitespace around the commas is fine), straight into the columns of the
+    returned JobSet. Besides the result it holds one chunk of text (CHUNK_BYTES) at a time;
+    iter_jobs is the constant-memory way to job dicts.
+    """
+    import numpy as np
+    from jobset import JobSet
+    jobs = None
+    with open(filename, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        for chunk in iter_int_chunks(mapped):
+            if jobs is None:
+                if not len(chunk):
+                    continue
+                n = int(chunk[0])
+                jobs = JobSet.zeros(n)
+                columns = [np.frombuffer(column, dtype=np.int64) for column in (jobs.r, jobs.d, jobs.p, jobs.w, jobs.l)]
+                filled = 0      # values stored so far, row by row
+                chunk = chunk[1:]
+            part = chunk[:5 * n - filled]
+            for k, column in enumerate(columns):
+                # the values of field k in part start at its first position with (filled + j) % 5 == k
+                first = (k - filled) % 5
+                values = part[first::5]
+                row = (filled + first) // 5
+                column[row:row + len(values)] = values
+            filled += len(part)
+            if filled == 5 * n:
+                break
+    if jobs is None:
+        raise ValueError(f"{filename}: empty file")
+    if filled < 5 * n:
+        raise ValueError(f"{filename}: {n} jobs announced, {filled // 5} found")
+    return jobs
+
+def iter_jobs(filename):
+    """
+    Streaming parser: yields the job dicts of read_jobs one at a time while reading the mapped
+    file, so a trace of any length is consumed without holding it in memory.
+    """
+    with open(filename, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        lines = (line for line in iter(mapped.readline, b"") if line.strip())
+        n = int(next(lines))
+        for j, line in zip(range(n), lines):
+            r, d, p, w, l = map(int, line.split(b","))
+            yield {
+                "id": j+1,
+                "r": r,
+                "d": d,
+                "p": p,
+                "w": w,
+                "l": l
+            }
+
 
 if __name__ == "__main__":
     filename = "test/test4.txt"
@@ -0,0 +1,49 @@
+import csv
+import os
+from datetime import datetime
+
+# Test instance optimal profits for reference
+optimal_profits = {
+    "test1": 133,
+    "test2": 44,
+    "test3": 30,
+    "test4": 10,
+    "test5": 0,
+    "test6": 130,
+    "test7": 70
+}
+
+# ---------------------------
+# Save results to CSV
+# ---------------------------
+def log_results_csv(test_case_name, scheduled_jobs, total_profit, csv_file="results_log.csv"):
+    job_details = []
+    for job in scheduled_jobs:
+        slots = ",".join(map(str, job.get("assigned_slots", []))) if job.get("assigned_slots") else "null"
+        job_details.append(f"id:{job['id']} r:{job['r']} d:{job['d']} p:{job['p']} w:{job['w']} l:{job['l']} slots:{slots}")
+    now = datetime.now()
+    row = [now.date(), now.time().strftime("%H:%M:%S"), test_case_name, total_profit, " | ".join(job_details)]
+    # plain csv append (same layout the pandas writer produced, without importing pandas)
+    new_file = not os.path.exists(csv_file)
+    with open(csv_file, "a", newline="") as f:
+        writer = csv.writer(f, lineterminator="\n")
+        if new_file:
+            writer.writerow(["date", "time", "test_case", "total_profit", "job_details"])
+        writer.writerow(row)
+
+# ---------------------------
+# Save results to txt file
+# ---------------------------
+def save_results_txt(test_case_name, scheduled_jobs, total_profit, output_folder="results"):
+    # results/<test_case_name>.txt: one line of slots (or null) per job in id order, then the profit
+    if not os.path.exists(output_folder):
+        os.makedirs(output_folder)
+    output_path = os.path.join(output_folder, f"{test_case_name}.txt")
+    with open(output_path, "w") as f:
+        for job in sorted(scheduled_jobs, key=lambda x: x["id"]):
+            if job.get("assigned_slots"):
+                f.write(",".join(map(str, job["assigned_slots"])) + "\n")
+            else:
+                f.write("null\n")
+        f.write(str(total_profit) + "\n")
+    print(f"\nResults saved to {output_path}")
@@ -0,0 +1,137 @@
+import csv
+import sqlite3
+import sys
+from datetime import datetime
+
+# ---------------------------
+# SQLite results store
+# ---------------------------
+# python results_store.py results_log.csv results.db      (import the CSV history)
+#
+# The same records as results_log.csv, one row per run in runs and one row per job in jobs
+# (fields and slots as columns instead of the packed job_details string), indexed by test
+# case and run. Runs are buffered and written batch_size at a time in one transaction. The
+# database is in WAL mode with a busy timeout, so every process of a pool can keep its own
+# ResultsStore on the same file.
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    date TEXT,
+    time TEXT,
+    test_case TEXT,
+    total_profit INTEGER
+);
+CREATE TABLE IF NOT EXISTS jobs (
+    run_id INTEGER REFERENCES runs(id),
+    job_id INTEGER,
+    r INTEGER,
+    d INTEGER,
+    p INTEGER,
+    w INTEGER,
+    l INTEGER,
+    slots TEXT                  -- comma separated, NULL if none
+);
+CREATE INDEX IF NOT EXISTS runs_test_case ON runs(test_case);
+CREATE INDEX IF NOT EXISTS jobs_run ON jobs(run_id);
+"""
+
+class ResultsStore:
+    """
+    log() takes what reporting.log_results_csv takes; rows reach the database on flush(),
+    which runs by itself every batch_size runs and on close() / leaving the with block.
+    """
+    def __init__(self, path="results.db", batch_size=256, timeout=60.0):
+        self.path = path
+        self.batch_size = batch_size
+        self.pending = []
+        self.conn = sqlite3.connect(path, timeout=timeout, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def log(self, test_case_name, scheduled_jobs, total_profit, when=None):
+        # when: (date, time) strings of an imported record, else now
+        if when is None:
+            now = datetime.now()
+            when = (str(now.date()), now.time().strftime("%H:%M:%S"))
+        jobs = []
+        for job in scheduled_jobs:
+            slots = ",".join(map(str, job["assigned_slots"])) if job.get("assigned_slots") else None
+            jobs.append((job["id"], job["r"], job["d"], job["p"], job["w"], job["l"], slots))
+        self.pending.append((when, test_case_name, int(total_profit), jobs))
+        if len(self.pending) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if not self.pending:
+            return
+        # BEGIN IMMEDIATE takes the write lock up front; other writers wait up to timeout
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            for (date, time), test_case, total_profit, jobs in self.pending:
+                run_id = self.conn.execute(
+                    "INSERT INTO runs (date, time, test_case, total_profit) VALUES (?, ?, ?, ?)",
+                    (date, time, test_case, total_profit)).lastrowid
+                self.conn.executemany(
+                    "INSERT INTO jobs (run_id, job_id, r, d, p, w, l, slots) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    [(run_id, *job) for job in jobs])
+            self.conn.execute("COMMIT")
+        except BaseException:
+            self.conn.execute("ROLLBACK")
+            raise
+        self.pending = []
+
+    def close(self):
+        if self.conn is not None:
+            self.flush()
+            self.conn.close()
+            self.conn = None
+
+    def runs(self, test_case=None):
+        # (id, date, time, test_case, total_profit) rows, oldest first
+        self.flush()
+        if test_case is None:
+            return self.conn.execute("SELECT * FROM runs ORDER BY id").fetchall()
+        return self.conn.execute("SELECT * FROM runs WHERE test_case = ? ORDER BY id", (test_case,)).fetchall()
+
+    def jobs(self, run_id):
+        # job dicts of one run, with assigned_slots as in the solvers
+        self.flush()
+        rows = self.conn.execute(
+            "SELECT job_id, r, d, p, w, l, slots FROM jobs WHERE run_id = ? ORDER BY rowid", (run_id,))
+        return [{"id": job_id, "r": r, "d": d, "p": p, "w": w, "l": l,
+                 "assigned_slots": [int(t) for t in slots.split(",")] if slots else None}
+                for job_id, r, d, p, w, l, slots in rows]
+
+def parse_job_details(details):
+    # "id:1 r:1 d:1 p:1 w:5 l:25 slots:1,2 | ..." -> job dicts
+    jobs = []
+    for part in filter(None, (part.strip() for part in details.split(" | "))):
+        fields = dict(item.split(":", 1) for item in part.split())
+        job = {key: int(fields[key]) for key in ("id", "r", "d", "p", "w", "l")}
+        job["assigned_slots"] = None if fields["slots"] == "null" else [int(t) for t in fields["slots"].split(",")]
+        jobs.append(job)
+    return jobs
+
+def import_csv(csv_file="results_log.csv", path="results.db"):
+    # every record of a results_log.csv into the store; returns the number of runs
+    count = 0
+    with open(csv_file, newline="") as f, ResultsStore(path) as store:
+        for row in csv.DictReader(f):
+            store.log(row["test_case"], parse_job_details(row["job_details"]), int(row["total_profit"]),
+                      when=(row["date"], row["time"]))
+            count += 1
+    return count
+
+
+if __name__ == "__main__":
+    csv_file = sys.argv[1] if len(sys.argv) > 1 else "results_log.csv"
+    path = sys.argv[2] if len(sys.argv) > 2 else "results.db"
+    print(f"{import_csv(csv_file, path)} runs imported from {csv_file} into {path}")
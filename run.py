@@ -0,0 +1,82 @@
+import argparse
+import glob
+import sys
+import time
+import reporting
+from results_store import ResultsStore
+from batch_runner import iter_files, iter_members, run_batch, summarize, write_results
+from solvers import SOLVERS, DEFAULT_SOLVERS
+
+# ---------------------------
+# Command line entry point for every solver
+# ---------------------------
+# python run.py test/test*.txt --solvers offline online_highscore
+# python run.py job_scheduling_instances.zip --workers 8 --timeout 10 --output corpus.parquet
+#
+# Instances are files, globs or zip archives (every member matching --pattern). --output
+# picks the sink: "results" writes results/<instance>_<solver>.txt and appends to
+# results_log.csv like the scripts do, a .csv or .parquet path writes one table, and
+# "none" only prints the summary. --store also logs every run (with per-job rows) to a
+# SQLite results store, whatever the output. --cache puts a persistent solution cache
+# (solution_cache.py) in front of the offline solvers.
+
+def iter_instances(sources, pattern="*.txt", limit=None):
+    for source in sources:
+        if source.endswith(".zip"):
+            yield from iter_members(source, pattern, limit)
+        else:
+            paths = sorted(glob.glob(source)) or [source]
+            yield from iter_files(paths)
+
+def save_legacy(results):
+    for row in results.itertuples():
+        if row.status != "ok":
+            continue
+        name = f"{row.instance}_{row.solver}"
+        reporting.save_results_txt(name, row.jobs, row.profit)
+        reporting.log_results_csv(name, row.jobs, row.profit)
+
+def save_store(results, path):
+    with ResultsStore(path) as store:
+        for row in results.itertuples():
+            if row.status == "ok":
+                store.log(f"{row.instance}_{row.solver}", row.jobs, row.profit)
+    print(f"\nRuns logged to {path}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run scheduling solvers on instance files.")
+    parser.add_argument("instances", nargs="+", help="instance files, globs or .zip archives")
+    parser.add_argument("--solvers", nargs="+", choices=sorted(SOLVERS) + ["all"], default=DEFAULT_SOLVERS)
+    parser.add_argument("--workers", type=int, default=1, help="processes (0: CPU count)")
+    parser.add_argument("--timeout", type=float, default=None, help="seconds per solver and instance")
+    parser.add_argument("--pattern", default="*.txt", help="glob on zip member names")
+    parser.add_argument("--limit", type=int, default=None, help="first N members of each zip")
+    parser.add_argument("--output", default="results", help='"results", "none", or a .csv / .parquet path')
+    parser.add_argument("--store", default=None, help="also log the runs to this SQLite results store")
+    parser.add_argument("--cache", default=None, help="reuse offline optima from this solution cache file")
+    args = parser.parse_args(argv)
+
+    solver_names = sorted(SOLVERS) if "all" in args.solvers else args.solvers
+    start = time.perf_counter()
+    results = run_batch(iter_instances(args.instances, args.pattern, args.limit), solver_names,
+                        workers=args.workers or None, timeout=args.timeout,
+                        keep_jobs=args.output == "results" or args.store is not None, cache=args.cache)
+
+    known = results["instance"].map(reporting.optimal_profits)
+    if known.notna().any():
+        print(results.assign(optimal=known)[["instance", "solver", "profit", "optimal", "seconds", "status"]].to_string(index=False))
+        print()
+    print(summarize(results).to_string())
+    print(f"\n{results['instance'].nunique()} instances in {time.perf_counter() - start:.1f}s")
+
+    if args.output == "results":
+        save_legacy(results)
+    elif args.output != "none":
+        write_results(results, args.output)
+    if args.store:
+        save_store(results, args.store)
+    return results
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,145 @@
+import hashlib
+import json
+import sqlite3
+import sys
+import time
+import solvers
+
+# ---------------------------
+# Persistent cache of optimal schedules
+# ---------------------------
+# python run.py job_scheduling_instances.zip --solvers offline --cache solutions.db
+# python solution_cache.py solutions.db          (entries per solver, size)
+#
+# Two instances that differ only in job order, job ids or a shift of the time axis have the
+# same optimal profit and, moved back, the same optimal schedules. An instance is reduced to
+# its canonical form (jobs as (r - t0, d - t0, p, w, l) sorted, t0 = the earliest release)
+# and its SHA-256 is the key; a hit maps the stored slots back to the caller's ids and time
+# origin without running a solver. Entries are per solver: a solver is only ever served its own
+# results, so timings stay comparable between solvers. Entries live in SQLite (WAL, so pool workers can share the
+# file) and the least recently used ones go once the stored schedules pass max_bytes.
+
+SCHEMA = """
+DROP TABLE IF EXISTS solutions;     -- older files: one entry per instance, whichever solver wrote last
+CREATE TABLE IF NOT EXISTS schedules (
+    solver TEXT,
+    fingerprint TEXT,
+    profit INTEGER,
+    slots TEXT,                 -- JSON, slot lists in canonical job order and time
+    size INTEGER,
+    last_used REAL,
+    PRIMARY KEY (solver, fingerprint)
+);
+CREATE INDEX IF NOT EXISTS schedules_last_used ON schedules(last_used);
+"""
+
+# options that make a solver exact; its results are cached with them, never with the defaults
+# (HiGHS stops at a relative gap of 1e-4). These solvers also take stats, and a result is only
+# cached if stats["proven"] says the optimum was proven.
+EXACT_OPTIONS = {"offline_milp": {"mip_gap": 0}}
+
+def canonical_form(jobs):
+    """
+    (rows, order, t0): rows are the shifted (r, d, p, w, l) in canonical order, order[k] is the
+    index in jobs of row k, t0 the shift. Identical jobs are interchangeable, so their order
+    among themselves does not matter.
+    """
+    t0 = min((job["r"] for job in jobs), default=0)
+    keyed = sorted((job["r"] - t0, job["d"] - t0, job["p"], job["w"], job["l"], i) for i, job in enumerate(jobs))
+    return [row[:5] for row in keyed], [row[5] for row in keyed], t0
+
+def fingerprint(rows):
+    return hashlib.sha256(json.dumps(rows, separators=(",", ":")).encode()).hexdigest()
+
+class SolutionCache:
+    """
+    get/put by solver and instance; solve(name, jobs, ...) is solvers.solve with the cache in
+    front of the offline solvers. Calls with solver options (time limits, gaps) bypass it, since
+    their results need not be optimal.
+    """
+    def __init__(self, path="solution_cache.db", max_bytes=64 * 2**20, timeout=60.0):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.hits = self.misses = 0
+        self.conn = sqlite3.connect(path, timeout=timeout, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(SCHEMA)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+
+    def get(self, jobs, solver):
+        # (assigned {id: slots}, profit) in the caller's ids and times, or None
+        rows, order, t0 = canonical_form(jobs)
+        key = fingerprint(rows)
+        found = self.conn.execute("SELECT profit, slots FROM schedules WHERE solver = ? AND fingerprint = ?",
+                                  (solver, key)).fetchone()
+        if found is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.conn.execute("UPDATE schedules SET last_used = ? WHERE solver = ? AND fingerprint = ?", (time.time(), solver, key))
+        profit, slots = found
+        assigned = {jobs[i]["id"]: [t + t0 for t in job_slots] for i, job_slots in zip(order, json.loads(slots))}
+        return assigned, profit
+
+    def put(self, jobs, assigned, profit, solver):
+        rows, order, t0 = canonical_form(jobs)
+        slots = json.dumps([[t - t0 for t in assigned.get(jobs[i]["id"]) or []] for i in order], separators=(",", ":"))
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            self.conn.execute("INSERT OR REPLACE INTO schedules VALUES (?, ?, ?, ?, ?, ?)",
+                              (solver, fingerprint(rows), int(profit), slots, len(slots), time.time()))
+            self._evict()
+            self.conn.execute("COMMIT")
+        except BaseException:
+            self.conn.execute("ROLLBACK")
+            raise
+
+    def _evict(self):
+        # drop least recently used entries until the stored schedules fit in max_bytes
+        total = self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM schedules").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for solver, key, size in self.conn.execute("SELECT solver, fingerprint, size FROM schedules ORDER BY last_used").fetchall():
+            if total <= self.max_bytes:
+                break
+            self.conn.execute("DELETE FROM schedules WHERE solver = ? AND fingerprint = ?", (solver, key))
+            total -= size
+
+    def solve(self, name, jobs, test_case_name="", **options):
+        if solvers.SOLVERS[name][2] != "offline" or options:
+            return solvers.solve(name, jobs, test_case_name, **options)
+        cached = self.get(jobs, name)
+        if cached is not None:
+            return cached
+        options = dict(EXACT_OPTIONS.get(name, {}))
+        if name in EXACT_OPTIONS:
+            options["stats"] = {}
+        assigned, profit = solvers.solve(name, jobs, test_case_name, **options)
+        # a run that did not prove its optimum (e.g. a MIP gap left open) is not cached
+        if options.get("stats", {}).get("proven", True):
+            self.put(jobs, assigned, profit, name)
+        return assigned, profit
+
+    def stats(self):
+        entries, size = self.conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM schedules").fetchone()
+        return {"hits": self.hits, "misses": self.misses, "entries": entries, "bytes": size}
+
+
+if __name__ == "__main__":
+    path = sys.argv[1] if len(sys.argv) > 1 else "solution_cache.db"
+    with SolutionCache(path) as cache:
+        for solver, entries, size in cache.conn.execute(
+                "SELECT solver, COUNT(*), SUM(size) FROM schedules GROUP BY solver ORDER BY solver"):
+            print(f"{solver:<16} {entries:>8} entries {size:>12} bytes")
+        stats = cache.stats()
+        print(f"{'total':<16} {stats['entries']:>8} entries {stats['bytes']:>12} bytes (limit {cache.max_bytes})")
@@ -0,0 +1,54 @@
+import importlib
+
+# ---------------------------
+# Solver registry
+# ---------------------------
+# Every solver is run as solve(name, jobs) -> (assigned, total_profit), with printing and
+# file writing switched off. Modules are imported on first use and reused afterwards, so
+# a worker process loads each of them at most once.
+
+SOLVERS = {
+    # name: (module, entry point, kind); "anytime" solvers are called like the offline ones
+    # but return the best schedule found in their time budget, not a proven optimum
+    "offline": ("offline", "dp_schedule", "offline"),
+    "offline_2": ("offline_2", "dp_schedule", "offline"),
+    "offline_3": ("offline_3", "dp_schedule", "offline"),
+    "offline_subset": ("offline_subset", "dp_schedule", "offline"),
+    "offline_layered": ("offline_layered", "dp_schedule", "offline"),
+    "offline_bnb": ("offline_bnb", "bnb_schedule", "offline"),
+    "offline_milp": ("offline_milp", "milp_schedule", "offline"),
+    "offline_incremental": ("offline_incremental", "incremental_schedule", "offline"),
+    "offline_lns": ("offline_lns", "lns_schedule", "anytime"),
+    "offline_metaheuristic": ("offline_metaheuristic", "metaheuristic_schedule", "anytime"),
+    "online": ("online", "GreedyScheduler", "online"),
+    "online_highscore": ("online_abbas", "HighScoreScheduler", "online"),
+    "online_dynscore": ("online_abbas2", "DynamicScoreScheduler", "online"),
+}
+
+# the original four algorithms; the default selection of the CLI
+DEFAULT_SOLVERS = ["offline", "online", "online_highscore", "online_dynscore"]
+
+_loaded = {}
+
+def load(name):
+    module_name, entry, _ = SOLVERS[name]
+    if module_name not in _loaded:
+        _loaded[module_name] = importlib.import_module(module_name)
+    return getattr(_loaded[module_name], entry)
+
+def solve(name, jobs, test_case_name="", **options):
+    """
+    Run solver name on jobs: job dicts (they get annotated, pass copies to keep them clean) or
+    a JobSet (never written).
+    Extra keyword options go to the solver (e.g. time_limit for offline_milp, exponents for
+    online_dynscore). Online solvers run on a fresh scheduler object, so calls are reentrant.
+    Returns (assigned, total_profit) with assigned = {job id: [slots]}.
+    """
+    entry = load(name)
+    if SOLVERS[name][2] != "online":
+        return entry(jobs, test_case_name, verbose=False, save=False, **options)
+    scheduler = entry(**options)
+    total_profit = scheduler.run(jobs)
+    if getattr(scheduler, "state", None) is not None:
+        return scheduler.state.assigned(jobs), total_profit
+    return {job["id"]: job["assigned_slots"] or [] for job in scheduler.scheduled_jobs}, total_profit
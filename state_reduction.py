@@ -0,0 +1,180 @@
+import os
+import sys
+import zipfile
+from bisect import bisect_right
+from read_file import read_jobs, parse_jobs
+from timeline import segments
+
+# ---------------------------
+# Canonical DP states for the slot-mask DPs (offline_2 / offline_3)
+# ---------------------------
+# With jobs sorted by deadline, dp(i, used_mask) only depends on jobs i..n-1. Cut the
+# union of their windows at every r and d+1: inside one of those elementary segments
+# every remaining job sees all slots or none, so only the number of used slots per
+# segment matters, and slots outside every remaining window do not matter at all.
+# Among the states of one layer, one with at least as many used slots in every segment is
+# worth at most as much (DominanceIndex); the DPs skip a choice leading to such a state when
+# the solved one already cannot beat the best choice so far.
+
+def layer_segments(jobs):
+    # segments[i] = elementary (start, end) segments of the windows of jobs[i:]
+    return [segments(jobs[i:]) for i in range(len(jobs) + 1)]
+
+def segment_masks(layer):
+    return [((1 << (end - start + 1)) - 1) << start for start, end in layer]
+
+def canonical_key(used_mask, masks):
+    # projection of used_mask onto the segments: used slot count per segment
+    return tuple((used_mask & mask).bit_count() for mask in masks)
+
+def _group_slots(available_slots, next_layer):
+    # free slots by the next layer's segment they fall in, and the spare ones outside them all
+    starts = [start for start, _ in next_layer]
+    groups = {}
+    spare = []
+    for t in available_slots:
+        k = bisect_right(starts, t) - 1
+        if k >= 0 and t <= next_layer[k][1]:
+            groups.setdefault(k, []).append(t)
+        else:
+            spare.append(t)
+    return groups, spare
+
+def canonical_choices(available_slots, p, next_layer):
+    """
+    One representative slot set per distinct next state. Free slots are grouped by the
+    next layer's segment they fall in; which slots of a group are taken does not matter.
+    Slots outside every later window are spare: using them never hurts a later job, so
+    any choice that leaves a spare slot unused while taking a segment slot is dominated
+    and is dropped - the spare slots are always taken first.
+    """
+    groups, spare = _group_slots(available_slots, next_layer)
+    taken = spare[:p]
+    pieces = [groups[k] for k in sorted(groups)]
+
+    def spread(k, left):
+        if left == 0:
+            yield []
+            return
+        if k == len(pieces):
+            return
+        room_after = sum(len(piece) for piece in pieces[k + 1:])
+        for count in range(min(left, len(pieces[k])), max(0, left - room_after) - 1, -1):
+            for rest in spread(k + 1, left - count):
+                yield pieces[k][:count] + rest
+
+    for chosen in spread(0, p - len(taken)):
+        yield tuple(sorted(taken + chosen))
+
+def choice_counts(chosen, next_layer):
+    """
+    A canonical choice as ((segment, slots taken), ...) over the next layer. Unlike the slots
+    themselves this holds for every used mask with the same canonical key, so it can be
+    stored per memo entry and replayed with replay_choice.
+    """
+    starts = [start for start, _ in next_layer]
+    counts = {}
+    for t in chosen:
+        k = bisect_right(starts, t) - 1
+        if k >= 0 and t <= next_layer[k][1]:
+            counts[k] = counts.get(k, 0) + 1
+    return tuple(sorted(counts.items()))
+
+def replay_choice(available_slots, p, next_layer, counts):
+    # the slot set canonical_choices yields for these counts, on this used mask's free slots
+    groups, spare = _group_slots(available_slots, next_layer)
+    chosen = spare[:p]
+    for k, count in counts:
+        chosen += groups[k][:count]
+    return tuple(sorted(chosen))
+
+FIELD_BITS = 16     # per segment count in a packed key; counts stay below 2^15
+
+def pack_key(key):
+    # a count tuple as one int, FIELD_BITS per count
+    packed = 0
+    for count in reversed(key):
+        packed = (packed << FIELD_BITS) | count
+    return packed
+
+class DominanceIndex:
+    """
+    Solved states per layer, as (key, value). A key that is componentwise >= another key of
+    the same layer has no more free slots in any segment, so its value is at most the other
+    one's: dominated(i, key, limit) is True when some stored key <= key has a value <= limit,
+    i.e. when the state cannot be worth more than limit and need not be solved at all.
+    Each layer is kept sorted by value, so only the stored states worth <= limit are scanned,
+    and keys are packed (pack_key): with the top bit of every field set in the larger key, a
+    subtraction leaves all of those bits set exactly when no field of the other key is larger.
+    """
+    def __init__(self, layers):
+        self.values = [[] for _ in range(layers)]
+        self.keys = [[] for _ in range(layers)]
+        self.guards = {}        # key length -> top bit of every field
+
+    def add(self, i, key, value):
+        k = bisect_right(self.values[i], value)
+        self.values[i].insert(k, value)
+        self.keys[i].insert(k, pack_key(key))
+
+    def dominated(self, i, key, limit):
+        if len(key) not in self.guards:
+            self.guards[len(key)] = pack_key([1 << (FIELD_BITS - 1)] * len(key))
+        guard = self.guards[len(key)]
+        packed = pack_key(key) | guard
+        keys = self.keys[i]
+        for k in range(bisect_right(self.values[i], limit)):
+            if (packed - keys[k]) & guard == guard:
+                return True
+        return False
+
+def pointer_bytes(pointers):
+    # memory held by a back-pointer dict beyond the memo: the table and the stored decisions
+    # (the keys are the memo's own objects)
+    total = sys.getsizeof(pointers)
+    for decision in pointers.values():
+        if decision is not None:
+            total += sys.getsizeof(decision) + sum(sys.getsizeof(item) for item in decision if isinstance(item, tuple))
+    return total
+
+# ---------------------------
+# State-count report
+# ---------------------------
+def count_states(module, jobs, reduce_states):
+    stats = {}
+    module.dp_schedule([dict(job) for job in jobs], "stats", reduce_states=reduce_states,
+                       stats=stats, verbose=False, save=False)
+    return stats
+
+def report(module, instances, raw):
+    total_raw = total_reduced = 0
+    for name, jobs in instances:
+        reduced = count_states(module, jobs, True)
+        total_reduced += reduced["states"]
+        line = (f"{name}: states {reduced['states']}, children {reduced['children']}, dominated {reduced['dominated']}, "
+                f"pointers {reduced['pointer_bytes'] / 1024:.1f} KiB")
+        if raw:
+            full = count_states(module, jobs, False)
+            total_raw += full["states"]
+            line += f" | unreduced states {full['states']}, children {full['children']}"
+        print(line)
+    summary = f"Total states: {total_reduced}"
+    if raw:
+        summary += f" vs {total_raw} unreduced ({total_raw / max(total_reduced, 1):.1f}x)"
+    print(summary)
+
+
+if __name__ == "__main__":
+    import offline_2
+    # python state_reduction.py [--zip] [--raw]
+    # --raw also runs the unreduced DP for comparison (slow on the generated corpus)
+    raw = "--raw" in sys.argv
+    if "--zip" in sys.argv:
+        with zipfile.ZipFile("job_scheduling_instances.zip") as archive:
+            instances = [(name, parse_jobs(archive.read(name).decode()))
+                         for name in sorted(archive.namelist()) if name.endswith(".txt")]
+    else:
+        test_cases = ["test1", "test2", "test3", "test4", "test5", "test6", "test7"]
+        instances = [(test_case, read_jobs(os.path.join("test", f"{test_case}.txt"))) for test_case in test_cases]
+        raw = True
+    report(offline_2, instances, raw)
@@ -0,0 +1,72 @@
+from bisect import bisect_left, bisect_right
+
+# ---------------------------
+# Time-axis compression
+# ---------------------------
+# Cut the timeline at every release r and every d+1. Inside one elementary segment no
+# window starts or ends, so a job sees either all slots of a segment or none of them and
+# only the number of used slots per segment matters. There are at most 2n - 1 segments
+# whatever the size of the time values; concrete slots are only needed for the output.
+#
+# First-fit (take the earliest free slots of a window) keeps the used slots of every
+# segment a prefix of it, so a used count per segment is an exact picture of a first-fit
+# calendar and the slots can be expanded back from the counts.
+
+def segments(jobs):
+    # (start, end) of every elementary segment covered by at least one window
+    cuts = sorted({job["r"] for job in jobs} | {job["d"] + 1 for job in jobs})
+    covered = sorted((job["r"], job["d"]) for job in jobs)
+    segs = []
+    k = 0
+    reach = None
+    for start, stop in zip(cuts, cuts[1:]):
+        while k < len(covered) and covered[k][0] <= start:
+            reach = covered[k][1] if reach is None else max(reach, covered[k][1])
+            k += 1
+        if reach is not None and stop - 1 <= reach:
+            segs.append((start, stop - 1))
+    return segs
+
+def capacities(segs):
+    return [end - start + 1 for start, end in segs]
+
+def job_span(segs, job):
+    # range of indices of the segments inside [r, d]
+    first = bisect_left(segs, (job["r"],))
+    last = bisect_right(segs, (job["d"] + 1,))
+    return range(first, last)
+
+def fit_runs(segs, used, span, p):
+    """
+    First-fit placement of p units in the segments of span given the used count of every
+    segment: a list of runs (segment index, first slot, length), or None if the segments
+    in span have fewer than p free slots. used is not modified.
+    """
+    runs = []
+    left = p
+    for s in span:
+        if left == 0:
+            break
+        start, end = segs[s]
+        free = end - start + 1 - used[s]
+        if free > 0:
+            take = min(free, left)
+            runs.append((s, start + used[s], take))
+            left -= take
+    if left > 0:
+        return None
+    return runs
+
+def first_fit(segs, used, span, p):
+    # fit_runs for the DPs, whose states are used-count tuples: (new used tuple, runs) or None
+    runs = fit_runs(segs, used, span, p)
+    if runs is None:
+        return None
+    new_used = list(used)
+    for s, _, length in runs:
+        new_used[s] += length
+    return tuple(new_used), runs
+
+def expand(runs):
+    # concrete slot list of a list of runs
+    return [t for _, start, length in runs for t in range(start, start + length)]
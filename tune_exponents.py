@@ -0,0 +1,237 @@
+import argparse
+import itertools
+import os
+import random
+import sys
+import time
+from multiprocessing import Pool
+import pandas as pd
+import online_batch
+import solvers
+from read_file import parse_jobs
+from run import iter_instances
+from solution_cache import fingerprint
+
+# ---------------------------
+# Search over the dynamic-score exponents (A, B, C, D of online_abbas2)
+# ---------------------------
+# python tune_exponents.py job_scheduling_instances.zip --strategy halving --configs 81 --workers 0
+#
+# A configuration is scored by its total profit over the corpus (online_batch runs a chunk of
+# instances per task on a process pool) and reported as a ratio to the total optimum. Every
+# (configuration, instance) profit and every optimum goes to a CSV cache as soon as it is
+# known, so a search that is stopped resumes where it left off, and later searches reuse it.
+# Cache rows are keyed by instance content, not by file name: corpora generated with other
+# seeds reuse the same names.
+
+def config_key(exponents):
+    return ",".join(f"{x:g}" for x in exponents)
+
+def optimal_key(solver):
+    # cache key of the optimum of an instance, as found by solver
+    return f"optimal:{solver}"
+
+def instance_key(jobs):
+    # SHA-256 of the jobs in file order; the policies break ties by job id, so unlike
+    # solution_cache.canonical_form the order is kept
+    return fingerprint([(job["r"], job["d"], job["p"], job["w"], job["l"]) for job in jobs])
+
+class ProfitCache:
+    # (key, instance_key) -> profit, backed by an append-only CSV (no file if path is None)
+    def __init__(self, path="tuning_cache.csv"):
+        self.path = path
+        self.profits = {}
+        if path and os.path.exists(path):
+            cached = pd.read_csv(path, dtype={"key": str, "instance": str})
+            for row in cached.itertuples(index=False):
+                self.profits[(row.key, row.instance)] = int(row.profit)
+
+    def get(self, key, instance):
+        return self.profits.get((key, instance))
+
+    def add(self, rows):
+        # rows: [(key, instance, profit)]
+        for key, instance, profit in rows:
+            self.profits[(key, instance)] = profit
+        if self.path and rows:
+            df = pd.DataFrame(rows, columns=["key", "instance", "profit"])
+            df.to_csv(self.path, mode="a", index=False, header=not os.path.exists(self.path))
+
+# ---------------------------
+# Workers (the corpus is handed over once, when the pool starts)
+# ---------------------------
+_instances = {}
+
+def _init_worker(instances):
+    global _instances
+    _instances = instances
+
+def _run_policy(task):
+    key, exponents, names = task
+    profits = online_batch.simulate_batch([_instances[name] for name in names], exponents)
+    return [(key, name, profit) for name, profit in zip(names, profits)]
+
+def _run_optimal(task):
+    solver, names = task
+    rows = []
+    for name in names:
+        _, profit = solvers.solve(solver, [dict(job) for job in _instances[name]], name)
+        rows.append((optimal_key(solver), name, profit))
+    return rows
+
+# ---------------------------
+# Configurations
+# ---------------------------
+def grid(values=(0.5, 1.0, 1.5, 2.0)):
+    return list(itertools.product(values, repeat=4))
+
+def random_configs(count, low=0.0, high=3.0, seed=0):
+    # rounded to two decimals so repeated searches hit the cache
+    rng = random.Random(seed)
+    return [tuple(round(rng.uniform(low, high), 2) for _ in range(4)) for _ in range(count)]
+
+class ExponentSearch:
+    """
+    Scores exponent configurations on a corpus {name: jobs}. evaluate() and optimal() only run
+    what the cache does not know yet, chunk_size instances per task, on workers processes
+    (1: in this process, None: CPU count). Use as a context manager to close the pool.
+    The optimum of an instance is found by optimal_solver. Workers report by name; the cache
+    is read and written by instance_key.
+    """
+    def __init__(self, instances, cache_file="tuning_cache.csv", workers=1, optimal_solver="offline_bnb", chunk_size=256):
+        self.instances = instances
+        self.names = sorted(instances)
+        self.keys = {name: instance_key(jobs) for name, jobs in instances.items()}
+        self.cache = ProfitCache(cache_file)
+        self.workers = workers
+        self.optimal_solver = optimal_solver
+        self.chunk_size = chunk_size
+        self.pool = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.close()
+            self.pool.join()
+            self.pool = None
+
+    def _map(self, worker, tasks):
+        # results in completion order; every chunk is cached as soon as it is back
+        if self.workers == 1:
+            _init_worker(self.instances)
+            results = map(worker, tasks)
+        else:
+            if self.pool is None:
+                self.pool = Pool(self.workers, initializer=_init_worker, initargs=(self.instances,))
+            results = self.pool.imap_unordered(worker, tasks)
+        for rows in results:
+            self.cache.add([(key, self.keys[name], profit) for key, name, profit in rows])
+
+    def _cached(self, key, name):
+        return self.cache.get(key, self.keys[name])
+
+    def _missing(self, key, names):
+        missing = [name for name in names if self._cached(key, name) is None]
+        return [missing[i:i + self.chunk_size] for i in range(0, len(missing), self.chunk_size)]
+
+    def evaluate(self, configs, names=None):
+        # {config: total profit over names}
+        names = self.names if names is None else names
+        tasks = [(config_key(c), c, chunk) for c in configs for chunk in self._missing(config_key(c), names)]
+        self._map(_run_policy, tasks)
+        return {c: sum(self._cached(config_key(c), name) for name in names) for c in configs}
+
+    def optimal(self, names=None):
+        names = self.names if names is None else names
+        key = optimal_key(self.optimal_solver)
+        self._map(_run_optimal, [(self.optimal_solver, chunk) for chunk in self._missing(key, names)])
+        return sum(self._cached(key, name) for name in names)
+
+    def successive_halving(self, configs, eta=3, min_instances=None, seed=0):
+        """
+        Score all configs on a small random subset, keep the best 1/eta, grow the subset eta
+        times and repeat until one config is left or the subset is the whole corpus.
+        Returns the survivors of the last round, best first.
+        """
+        names = self.names[:]
+        random.Random(seed).shuffle(names)
+        rounds = 0
+        while eta ** (rounds + 1) < len(configs):
+            rounds += 1
+        size = min_instances or max(1, len(names) // eta ** rounds)
+        survivors = list(configs)
+        while True:
+            subset = names[:size]
+            scores = self.evaluate(survivors, subset)
+            survivors.sort(key=lambda c: -scores[c])
+            if len(survivors) == 1 or size >= len(names):
+                return survivors
+            survivors = survivors[:max(1, len(survivors) // eta)]
+            size = min(len(names), size * eta)
+
+    def report(self, configs, names=None):
+        # profit and ratio to the optimum on the whole corpus, best first
+        names = self.names if names is None else names
+        optimum = self.optimal(names)
+        profits = self.evaluate(configs, names)
+        rows = [dict(zip("ABCD", c), profit=profits[c], optimal=optimum, ratio=profits[c] / optimum if optimum else None)
+                for c in configs]
+        return pd.DataFrame(rows).sort_values("profit", ascending=False, ignore_index=True)
+
+def load_corpus(sources, pattern="*.txt", limit=None):
+    # {name: jobs}; a base name seen before gets its source appended (and a counter if needed)
+    corpus = {}
+    for source in sources:
+        for path, text in iter_instances([source], pattern, limit):
+            name = os.path.splitext(os.path.basename(path))[0]
+            if name in corpus:
+                name = unique = f"{name}@{os.path.basename(source)}"
+                copy = 2
+                while name in corpus:
+                    name, copy = f"{unique}#{copy}", copy + 1
+            corpus[name] = parse_jobs(text)
+    return corpus
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Tune the dynamic-score exponents A, B, C, D.")
+    parser.add_argument("instances", nargs="+", help="instance files, globs or .zip archives")
+    parser.add_argument("--strategy", choices=["grid", "random", "halving"], default="halving")
+    parser.add_argument("--values", type=float, nargs="+", default=[0.5, 1.0, 1.5, 2.0], help="grid values per exponent")
+    parser.add_argument("--configs", type=int, default=81, help="random / halving: number of configurations")
+    parser.add_argument("--low", type=float, default=0.0)
+    parser.add_argument("--high", type=float, default=3.0)
+    parser.add_argument("--eta", type=int, default=3, help="halving: keep 1/eta per round")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=1, help="processes (0: CPU count)")
+    parser.add_argument("--cache", default="tuning_cache.csv", help='profit cache ("none": no file)')
+    parser.add_argument("--optimal-solver", default="offline_bnb", choices=sorted(name for name, entry in solvers.SOLVERS.items() if entry[2] == "offline"))
+    parser.add_argument("--pattern", default="*.txt", help="glob on zip member names")
+    parser.add_argument("--limit", type=int, default=None, help="first N members of each zip")
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args(argv)
+
+    instances = load_corpus(args.instances, args.pattern, args.limit)
+    start = time.perf_counter()
+    with ExponentSearch(instances, None if args.cache == "none" else args.cache, args.workers or None, args.optimal_solver) as search:
+        if args.strategy == "grid":
+            configs = grid(args.values)
+        else:
+            configs = random_configs(args.configs, args.low, args.high, args.seed)
+        if args.strategy == "halving":
+            configs = search.successive_halving(configs, args.eta, seed=args.seed)[:args.top]
+        baseline = (1.0, 1.0, 1.0, 1.0)     # the module config, for comparison
+        report = search.report(configs + [baseline] if baseline not in configs else configs)
+
+    print(report.head(args.top).to_string(index=False))
+    print(f"\nbaseline {config_key(baseline)}: ratio {report.loc[(report[list('ABCD')] == baseline).all(axis=1), 'ratio'].iloc[0]:.4f}")
+    print(f"\n{len(instances)} instances, {args.strategy} search in {time.perf_counter() - start:.1f}s")
+    return report
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])